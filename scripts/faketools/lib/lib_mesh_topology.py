@@ -0,0 +1,300 @@
+"""
+Mesh topology arrays.
+
+Provides the vertex positions, edges, triangles and sparse vertex operators of a mesh as numpy and scipy arrays,
+and the closest point queries on the triangle arrays.
+"""
+
+from logging import getLogger
+from typing import Optional
+
+import maya.api.OpenMaya as om
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from .lib_mesh import MeshComponent
+
+logger = getLogger(__name__)
+
+
+class MeshTopology(MeshComponent):
+    """Mesh topology class."""
+
+    def __init__(self, mesh: str):
+        """Initialize the MeshTopology class.
+
+        Args:
+            mesh (str): The mesh name.
+        """
+        super().__init__(mesh)
+
+        self._edges = None
+        self._triangles = None
+        self._adjacency = None
+
+    @property
+    def num_vertices(self) -> int:
+        """Get the number of vertices.
+
+        Returns:
+            int: The number of vertices.
+        """
+        return self._mesh_fn.numVertices
+
+    def get_points(self, space: int = om.MSpace.kWorld) -> np.ndarray:
+        """Get the vertex positions.
+
+        Args:
+            space (int): The coordinate space. Defaults to om.MSpace.kWorld.
+
+        Returns:
+            np.ndarray: The vertex positions. Shape is (num_vertices, 3).
+        """
+        return np.array(self._mesh_fn.getPoints(space), dtype=np.float64)[:, :3]
+
+    def get_edges(self) -> np.ndarray:
+        """Get the unique edges from the polygon vertices.
+
+        Returns:
+            np.ndarray: The vertex index pairs of the edges, smaller index first. Shape is (num_edges, 2).
+        """
+        if self._edges is None:
+            counts, connects = self._mesh_fn.getVertices()
+            counts = np.array(counts, dtype=np.int64)
+            connects = np.array(connects, dtype=np.int64)
+
+            # The next face vertex of each face vertex, wrapping around each polygon
+            starts = np.repeat(np.cumsum(counts) - counts, counts)
+            ends = np.repeat(np.cumsum(counts) - 1, counts)
+            positions = np.arange(len(connects))
+            next_positions = np.where(positions == ends, starts, positions + 1)
+
+            edges = np.sort(np.column_stack([connects, connects[next_positions]]), axis=1)
+            self._edges = np.unique(edges, axis=0)
+
+        return self._edges
+
+    def get_triangles(self) -> np.ndarray:
+        """Get the triangles of the mesh.
+
+        Returns:
+            np.ndarray: The vertex indices of the triangles. Shape is (num_triangles, 3).
+        """
+        if self._triangles is None:
+            _, triangle_vertices = self._mesh_fn.getTriangles()
+            self._triangles = np.array(triangle_vertices, dtype=np.int64).reshape(-1, 3)
+
+        return self._triangles
+
+    def get_adjacency(self) -> sp.csr_matrix:
+        """Get the vertex adjacency matrix.
+
+        Returns:
+            sp.csr_matrix: The symmetric adjacency matrix with 1.0 for the connected vertices. Shape is (num_vertices, num_vertices).
+        """
+        if self._adjacency is None:
+            edges = self.get_edges()
+            rows = np.concatenate([edges[:, 0], edges[:, 1]])
+            cols = np.concatenate([edges[:, 1], edges[:, 0]])
+            data = np.ones(len(rows), dtype=np.float64)
+            self._adjacency = sp.csr_matrix((data, (rows, cols)), shape=(self.num_vertices, self.num_vertices))
+
+        return self._adjacency
+
+    def get_cotangent_weights(self, points: Optional[np.ndarray] = None) -> sp.csr_matrix:
+        """Get the cotangent edge weights.
+
+        Notes:
+            - The weight of an edge is the half sum of the cotangents of the angles opposite to the edge.
+            - Negative weights of obtuse triangles are clamped to zero so that the weights can be used for averaging.
+
+        Args:
+            points (Optional[np.ndarray]): The vertex positions. Defaults to None (the world positions).
+
+        Returns:
+            sp.csr_matrix: The symmetric weight matrix. Shape is (num_vertices, num_vertices).
+        """
+        if points is None:
+            points = self.get_points()
+
+        triangles = self.get_triangles()
+        rows = []
+        cols = []
+        values = []
+        for i in range(3):
+            j = (i + 1) % 3
+            k = (i + 2) % 3
+
+            # Angle at vertex i, opposite to the edge (j, k)
+            u = points[triangles[:, j]] - points[triangles[:, i]]
+            v = points[triangles[:, k]] - points[triangles[:, i]]
+            cross = np.linalg.norm(np.cross(u, v), axis=1)
+            dot = np.einsum("ij,ij->i", u, v)
+            cot = np.divide(dot, cross, out=np.zeros_like(dot), where=cross > 1e-12)
+
+            rows.extend([triangles[:, j], triangles[:, k]])
+            cols.extend([triangles[:, k], triangles[:, j]])
+            values.extend([0.5 * cot, 0.5 * cot])
+
+        weights = sp.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(self.num_vertices, self.num_vertices))
+        weights.data = np.maximum(weights.data, 0.0)
+
+        return weights
+
+    def get_shell_ids(self) -> tuple[int, np.ndarray]:
+        """Get the shell index of each vertex.
+
+        Returns:
+            tuple[int, np.ndarray]: The number of shells and the shell index of each vertex. Shape is (num_vertices,).
+        """
+        num_shells, shell_ids = connected_components(self.get_adjacency(), directed=False)
+
+        return num_shells, shell_ids
+
+
+def get_closest_points_on_triangles(points: np.ndarray, vertices: np.ndarray, triangles: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the closest points on the triangles for all the points at once.
+
+    Notes:
+        - The distance to the nearest triangle vertex bounds the distance to the closest triangle,
+          so only the triangles whose bounding sphere is within that distance are tested.
+        - The triangles are searched in groups by the power of two of their bounding sphere radius.
+        - The candidate point-triangle pairs are tested with vectorized arrays, there is no per point loop.
+
+    Args:
+        points (np.ndarray): The query points. Shape is (num_points, 3).
+        vertices (np.ndarray): The vertex positions. Shape is (num_vertices, 3).
+        triangles (np.ndarray): The vertex indices of the triangles. Shape is (num_triangles, 3).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The closest triangle index (num_points,),
+            the barycentric weights of its three vertices (num_points, 3) and the closest points (num_points, 3).
+
+    Raises:
+        ValueError: If there are no triangles.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    vertices = np.asarray(vertices, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    num_points = len(points)
+
+    if not len(triangles):
+        raise ValueError("No triangles to query.")
+
+    if not num_points:
+        return np.empty(0, dtype=np.int64), np.empty((0, 3), dtype=np.float64), np.empty((0, 3), dtype=np.float64)
+
+    triangle_points = vertices[triangles]
+    centroids = triangle_points.mean(axis=1)
+    radii = np.linalg.norm(triangle_points - centroids[:, np.newaxis], axis=2).max(axis=1)
+
+    # Upper bound of the distance to the closest triangle
+    upper_distances, _ = cKDTree(vertices[np.unique(triangles)]).query(points, workers=-1)
+    tolerance = 1e-9 * (1.0 + np.abs(vertices).max())
+
+    closest_triangle_ids = np.zeros(num_points, dtype=np.int64)
+    closest_weights = np.zeros((num_points, 3), dtype=np.float64)
+    closest_points = np.zeros((num_points, 3), dtype=np.float64)
+    closest_distances = np.full(num_points, np.inf)
+
+    # The triangles are searched in groups of similar size, so that a few large triangles do not widen the search of all the others
+    levels = np.floor(np.log2(np.maximum(radii, tolerance))).astype(np.int64)
+    for level in np.unique(levels):
+        group = np.flatnonzero(levels == level)
+        search_radii = upper_distances + radii[group].max() + tolerance
+
+        candidates = cKDTree(centroids[group]).query_ball_point(points, search_radii, workers=-1, return_sorted=False)
+        counts = np.array([len(candidate) for candidate in candidates], dtype=np.int64)
+        point_ids = np.repeat(np.arange(num_points), counts)
+        triangle_ids = group[np.concatenate([np.asarray(candidate, dtype=np.int64) for candidate in candidates])]
+
+        # The triangles whose bounding sphere is within the bound, the groups always include a triangle of the nearest vertex
+        center_distances = np.linalg.norm(points[point_ids] - centroids[triangle_ids], axis=1)
+        in_bound = center_distances <= upper_distances[point_ids] + radii[triangle_ids] + tolerance
+        point_ids = point_ids[in_bound]
+        triangle_ids = triangle_ids[in_bound]
+        if not len(point_ids):
+            continue
+
+        weights = _get_closest_barycentric_weights(points[point_ids], triangle_points[triangle_ids])
+        pair_points = np.einsum("nk,nkj->nj", weights, triangle_points[triangle_ids])
+        distances = np.einsum("ij,ij->i", pair_points - points[point_ids], pair_points - points[point_ids])
+
+        # The nearest pair of each point in the group, the pairs are grouped by point in ascending order
+        starts = np.flatnonzero(np.r_[True, np.diff(point_ids) != 0])
+        min_distances = np.minimum.reduceat(distances, starts)
+        nearest = np.flatnonzero(distances <= np.repeat(min_distances, np.diff(np.r_[starts, len(point_ids)])))
+        nearest = nearest[np.r_[True, np.diff(point_ids[nearest]) != 0]]
+
+        update = min_distances < closest_distances[point_ids[starts]]
+        nearest = nearest[update]
+        updated_points = point_ids[nearest]
+        closest_triangle_ids[updated_points] = triangle_ids[nearest]
+        closest_weights[updated_points] = weights[nearest]
+        closest_points[updated_points] = pair_points[nearest]
+        closest_distances[updated_points] = distances[nearest]
+
+    return closest_triangle_ids, closest_weights, closest_points
+
+
+def _get_closest_barycentric_weights(points: np.ndarray, triangle_points: np.ndarray) -> np.ndarray:
+    """Get the barycentric weights of the closest points on the triangles.
+
+    Notes:
+        - The Voronoi regions of the vertices and edges are tested as in Ericson, Real-Time Collision Detection 5.1.5.
+
+    Args:
+        points (np.ndarray): The query points. Shape is (num_pairs, 3).
+        triangle_points (np.ndarray): The vertex positions of the triangles. Shape is (num_pairs, 3, 3).
+
+    Returns:
+        np.ndarray: The barycentric weights. Shape is (num_pairs, 3).
+    """
+
+    def _dot(vector_a: np.ndarray, vector_b: np.ndarray) -> np.ndarray:
+        return np.einsum("ij,ij->i", vector_a, vector_b)
+
+    def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=np.abs(denominator) > 1e-30)
+
+    point_a, point_b, point_c = triangle_points[:, 0], triangle_points[:, 1], triangle_points[:, 2]
+    vector_ab = point_b - point_a
+    vector_ac = point_c - point_a
+
+    d1 = _dot(vector_ab, points - point_a)
+    d2 = _dot(vector_ac, points - point_a)
+    d3 = _dot(vector_ab, points - point_b)
+    d4 = _dot(vector_ac, points - point_b)
+    d5 = _dot(vector_ab, points - point_c)
+    d6 = _dot(vector_ac, points - point_c)
+
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    # Inside the face
+    v = _divide(vb, va + vb + vc)
+    w = _divide(vc, va + vb + vc)
+    weights = np.column_stack([1.0 - v - w, v, w])
+
+    # The edges and vertices, later regions take precedence
+    t = _divide(d4 - d3, (d4 - d3) + (d5 - d6))
+    edge_bc = (va <= 0.0) & (d4 - d3 >= 0.0) & (d5 - d6 >= 0.0)
+    weights[edge_bc] = np.column_stack([np.zeros_like(t), 1.0 - t, t])[edge_bc]
+
+    t = _divide(d2, d2 - d6)
+    edge_ac = (vb <= 0.0) & (d2 >= 0.0) & (d6 <= 0.0)
+    weights[edge_ac] = np.column_stack([1.0 - t, np.zeros_like(t), t])[edge_ac]
+
+    weights[(d6 >= 0.0) & (d5 <= d6)] = [0.0, 0.0, 1.0]
+
+    t = _divide(d1, d1 - d3)
+    edge_ab = (vc <= 0.0) & (d1 >= 0.0) & (d3 <= 0.0)
+    weights[edge_ab] = np.column_stack([1.0 - t, t, np.zeros_like(t)])[edge_ab]
+
+    weights[(d3 >= 0.0) & (d4 <= d3)] = [0.0, 1.0, 0.0]
+    weights[(d1 <= 0.0) & (d2 <= 0.0)] = [1.0, 0.0, 0.0]
+
+    return weights
@@ -2,17 +2,210 @@
 Retargeting functions.
 """
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 from logging import getLogger
+from typing import Optional, Union
+import warnings
 
 import numpy as np
-from scipy.linalg import pinv
-from scipy.sparse import csr_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.linalg import LinAlgWarning, lu_factor, lu_solve, pinv
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import lsmr, splu
 from scipy.spatial import cKDTree
 from scipy.spatial.distance import cdist
 
 logger = getLogger(__name__)
 
+# Global linear kernel, the dense system grows as O(N^2) in memory.
+KERNEL_LINEAR = "linear"
+
+# Compactly supported Wendland kernels, the sparse system grows linearly with the number of points in the support radius.
+KERNEL_WENDLAND_C2 = "wendland_c2"
+KERNEL_WENDLAND_C4 = "wendland_c4"
+
+KERNELS = (KERNEL_LINEAR, KERNEL_WENDLAND_C2, KERNEL_WENDLAND_C4)
+
+# Average number of source points within the default support radius of the Wendland kernels.
+DEFAULT_SUPPORT_NEIGHBORS = 48
+
+# Maximum number of source points in a cell of the partition of unity decomposition.
+DEFAULT_PATCH_SIZE = 128
+
+# Ratio of the patch radius to the half diagonal of its cell, values above 1.0 make the patches overlap.
+DEFAULT_PATCH_OVERLAP = 1.25
+
+# Minimum number of source points in a patch.
+MIN_PATCH_POINTS = 10
+
+# Number of kernel values evaluated at once when the deform points are evaluated in chunks.
+CHUNK_ELEMENTS = 2**22
+
+# Number of deform points sampled to estimate the non-zero kernel values per point of the Wendland kernels.
+CHUNK_SAMPLE_SIZE = 256
+
+# Distance relative to the bounding box diagonal of the source points under which source points are merged.
+MERGE_TOLERANCE = 1e-9
+
+# Total size in bytes of the kernel factorizations kept in the cache, larger factorizations are not cached.
+FACTOR_CACHE_MAX_BYTES = 256 * 2**20
+
+# Number of solved weights kept in the cache.
+WEIGHTS_CACHE_SIZE = 64
+
+_factor_cache: OrderedDict[str, "RBFFactor"] = OrderedDict()
+_weights_cache: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+
+
+class RBFFactor:
+    """Factorization of the RBF kernel matrix of the source points.
+
+    The linear kernel is solved as the saddle point system with the affine terms, which is indefinite,
+    so it is factorized with LU. Singular systems fall back to the pseudo inverse.
+
+    The Wendland kernels are positive definite, so the affine terms are fitted first by least squares
+    and the residual is interpolated with the sparse kernel matrix, factorized with a symmetric sparse LU.
+    Singular systems fall back to sparse least squares.
+
+    Coincident source points make both systems singular, so they are merged before the factorization.
+    Their right hand sides are averaged, and the solution is given to the first point of each group.
+    """
+
+    def __init__(self, src_points: np.ndarray, kernel: str = KERNEL_LINEAR, radius: float = 1.0):
+        """Factorize the kernel matrix of the source points.
+
+        Args:
+            src_points (np.ndarray): The source points. Shape is (num_points, 3).
+            kernel (str): The kernel name. One of KERNELS. Defaults to KERNEL_LINEAR.
+            radius (float): The support radius of the Wendland kernels. Defaults to 1.0.
+        """
+        src_points = np.asarray(src_points, dtype=np.float64)
+
+        self._num_points = len(src_points)
+        self._merge_matrix = None
+        self._merged_indices = None
+
+        labels = _get_coincident_labels(src_points)
+        if labels is not None:
+            _, self._merged_indices, counts = np.unique(labels, return_index=True, return_counts=True)
+            self._merge_matrix = sp.csr_matrix((1.0 / counts[labels], (labels, np.arange(self._num_points))), shape=(len(counts), self._num_points))
+            src_points = src_points[self._merged_indices]
+
+            logger.debug(f"Merged coincident source points: {self._num_points} -> {len(src_points)}")
+
+        num_points = len(src_points)
+
+        mat_cc = np.c_[src_points, np.ones(num_points)]
+        mat_k = evaluate_kernel(src_points, src_points, kernel=kernel, radius=radius)
+
+        self._lu = None
+        self._pinv = None
+        self._splu = None
+        self._sparse_matrix = None
+        self._affine = None
+        self._affine_pinv = None
+
+        if kernel == KERNEL_LINEAR:
+            mat_a = np.zeros((num_points + 4, num_points + 4), dtype=np.float64)
+            mat_a[:num_points, :num_points] = mat_k
+            mat_a[:num_points, num_points:] = mat_cc
+            mat_a[num_points:, :num_points] = mat_cc.T
+
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", LinAlgWarning)
+                try:
+                    self._lu = lu_factor(mat_a, check_finite=False)
+                except (LinAlgWarning, np.linalg.LinAlgError):
+                    self._lu = None
+
+            if self._lu is None:
+                logger.warning("Singular matrix detected. Using pinv instead.")
+                self._pinv = pinv(mat_a)
+        else:
+            self._affine = mat_cc
+            self._affine_pinv = pinv(mat_cc)
+
+            try:
+                self._splu = splu(mat_k.tocsc(), permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+            except RuntimeError:
+                logger.warning("Singular matrix detected. Using least squares instead.")
+                self._sparse_matrix = mat_k
+
+            logger.debug(f"Factorized sparse RBF kernel: {num_points} points, {mat_k.nnz} non-zeros (radius: {radius:.4f})")
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """Solve the kernel system for the right hand side columns.
+
+        Args:
+            rhs (np.ndarray): The right hand side. Shape is (num_points + 4, num_columns).
+
+        Returns:
+            np.ndarray: The solution. Shape is (num_points + 4, num_columns).
+        """
+        if self._merge_matrix is None:
+            return self._solve(rhs)
+
+        merged_rhs = np.r_[self._merge_matrix @ rhs[: self._num_points], rhs[self._num_points :]]
+        merged_solution = self._solve(merged_rhs)
+
+        num_merged = len(self._merged_indices)
+        solution = np.zeros((self._num_points + 4, rhs.shape[1]), dtype=merged_solution.dtype)
+        solution[self._merged_indices] = merged_solution[:num_merged]
+        solution[self._num_points :] = merged_solution[num_merged:]
+
+        return solution
+
+    def _solve(self, rhs: np.ndarray) -> np.ndarray:
+        """Solve the factorized system of the merged source points.
+
+        Args:
+            rhs (np.ndarray): The right hand side. Shape is (num_merged_points + 4, num_columns).
+
+        Returns:
+            np.ndarray: The solution. Shape is (num_merged_points + 4, num_columns).
+        """
+        if self._lu is not None:
+            return lu_solve(self._lu, rhs, check_finite=False)
+
+        if self._pinv is not None:
+            return self._pinv @ rhs
+
+        # Fit the affine terms, then interpolate the residual with the sparse kernel
+        num_points = len(self._affine)
+        affine_weights = self._affine_pinv @ rhs[:num_points]
+        residual = rhs[:num_points] - self._affine @ affine_weights
+
+        if self._splu is not None:
+            kernel_weights = self._splu.solve(np.asfortranarray(residual))
+        else:
+            kernel_weights = np.column_stack([lsmr(self._sparse_matrix, column)[0] for column in residual.T])
+
+        return np.r_[kernel_weights, affine_weights]
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory size of the factorization.
+
+        Returns:
+            int: The size in bytes. The sparse LU factors are estimated from their number of non-zeros.
+        """
+        arrays = [self._pinv, self._affine, self._affine_pinv]
+        if self._lu is not None:
+            arrays.extend(self._lu)
+
+        for matrix in (self._sparse_matrix, self._merge_matrix):
+            if matrix is not None:
+                arrays.extend([matrix.data, matrix.indices, matrix.indptr])
+
+        size = sum(array.nbytes for array in arrays if array is not None)
+        if self._splu is not None:
+            # Values and row indices of the L and U factors
+            size += self._splu.nnz * (np.dtype(np.float64).itemsize + np.dtype(np.int32).itemsize)
+
+        return size
+
 
 class RBFDeform:
     """RBF Deformation class.
@@ -20,51 +213,163 @@ class RBFDeform:
     This class is used to deform points using Radial Basis Functions (RBF).
     It uses src_points (before deformation) and trg_points (after deformation) to deform deform_points.
 
+    Notes:
+        - The kernel matrix is factorized once and the x, y and z weights are solved as a single block.
+        - The factorization and the weights are cached by a hash of the points,
+          so deforming with the same source and target points skips the solve.
+          The factorizations are kept up to FACTOR_CACHE_MAX_BYTES in total.
+        - The Wendland kernels only interact within the support radius, so the kernel matrix is sparse
+          and large point sets can be deformed. Points farther than the radius from every source point
+          only follow the affine part of the deformation.
     """
 
-    def __init__(self, src_points: np.ndarray, data_type: type = np.float32):
+    def __init__(
+        self,
+        src_points: np.ndarray,
+        data_type: type = np.float32,
+        use_cache: bool = True,
+        kernel: str = KERNEL_LINEAR,
+        radius: Optional[float] = None,
+    ):
         """Initialize the RBFDeform class.
 
         Args:
             src_points (np.ndarray): The source points.
             data_type (type): The data type, default is np.float32.
+            use_cache (bool): Whether to cache the factorization and the weights. Defaults to True.
+            kernel (str): The kernel name. One of KERNELS. Defaults to KERNEL_LINEAR.
+            radius (Optional[float]): The support radius of the Wendland kernels.
+                Defaults to None (computed from the source point density, see get_support_radius).
+
+        Raises:
+            ValueError: If the kernel is unknown or the radius is not positive.
         """
+        if kernel not in KERNELS:
+            raise ValueError(f"Unknown RBF kernel: {kernel}. Must be one of {KERNELS}.")
+
+        if kernel != KERNEL_LINEAR:
+            if radius is None:
+                radius = get_support_radius(src_points)
+            elif radius <= 0.0:
+                raise ValueError(f"Support radius must be positive: {radius}.")
+
         self._src_points = src_points
         self._data_type = data_type
+        self._use_cache = use_cache
+        self._kernel = kernel
+        self._radius = radius
+        self._src_hash = _get_points_hash(src_points, f"{kernel}:{radius}")
+        self._factor = None
+        self._src_tree = None
 
-    def compute_weights(self, trg_points: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-        """Compute the RBF weights for the target points.
+    @property
+    def kernel(self) -> str:
+        """Get the kernel name.
+
+        Returns:
+            str: The kernel name.
+        """
+        return self._kernel
+
+    @property
+    def radius(self) -> Optional[float]:
+        """Get the support radius of the Wendland kernels.
+
+        Returns:
+            Optional[float]: The support radius, None for the linear kernel.
+        """
+        return self._radius
+
+    def get_factor(self) -> RBFFactor:
+        """Get the factorization of the kernel matrix of the source points.
+
+        Returns:
+            RBFFactor: The kernel factorization.
+        """
+        if self._factor is not None:
+            return self._factor
+
+        if self._use_cache and self._src_hash in _factor_cache:
+            _factor_cache.move_to_end(self._src_hash)
+            self._factor = _factor_cache[self._src_hash]
+            return self._factor
+
+        self._factor = RBFFactor(self._src_points, kernel=self._kernel, radius=self._radius)
+
+        if self._use_cache:
+            nbytes = self._factor.nbytes
+            if nbytes > FACTOR_CACHE_MAX_BYTES:
+                logger.debug(f"Factorization is larger than the cache size, not cached: {nbytes} > {FACTOR_CACHE_MAX_BYTES} bytes")
+            else:
+                _factor_cache[self._src_hash] = self._factor
+                while sum(factor.nbytes for factor in _factor_cache.values()) > FACTOR_CACHE_MAX_BYTES:
+                    _factor_cache.popitem(last=False)
+
+        return self._factor
+
+    def get_src_tree(self) -> cKDTree:
+        """Get the KD-tree of the source points, built once and shared by all the evaluations.
+
+        Returns:
+            cKDTree: The KD-tree of the source points.
+        """
+        if self._src_tree is None:
+            self._src_tree = cKDTree(np.asarray(self._src_points, dtype=np.float64))
+
+        return self._src_tree
+
+    def solve_weights(self, trg_points: np.ndarray) -> np.ndarray:
+        """Solve the RBF weights of the x, y and z axes for the target points at once.
 
         Args:
-            trg_points (np.ndarray): The target points.
+            trg_points (np.ndarray): The target points. Shape is (num_points, 3).
 
         Returns:
-            tuple[np.ndarray, np.ndarray, np.ndarray]: The weights for x, y, and z.
+            np.ndarray: The weights. The last four rows are the affine terms. Shape is (num_points + 4, 3).
+                The cached weights are returned as a copy.
         """
-        mat_cc = np.insert(self._src_points, 3, 1.0, axis=1)
+        trg_points = np.asarray(trg_points, dtype=self._data_type)
+
+        cache_key = (self._src_hash, _get_points_hash(trg_points))
+        if self._use_cache and cache_key in _weights_cache:
+            _weights_cache.move_to_end(cache_key)
+            return _weights_cache[cache_key].copy()
+
+        rhs = np.zeros((len(trg_points) + 4, 3), dtype=np.float64)
+        rhs[: len(trg_points)] = trg_points
+        weights = self.get_factor().solve(rhs)
 
-        mat_cct = mat_cc.transpose()
-        A = mat_cct[..., :, np.newaxis]
-        B = mat_cct[..., np.newaxis, :]
-        mat_k = np.sqrt(((A - B) ** 2).sum(axis=0))
+        if self._use_cache:
+            cached_weights = weights.copy()
+            cached_weights.setflags(write=False)
+            _weights_cache[cache_key] = cached_weights
+            while len(_weights_cache) > WEIGHTS_CACHE_SIZE:
+                _weights_cache.popitem(last=False)
 
-        mat_a = np.c_[mat_k, mat_cc]
-        mat_a = np.r_[mat_a, np.c_[mat_cct, np.zeros([4, 4])]]  # base matrix
+        return weights
 
-        trg_x, trg_y, trg_z = np.asarray(trg_points, dtype=self._data_type).T
-        trg_x = np.append(trg_x, [0.0, 0.0, 0.0, 0.0])
-        trg_y = np.append(trg_y, [0.0, 0.0, 0.0, 0.0])
-        trg_z = np.append(trg_z, [0.0, 0.0, 0.0, 0.0])
+    def compute_weights(self, trg_points: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute the RBF weights for the target points.
+
+        Args:
+            trg_points (np.ndarray): The target points.
 
-        weights_x = self._solve_weight(mat_a, trg_x)
-        weights_y = self._solve_weight(mat_a, trg_y)
-        weights_z = self._solve_weight(mat_a, trg_z)
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The weights for x, y, and z.
+        """
+        weights = self.solve_weights(trg_points)
 
-        return weights_x, weights_y, weights_z
+        return weights[:, 0], weights[:, 1], weights[:, 2]
 
     def compute_points(
-        self, deform_points: np.ndarray, weight_x: np.ndarray, weight_y: np.ndarray, weight_z: np.ndarray
-    ) -> list[tuple[float, float, float]]:
+        self,
+        deform_points: np.ndarray,
+        weight_x: np.ndarray,
+        weight_y: np.ndarray,
+        weight_z: np.ndarray,
+        chunk_size: Optional[int] = None,
+        max_workers: int = 1,
+    ) -> np.ndarray:
         """Generate final positions by applying the RBF weights to the source and target points.
 
         Args:
@@ -72,43 +377,475 @@ class RBFDeform:
             weight_x (np.ndarray): Weights for x-axis.
             weight_y (np.ndarray): Weights for y-axis.
             weight_z (np.ndarray): Weights for z-axis.
+            chunk_size (Optional[int]): The number of deform points evaluated at once. See evaluate_points.
+            max_workers (int): The number of threads evaluating the chunks. See evaluate_points.
+
+        Returns:
+            np.ndarray: The transformed (x, y, z) positions. Shape is (num_points, 3).
+        """
+        weights = np.column_stack([weight_x, weight_y, weight_z])
+
+        return self.evaluate_points(deform_points, weights, chunk_size=chunk_size, max_workers=max_workers)
+
+    def evaluate_points(self, deform_points: np.ndarray, weights: np.ndarray, chunk_size: Optional[int] = None, max_workers: int = 1) -> np.ndarray:
+        """Evaluate the RBF deformation of the points in chunks.
+
+        Notes:
+            - The kernel matrix between a chunk and the source points is the only temporary,
+              so the peak memory is bounded by the chunk size instead of the number of deform points.
+            - The Wendland kernel matrix is sparse, so its chunks are sized by the number of source points
+              in the support radius, estimated from a sample of the deform points. The KD-tree of the source points
+              is built once and shared by all the chunks.
+            - The chunks can be evaluated in a thread pool, the matrix products release the GIL.
+
+        Args:
+            deform_points (np.ndarray): The deform points. Shape is (num_points, 3).
+            weights (np.ndarray): The weights from solve_weights. Shape is (num_src_points + 4, num_columns).
+            chunk_size (Optional[int]): The number of deform points evaluated at once.
+                Defaults to None (the kernel matrix of a chunk holds about CHUNK_ELEMENTS values, or non-zero values for the Wendland kernels).
+            max_workers (int): The number of threads evaluating the chunks. Defaults to 1 (no thread pool).
+
+        Returns:
+            np.ndarray: The transformed (x, y, z) positions. Shape is (num_points, num_columns).
+        """
+        deform_points = np.asarray(deform_points, dtype=np.float64).reshape(-1, 3)
+        weights = np.asarray(weights, dtype=np.float64)
+        num_src = len(self._src_points)
+        num_points = len(deform_points)
+
+        src_points = np.asarray(self._src_points, dtype=np.float64)
+        src_tree = self.get_src_tree() if self._kernel != KERNEL_LINEAR else None
+
+        if chunk_size is None:
+            if src_tree is not None and num_points:
+                sample = deform_points[np.linspace(0, num_points - 1, min(num_points, CHUNK_SAMPLE_SIZE)).astype(np.int64)]
+                row_size = float(np.mean(src_tree.query_ball_point(sample, self._radius, return_length=True)))
+            else:
+                row_size = num_src
+
+            chunk_size = max(1, int(CHUNK_ELEMENTS // max(row_size, 1.0)))
+
+        kernel_weights = weights[:num_src]
+        affine_weights = weights[num_src:]
+
+        result = np.empty((num_points, weights.shape[1]), dtype=np.float64)
+
+        def _evaluate_chunk(start: int) -> None:
+            chunk = deform_points[start : start + chunk_size]
+            kernel_matrix = evaluate_kernel(chunk, src_points, kernel=self._kernel, radius=self._radius, tree_b=src_tree)
+            result[start : start + chunk_size] = kernel_matrix @ kernel_weights + chunk @ affine_weights[:3] + affine_weights[3]
+
+        starts = range(0, num_points, chunk_size)
+        if max_workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(_evaluate_chunk, starts))
+        else:
+            for start in starts:
+                _evaluate_chunk(start)
+
+        return result
+
+    def get_linear_map(self, deform_points: np.ndarray, chunk_size: Optional[int] = None, max_workers: int = 1) -> np.ndarray:
+        """Get the linear map from the target points to the deformed points.
+
+        Notes:
+            - The deformation is linear in the target points, so for any target points
+              ``linear_map @ trg_points`` equals ``evaluate_points(deform_points, solve_weights(trg_points))``.
+            - The map only depends on the source and deform points, so it is computed once
+              and applied to many target point sets with a matrix product.
+
+        Args:
+            deform_points (np.ndarray): The deform points. Shape is (num_points, 3).
+            chunk_size (Optional[int]): The number of deform points evaluated at once. See evaluate_points.
+            max_workers (int): The number of threads evaluating the chunks. See evaluate_points.
 
         Returns:
-            list[tuple[float, float, float]]: The transformed (x, y, z) positions.
+            np.ndarray: The linear map. Shape is (num_points, num_src_points).
         """
-        num_out = len(self._src_points)
+        num_src = len(self._src_points)
 
-        mat_p = np.insert(deform_points, 3, 1.0, axis=1)
+        # The weights of each unit target point
+        rhs = np.zeros((num_src + 4, num_src), dtype=np.float64)
+        rhs[:num_src] = np.eye(num_src)
+        unit_weights = self.get_factor().solve(rhs)
 
-        out_x = np.dot(mat_p, weight_x[num_out:])
-        out_y = np.dot(mat_p, weight_y[num_out:])
-        out_z = np.dot(mat_p, weight_z[num_out:])
+        return self.evaluate_points(deform_points, unit_weights, chunk_size=chunk_size, max_workers=max_workers)
 
-        AB = cdist(deform_points, self._src_points, "euclidean")
 
-        out_x = np.dot(AB, weight_x[:num_out]) + out_x
-        out_y = np.dot(AB, weight_y[:num_out]) + out_y
-        out_z = np.dot(AB, weight_z[:num_out]) + out_z
+class PartitionOfUnityDeform:
+    """Partition of unity RBF deformation class.
 
-        return [(float(px), float(py), float(pz)) for px, py, pz in zip(out_x, out_y, out_z)]
+    The source points are split into cells by a KD-tree decomposition, and each cell is covered by
+    a spherical patch overlapping its neighbors. Each patch has its own small RBF, and the deformed points
+    blend the patches covering them with Wendland weights normalized to sum to one.
 
-    def _solve_weight(self, base_matrix: np.ndarray, trg_points: np.ndarray) -> np.ndarray:
-        """Solve the system of linear equations for the RBF. Uses a sparse solver and falls back to pinv if necessary.
+    Notes:
+        - The solve cost grows linearly with the number of source points, as each patch is solved independently.
+        - Points outside every patch follow the patch with the nearest center.
+    """
+
+    def __init__(
+        self,
+        src_points: np.ndarray,
+        data_type: type = np.float32,
+        kernel: str = KERNEL_LINEAR,
+        patch_size: int = DEFAULT_PATCH_SIZE,
+        overlap: float = DEFAULT_PATCH_OVERLAP,
+    ):
+        """Initialize the PartitionOfUnityDeform class.
 
         Args:
-            base_matrix (np.ndarray): The RBF base matrix.
-            trg_points (np.ndarray): The extended target array for one axis.
+            src_points (np.ndarray): The source points. Shape is (num_points, 3).
+            data_type (type): The data type, default is np.float32.
+            kernel (str): The kernel name of the patch RBFs. One of KERNELS. Defaults to KERNEL_LINEAR.
+            patch_size (int): The maximum number of source points in a cell. Defaults to DEFAULT_PATCH_SIZE.
+            overlap (float): The ratio of the patch radius to the half diagonal of its cell. Defaults to DEFAULT_PATCH_OVERLAP.
+
+        Raises:
+            ValueError: If there are less than 4 source points, or the patch size or overlap is invalid.
+        """
+        src_points = np.asarray(src_points, dtype=np.float64)
+        if len(src_points) < 4:
+            raise ValueError(f"At least 4 source points are required: {len(src_points)}.")
+
+        if patch_size < MIN_PATCH_POINTS:
+            raise ValueError(f"Patch size must be at least {MIN_PATCH_POINTS}: {patch_size}.")
+
+        if overlap <= 1.0:
+            raise ValueError(f"Overlap must be greater than 1.0: {overlap}.")
+
+        self._src_points = src_points
+        self._centers, self._radii, self._patch_indices = _build_patches(src_points, patch_size, overlap)
+        self._patch_deforms = [RBFDeform(src_points[indices], data_type=data_type, use_cache=False, kernel=kernel) for indices in self._patch_indices]
+
+        logger.debug(f"Built partition of unity: {len(src_points)} points, {len(self._centers)} patches")
+
+    @property
+    def num_patches(self) -> int:
+        """Get the number of patches.
 
         Returns:
-            np.ndarray: The resulting weight array.
+            int: The number of patches.
         """
-        if not isinstance(base_matrix, csr_matrix):
-            base_matrix = csr_matrix(base_matrix)
+        return len(self._centers)
+
+    def solve_weights(self, trg_points: np.ndarray, max_workers: int = 1) -> list[np.ndarray]:
+        """Solve the RBF weights of each patch for the target points.
+
+        Args:
+            trg_points (np.ndarray): The target points. Shape is (num_points, 3).
+            max_workers (int): The number of threads solving the patches. Defaults to 1 (no thread pool).
+
+        Returns:
+            list[np.ndarray]: The weights of each patch. See RBFDeform.solve_weights.
+
+        Raises:
+            ValueError: If the number of target points differs from the source points.
+        """
+        trg_points = np.asarray(trg_points)
+        if len(trg_points) != len(self._src_points):
+            raise ValueError(f"Source and target points length mismatch: {len(self._src_points)} != {len(trg_points)}")
+
+        def _solve_patch(patch: int) -> np.ndarray:
+            return self._patch_deforms[patch].solve_weights(trg_points[self._patch_indices[patch]])
+
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(_solve_patch, range(self.num_patches)))
+
+        return [_solve_patch(patch) for patch in range(self.num_patches)]
+
+    def evaluate_points(self, deform_points: np.ndarray, weights: list[np.ndarray], max_workers: int = 1) -> np.ndarray:
+        """Evaluate the blended deformation of the points.
+
+        Args:
+            deform_points (np.ndarray): The deform points. Shape is (num_points, 3).
+            weights (list[np.ndarray]): The weights of each patch from solve_weights.
+            max_workers (int): The number of threads evaluating the patches. Defaults to 1 (no thread pool).
+
+        Returns:
+            np.ndarray: The transformed (x, y, z) positions. Shape is (num_points, 3).
+        """
+        deform_points = np.asarray(deform_points, dtype=np.float64).reshape(-1, 3)
+        num_points = len(deform_points)
+
+        members = cKDTree(deform_points).query_ball_point(self._centers, self._radii, workers=-1) if num_points else []
+
+        def _evaluate_patch(patch: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            indices = np.asarray(members[patch], dtype=np.int64)
+            if not len(indices):
+                return indices, np.empty(0), np.empty((0, 3))
+
+            points = deform_points[indices]
+            distances = np.linalg.norm(points - self._centers[patch], axis=1)
+            blend_weights = _wendland(distances / self._radii[patch], KERNEL_WENDLAND_C2)
+
+            return indices, blend_weights, self._patch_deforms[patch].evaluate_points(points, weights[patch])
+
+        result = np.zeros((num_points, 3), dtype=np.float64)
+        totals = np.zeros(num_points, dtype=np.float64)
+
+        if max_workers > 1:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            patch_results = executor.map(_evaluate_patch, range(len(members)))
+        else:
+            executor = None
+            patch_results = map(_evaluate_patch, range(len(members)))
+
         try:
-            return spsolve(base_matrix, trg_points)
-        except np.linalg.LinAlgError:
-            logger.warning("Singular matrix detected. Using pinv instead.")
-            return np.dot(pinv(base_matrix), trg_points)
+            for indices, blend_weights, values in patch_results:
+                result[indices] += blend_weights[:, np.newaxis] * values
+                totals[indices] += blend_weights
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        covered = totals > 0.0
+        result[covered] /= totals[covered, np.newaxis]
+
+        # Points outside every patch follow the nearest patch
+        uncovered = np.flatnonzero(~covered)
+        if len(uncovered):
+            _, nearest = cKDTree(self._centers).query(deform_points[uncovered])
+            for patch in np.unique(nearest):
+                indices = uncovered[nearest == patch]
+                result[indices] = self._patch_deforms[patch].evaluate_points(deform_points[indices], weights[patch])
+
+        return result
+
+
+def _build_patches(points: np.ndarray, patch_size: int, overlap: float) -> tuple[np.ndarray, np.ndarray, list[np.ndarray]]:
+    """Build the overlapping patches of the partition of unity.
+
+    Notes:
+        - The points are split at the median of the longest axis of their bounding box until each cell has at most patch_size points.
+        - Each patch is the sphere around the center of its cell with the radius of the half diagonal scaled by the overlap.
+
+    Args:
+        points (np.ndarray): The source points. Shape is (num_points, 3).
+        patch_size (int): The maximum number of points in a cell.
+        overlap (float): The ratio of the patch radius to the half diagonal of its cell.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, list[np.ndarray]]: The patch centers (num_patches, 3), radii (num_patches,)
+            and the source point indices of each patch.
+    """
+    cells = []
+    stack = [np.arange(len(points))]
+    while stack:
+        indices = stack.pop()
+        cell_points = points[indices]
+        if len(indices) <= patch_size:
+            cells.append(cell_points)
+            continue
+
+        axis = int(np.argmax(np.ptp(cell_points, axis=0)))
+        order = np.argpartition(cell_points[:, axis], len(indices) // 2)
+        stack.append(indices[order[: len(indices) // 2]])
+        stack.append(indices[order[len(indices) // 2 :]])
+
+    bbox_min = np.array([cell.min(axis=0) for cell in cells])
+    bbox_max = np.array([cell.max(axis=0) for cell in cells])
+    centers = (bbox_min + bbox_max) * 0.5
+    radii = np.linalg.norm(bbox_max - bbox_min, axis=1) * 0.5 * overlap
+
+    # Degenerate cells (coincident points) still need a positive radius
+    min_radius = np.linalg.norm(np.ptp(points, axis=0)) * 1e-6 or 1e-6
+    radii = np.maximum(radii, min_radius)
+
+    kd_tree = cKDTree(points)
+    patch_indices = kd_tree.query_ball_point(centers, radii, workers=-1, return_sorted=True)
+
+    # Make sure each patch has enough points for its RBF
+    num_neighbors = min(MIN_PATCH_POINTS, len(points))
+    distances, neighbors = kd_tree.query(centers, k=num_neighbors, workers=-1)
+    for patch, indices in enumerate(patch_indices):
+        if len(indices) < num_neighbors:
+            patch_indices[patch] = np.sort(neighbors[patch])
+            radii[patch] = max(radii[patch], distances[patch].max() * overlap)
+
+    return centers, radii, [np.asarray(indices, dtype=np.int64) for indices in patch_indices]
+
+
+def evaluate_kernel(
+    points_a: np.ndarray,
+    points_b: np.ndarray,
+    kernel: str = KERNEL_LINEAR,
+    radius: float = 1.0,
+    tree_b: Optional[cKDTree] = None,
+) -> Union[np.ndarray, sp.csr_matrix]:
+    """Evaluate the RBF kernel between two point sets.
+
+    Notes:
+        - The linear kernel is the distance and returns a dense matrix.
+        - The Wendland kernels are zero beyond the radius and return a sparse matrix built from
+          the point pairs within the radius, so the memory grows with the number of those pairs.
+
+    Args:
+        points_a (np.ndarray): The row points. Shape is (num_points_a, 3).
+        points_b (np.ndarray): The column points. Shape is (num_points_b, 3).
+        kernel (str): The kernel name. One of KERNELS. Defaults to KERNEL_LINEAR.
+        radius (float): The support radius of the Wendland kernels. Defaults to 1.0.
+        tree_b (Optional[cKDTree]): The KD-tree of the column points to reuse for the Wendland kernels. Defaults to None (built here).
+
+    Returns:
+        Union[np.ndarray, sp.csr_matrix]: The kernel matrix. Shape is (num_points_a, num_points_b).
+    """
+    points_a = np.asarray(points_a, dtype=np.float64)
+    points_b = np.asarray(points_b, dtype=np.float64)
+
+    if kernel == KERNEL_LINEAR:
+        return cdist(points_a, points_b, "euclidean")
+
+    # The ndarray output keeps the zero distance pairs, which the sparse matrix outputs would drop
+    if tree_b is None:
+        tree_b = cKDTree(points_b)
+
+    pairs = cKDTree(points_a).sparse_distance_matrix(tree_b, radius, output_type="ndarray")
+    values = _wendland(pairs["v"] / radius, kernel)
+
+    return sp.csr_matrix((values, (pairs["i"], pairs["j"])), shape=(len(points_a), len(points_b)))
+
+
+def _get_coincident_labels(points: np.ndarray, tolerance: float = MERGE_TOLERANCE) -> Optional[np.ndarray]:
+    """Group the coincident points.
+
+    Args:
+        points (np.ndarray): The points. Shape is (num_points, 3).
+        tolerance (float): The merge distance relative to the bounding box diagonal of the points. Defaults to MERGE_TOLERANCE.
+
+    Returns:
+        Optional[np.ndarray]: The group label of each point, numbered in the order of the first point of each group.
+            None if there are no coincident points.
+    """
+    if len(points) < 2:
+        return None
+
+    distance = tolerance * (float(np.linalg.norm(np.ptp(points, axis=0))) or 1.0)
+    pairs = cKDTree(points).query_pairs(distance, output_type="ndarray")
+    if not len(pairs):
+        return None
+
+    graph = sp.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(points), len(points)))
+    _, labels = connected_components(graph, directed=False)
+
+    return labels
+
+
+def get_support_radius(points: np.ndarray, num_neighbors: int = DEFAULT_SUPPORT_NEIGHBORS) -> float:
+    """Get a support radius that covers about the number of neighbors around each point.
+
+    Args:
+        points (np.ndarray): The points. Shape is (num_points, 3).
+        num_neighbors (int): The number of neighbors in the radius. Defaults to DEFAULT_SUPPORT_NEIGHBORS.
+
+    Returns:
+        float: The support radius, the median distance to the farthest of the neighbors.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    num_neighbors = min(num_neighbors, len(points) - 1)
+    if num_neighbors < 1:
+        return 1.0
+
+    distances, _ = cKDTree(points).query(points, k=num_neighbors + 1, workers=-1)
+    radius = float(np.median(distances[:, -1]))
+
+    return radius if radius > 0.0 else 1.0
+
+
+def deform_points_batch(src_points: np.ndarray, trg_points: np.ndarray, deform_points: np.ndarray, data_type: type = np.float32) -> np.ndarray:
+    """Deform many small point sets with the linear kernel RBF at once.
+
+    Notes:
+        - Each item is an independent RBFDeform with the linear kernel, so the item results equal
+          ``RBFDeform(src).compute_points(deform, *RBFDeform(src).compute_weights(trg))``.
+        - The saddle point systems of all the items are stacked and solved with a single batched solve.
+          Exactly singular systems (duplicate source points) fall back to the pseudo inverse item by item.
+
+    Args:
+        src_points (np.ndarray): The source points. Shape is (num_items, num_src_points, 3).
+        trg_points (np.ndarray): The target points. Shape is (num_items, num_src_points, 3).
+        deform_points (np.ndarray): The deform points. Shape is (num_items, num_deform_points, 3).
+        data_type (type): The data type of the target points, same as RBFDeform. Defaults to np.float32.
+
+    Returns:
+        np.ndarray: The deformed points. Shape is (num_items, num_deform_points, 3).
+    """
+    src_points = np.asarray(src_points, dtype=np.float64)
+    trg_points = np.asarray(trg_points, dtype=data_type).astype(np.float64)
+    deform_points = np.asarray(deform_points, dtype=np.float64)
+    num_items, num_src = src_points.shape[:2]
+
+    mat_a = np.zeros((num_items, num_src + 4, num_src + 4), dtype=np.float64)
+    mat_a[:, :num_src, :num_src] = np.linalg.norm(src_points[:, :, np.newaxis] - src_points[:, np.newaxis, :], axis=3)
+    mat_a[:, :num_src, num_src : num_src + 3] = src_points
+    mat_a[:, :num_src, num_src + 3] = 1.0
+    mat_a[:, num_src:, :num_src] = mat_a[:, :num_src, num_src:].transpose(0, 2, 1)
+
+    rhs = np.zeros((num_items, num_src + 4, 3), dtype=np.float64)
+    rhs[:, :num_src] = trg_points
+
+    try:
+        weights = np.linalg.solve(mat_a, rhs)
+    except np.linalg.LinAlgError:
+        weights = np.empty_like(rhs)
+        for i in range(num_items):
+            try:
+                weights[i] = np.linalg.solve(mat_a[i], rhs[i])
+            except np.linalg.LinAlgError:
+                logger.warning("Singular matrix detected. Using pinv instead.")
+                weights[i] = pinv(mat_a[i]) @ rhs[i]
+
+    kernel_matrix = np.linalg.norm(deform_points[:, :, np.newaxis] - src_points[:, np.newaxis, :], axis=3)
+
+    return kernel_matrix @ weights[:, :num_src] + deform_points @ weights[:, num_src : num_src + 3] + weights[:, num_src + 3 : num_src + 4]
+
+
+def clear_rbf_cache() -> None:
+    """Clear the cached kernel factorizations and weights."""
+    _factor_cache.clear()
+    _weights_cache.clear()
+
+    logger.debug("Clear RBF cache")
+
+
+def _wendland(r: np.ndarray, kernel: str) -> np.ndarray:
+    """Evaluate the Wendland function at the distances normalized by the support radius.
+
+    Args:
+        r (np.ndarray): The normalized distances, zero beyond 1.0.
+        kernel (str): KERNEL_WENDLAND_C2 or KERNEL_WENDLAND_C4.
+
+    Returns:
+        np.ndarray: The function values.
+    """
+    r = np.minimum(r, 1.0)
+
+    if kernel == KERNEL_WENDLAND_C2:
+        return (1.0 - r) ** 4 * (4.0 * r + 1.0)
+    elif kernel == KERNEL_WENDLAND_C4:
+        return (1.0 - r) ** 6 * (35.0 * r**2 + 18.0 * r + 3.0) / 3.0
+
+    raise ValueError(f"Unknown RBF kernel: {kernel}. Must be one of {KERNELS}.")
+
+
+def _get_points_hash(points: np.ndarray, salt: str = "") -> str:
+    """Get the hash of the points for the RBF cache.
+
+    Args:
+        points (np.ndarray): The points.
+        salt (str): The extra string hashed with the points, such as the kernel settings.
+
+    Returns:
+        str: The hash.
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+
+    hasher = hashlib.sha1()
+    hasher.update(f"{points.shape}:{salt}".encode())
+    hasher.update(points.tobytes())
+
+    return hasher.hexdigest()
 
 
 class IndexQueryMethod:
@@ -0,0 +1,252 @@
+"""
+SkinCluster weight array functions.
+
+The weights are handled as numpy arrays of shape (num_components, num_influences)
+and are read and written in bulk through the skinWeights plugin commands.
+"""
+
+from collections.abc import Sequence
+from logging import getLogger
+from typing import Optional
+
+import maya.cmds as cmds
+import numpy as np
+
+from . import lib_skinCluster
+
+logger = getLogger(__name__)
+
+# Weights below this value are treated as zero when dividing.
+WEIGHT_EPSILON = 1e-5
+
+
+def get_weights(skinCluster: str, components: Sequence[str]) -> np.ndarray:
+    """Get the skin weights of the components as an array.
+
+    Notes:
+        - The rows follow the component order of the merged selection, same as set_weights with the same components.
+
+    Args:
+        skinCluster (str): The skinCluster node.
+        components (Sequence[str]): The components of a single geometry bound to the skinCluster.
+
+    Returns:
+        np.ndarray: The skin weights. Shape is (num_components, num_influences).
+    """
+    _validate_skinCluster(skinCluster)
+
+    if not components:
+        cmds.error("No components specified")
+
+    lib_skinCluster.load_skinWeights_plugin()
+
+    num_infs = len(cmds.skinCluster(skinCluster, query=True, influence=True))
+    weights = cmds.skinWeightExport(skinCluster, components=list(components))
+    if not weights:
+        cmds.error(f"Failed to get skin weights: {skinCluster}")
+
+    logger.debug(f"Get skin weights array: {skinCluster}")
+
+    return np.asarray(weights, dtype=np.float64).reshape(-1, num_infs)
+
+
+def set_weights(skinCluster: str, components: Sequence[str], weights: np.ndarray) -> None:
+    """Set the skin weights of the components with a single undoable command.
+
+    Args:
+        skinCluster (str): The skinCluster node.
+        components (Sequence[str]): The components of a single geometry bound to the skinCluster.
+        weights (np.ndarray): The skin weights. Shape is (num_components, num_influences).
+    """
+    _validate_skinCluster(skinCluster)
+
+    if not components:
+        cmds.error("No components specified")
+
+    lib_skinCluster.load_skinWeights_plugin()
+
+    cmds.skinWeightImport(skinCluster, components=list(components), weights=np.asarray(weights, dtype=np.float64).ravel().tolist())
+
+    logger.debug(f"Set skin weights array: {skinCluster}")
+
+
+def get_component_names(shape: str, indices: Sequence[int], component: str = "vtx") -> list[str]:
+    """Get the component names of the indices compressed into ranges.
+
+    Notes:
+        - The indices are sorted and made unique, get_weights and set_weights rows follow the ascending index order.
+
+    Args:
+        shape (str): The shape node.
+        indices (Sequence[int]): The component indices.
+        component (str): The single indexed component name. Defaults to 'vtx'.
+
+    Returns:
+        list[str]: The component names. e.g. ['pSphereShape1.vtx[0:5]', 'pSphereShape1.vtx[8]']
+    """
+    indices = np.unique(np.asarray(indices, dtype=np.int64))
+    if not len(indices):
+        return []
+
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    starts = indices[np.r_[0, breaks + 1]]
+    ends = indices[np.r_[breaks, len(indices) - 1]]
+
+    return [f"{shape}.{component}[{start}:{end}]" if start != end else f"{shape}.{component}[{start}]" for start, end in zip(starts, ends)]
+
+
+def get_lock_mask(skinCluster: str) -> np.ndarray:
+    """Get the lock status of the influences.
+
+    Args:
+        skinCluster (str): The skinCluster node.
+
+    Returns:
+        np.ndarray: True for the locked influences. Shape is (num_influences,).
+    """
+    _validate_skinCluster(skinCluster)
+
+    infs = cmds.skinCluster(skinCluster, query=True, influence=True)
+
+    return np.array([bool(cmds.getAttr(f"{inf}.lockInfluenceWeights")) for inf in infs], dtype=bool)
+
+
+def get_influence_permutation(src_infs: Sequence[str], dst_infs: Sequence[str]) -> np.ndarray:
+    """Get the source column index of each destination influence.
+
+    Args:
+        src_infs (Sequence[str]): The source influences.
+        dst_infs (Sequence[str]): The destination influences.
+
+    Returns:
+        np.ndarray: The source column indices. -1 for the destination influences not in the source.
+    """
+    src_index = {inf: i for i, inf in enumerate(src_infs)}
+
+    return np.array([src_index.get(inf, -1) for inf in dst_infs], dtype=np.int64)
+
+
+def permute_influences(weights: np.ndarray, permutation: np.ndarray) -> np.ndarray:
+    """Reorder the influence columns of the weights.
+
+    Args:
+        weights (np.ndarray): The weights. Shape is (num_components, num_src_influences).
+        permutation (np.ndarray): The source column index of each destination influence. See get_influence_permutation.
+
+    Returns:
+        np.ndarray: The reordered weights. Shape is (num_components, num_dst_influences).
+    """
+    result = np.zeros((weights.shape[0], len(permutation)), dtype=np.float64)
+    valid = permutation >= 0
+    result[:, valid] = weights[:, permutation[valid]]
+
+    return result
+
+
+def normalize_weights(weights: np.ndarray) -> np.ndarray:
+    """Normalize the weights of each component.
+
+    Notes:
+        - Components whose total weight is zero are left unchanged.
+
+    Args:
+        weights (np.ndarray): The weights. Shape is (num_components, num_influences).
+
+    Returns:
+        np.ndarray: The normalized weights.
+    """
+    totals = weights.sum(axis=1, keepdims=True)
+
+    return np.divide(weights, totals, out=weights.copy(), where=totals > 0.0)
+
+
+def adjust_unlocked_weights(new_weights: np.ndarray, original_weights: np.ndarray, unlocked_mask: np.ndarray) -> np.ndarray:
+    """Adjust the weights so that only the unlocked influences are modified.
+
+    Notes:
+        - The locked influences keep their original weights.
+        - If the new unlocked total exceeds the original unlocked total, the new unlocked weights are scaled down to fit.
+          Otherwise, the remaining amount is distributed in proportion to the original unlocked weights.
+        - Components whose original or new unlocked total is almost zero keep their original weights.
+
+    Args:
+        new_weights (np.ndarray): The new weights. Shape is (num_components, num_influences).
+        original_weights (np.ndarray): The original weights. Shape is (num_components, num_influences).
+        unlocked_mask (np.ndarray): True for the unlocked influences. Shape is (num_influences,).
+
+    Returns:
+        np.ndarray: The adjusted weights.
+    """
+    unlocked_mask = np.asarray(unlocked_mask, dtype=bool)
+    before_totals = original_weights[:, unlocked_mask].sum(axis=1, keepdims=True)
+    new_totals = new_weights[:, unlocked_mask].sum(axis=1, keepdims=True)
+
+    keep = (before_totals < WEIGHT_EPSILON) | (new_totals < WEIGHT_EPSILON)
+    safe_before = np.where(keep, 1.0, before_totals)
+    safe_new = np.where(keep, 1.0, new_totals)
+
+    scaled = new_weights * (before_totals / safe_new)
+    distributed = (before_totals - new_totals) * (original_weights / safe_before) + new_weights
+    unlocked = np.where(before_totals < new_totals, scaled, distributed)
+
+    result = original_weights.copy()
+    update = ~keep[:, 0]
+    result[np.ix_(update, unlocked_mask)] = unlocked[np.ix_(update, unlocked_mask)]
+
+    return result
+
+
+def prune_weights(weights: np.ndarray, threshold: float, locked_mask: Optional[np.ndarray] = None) -> tuple[np.ndarray, int, float]:
+    """Prune the weights below the threshold and renormalize the components.
+
+    Notes:
+        - The locked influences are never pruned and keep their weights.
+          The pruned amount is redistributed to the remaining unlocked influences of the component.
+        - Components whose unlocked influences would all be pruned are left unchanged.
+
+    Args:
+        weights (np.ndarray): The weights. Shape is (num_components, num_influences).
+        threshold (float): The weights below this value are pruned.
+        locked_mask (Optional[np.ndarray]): True for the locked influences. Defaults to None (no locked influences).
+
+    Returns:
+        tuple[np.ndarray, int, float]: The pruned weights, the number of pruned entries and the maximum weight change.
+    """
+    if locked_mask is None:
+        locked_mask = np.zeros(weights.shape[1], dtype=bool)
+
+    unlocked_mask = ~np.asarray(locked_mask, dtype=bool)
+    prune_mask = (weights > 0.0) & (weights < threshold) & unlocked_mask
+
+    pruned = np.where(prune_mask, 0.0, weights)
+    unlocked_totals = pruned[:, unlocked_mask].sum(axis=1)
+    locked_totals = weights[:, ~unlocked_mask].sum(axis=1)
+
+    # Scale the remaining unlocked weights to fill the room left by the locked influences
+    valid = prune_mask.any(axis=1) & (unlocked_totals > 0.0)
+    scales = np.divide(1.0 - locked_totals, unlocked_totals, out=np.ones_like(unlocked_totals), where=valid)
+    scales = np.maximum(scales, 0.0)
+
+    result = weights.copy()
+    result[np.ix_(valid, unlocked_mask)] = pruned[np.ix_(valid, unlocked_mask)] * scales[valid, np.newaxis]
+
+    num_pruned = int(prune_mask[valid].sum())
+    max_delta = float(np.abs(result - weights).max()) if result.size else 0.0
+
+    return result, num_pruned, max_delta
+
+
+def _validate_skinCluster(skinCluster: str) -> None:
+    """Validate the skinCluster node.
+
+    Args:
+        skinCluster (str): The skinCluster node.
+    """
+    if not skinCluster:
+        raise ValueError("No skinCluster node specified")
+
+    if not cmds.objExists(skinCluster):
+        cmds.error(f"Node does not exist: {skinCluster}")
+
+    if cmds.nodeType(skinCluster) != "skinCluster":
+        cmds.error(f"Node is not a skinCluster: {skinCluster}")
@@ -0,0 +1,224 @@
+"""
+Symmetry maps of deformable shapes.
+
+A symmetry map associates each component with its mirrored location across the YZ plane,
+so that per-component values such as skin weights can be mirrored with an array gather.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+from logging import getLogger
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .lib_mesh_topology import get_closest_points_on_triangles
+
+logger = getLogger(__name__)
+
+# Maximum distance between a mirrored position and a component to treat them as symmetric.
+MIRROR_TOLERANCE = 1e-3
+
+# Number of symmetry maps kept in the cache.
+CACHE_SIZE = 16
+
+_symmetry_map_cache: OrderedDict[str, "SymmetryMap"] = OrderedDict()
+
+
+@dataclass
+class SymmetryMap:
+    """Symmetry map of a shape.
+
+    Each component is mirrored from up to three source components blended with the weights.
+    Symmetric components use a single source with the weight 1.0,
+    the others fall back to the barycentric coordinates of the closest point, or the nearest component.
+    """
+
+    fingerprint: str
+    positions: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    num_fallback: int
+
+    def mirror(self, values: np.ndarray) -> np.ndarray:
+        """Get the values at the mirrored location of each component.
+
+        Args:
+            values (np.ndarray): The per-component values. Shape is (num_components, ...).
+
+        Returns:
+            np.ndarray: The mirrored values. Same shape as the values.
+        """
+        return np.einsum("nk,nk...->n...", self.weights, values[self.indices])
+
+    def get_side_mask(self, side: int, tolerance: float = MIRROR_TOLERANCE) -> np.ndarray:
+        """Get the components on a side of the YZ plane.
+
+        Args:
+            side (int): 1 for the positive X side, -1 for the negative X side.
+            tolerance (float): The components within this distance from the plane belong to neither side.
+
+        Returns:
+            np.ndarray: True for the components on the side. Shape is (num_components,).
+        """
+        return self.positions[:, 0] * np.sign(side) > tolerance
+
+
+def build_symmetry_map(positions: np.ndarray, tolerance: float = MIRROR_TOLERANCE, fingerprint: str = "") -> SymmetryMap:
+    """Build the symmetry map of the positions.
+
+    Notes:
+        - Components without a component within the tolerance of their mirrored position use the nearest component.
+
+    Args:
+        positions (np.ndarray): The component positions. Shape is (num_components, 3).
+        tolerance (float): The maximum distance to treat two components as symmetric.
+        fingerprint (str): The fingerprint stored in the map.
+
+    Returns:
+        SymmetryMap: The symmetry map.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    mirrored = positions * np.array([-1.0, 1.0, 1.0])
+
+    distances, nearest = cKDTree(positions).query(mirrored, workers=-1)
+
+    indices = np.repeat(nearest[:, np.newaxis], 3, axis=1)
+    weights = np.zeros((len(positions), 3), dtype=np.float64)
+    weights[:, 0] = 1.0
+
+    return SymmetryMap(
+        fingerprint=fingerprint,
+        positions=positions,
+        indices=indices,
+        weights=weights,
+        num_fallback=int(np.count_nonzero(distances > tolerance)),
+    )
+
+
+def get_symmetry_map(shape: str, tolerance: float = MIRROR_TOLERANCE) -> SymmetryMap:
+    """Get the symmetry map of the shape from its rest positions.
+
+    Notes:
+        - The map is cached by a fingerprint of the topology and the rest positions,
+          so repeated calls on the same geometry only read the shape.
+        - Mesh vertices without a symmetric vertex fall back to the barycentric coordinates
+          of the closest point on the mirrored side. Other shapes fall back to the nearest component.
+
+    Args:
+        shape (str): The deformable shape.
+        tolerance (float): The maximum distance to treat two components as symmetric.
+
+    Returns:
+        SymmetryMap: The symmetry map.
+    """
+    if not cmds.objExists(shape):
+        raise ValueError(f"Node does not exist: {shape}")
+
+    if "deformableShape" not in cmds.nodeType(shape, inherited=True):
+        raise ValueError(f"Node is not a deformable shape: {shape}")
+
+    rest_shape = _get_rest_shape(shape)
+    if cmds.nodeType(rest_shape) == "mesh":
+        selection_list = om.MSelectionList()
+        selection_list.add(rest_shape)
+        dag_path = selection_list.getDagPath(0)
+        mesh_fn = om.MFnMesh(dag_path)
+        positions = np.array(mesh_fn.getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
+        counts, connects = mesh_fn.getVertices()
+        topology = [np.array(counts, dtype=np.int64), np.array(connects, dtype=np.int64)]
+    else:
+        positions = np.array(cmds.xform(f"{rest_shape}.cp[*]", q=True, ws=True, t=True), dtype=np.float64).reshape(-1, 3)
+        topology = [np.array([len(positions)], dtype=np.int64)]
+
+    fingerprint = _get_fingerprint(cmds.nodeType(rest_shape), topology, positions, tolerance)
+    if fingerprint in _symmetry_map_cache:
+        _symmetry_map_cache.move_to_end(fingerprint)
+        logger.debug(f"Use cached symmetry map: {shape}")
+        return _symmetry_map_cache[fingerprint]
+
+    symmetry_map = build_symmetry_map(positions, tolerance=tolerance, fingerprint=fingerprint)
+    if symmetry_map.num_fallback and cmds.nodeType(rest_shape) == "mesh":
+        _, triangle_vertices = mesh_fn.getTriangles()
+        _set_barycentric_fallback(symmetry_map, np.array(triangle_vertices, dtype=np.int64).reshape(-1, 3), tolerance)
+
+    _symmetry_map_cache[fingerprint] = symmetry_map
+    while len(_symmetry_map_cache) > CACHE_SIZE:
+        _symmetry_map_cache.popitem(last=False)
+
+    logger.debug(f"Build symmetry map: {shape} ({symmetry_map.num_fallback} fallback components)")
+
+    return symmetry_map
+
+
+def clear_symmetry_map_cache() -> None:
+    """Clear the cached symmetry maps."""
+    _symmetry_map_cache.clear()
+
+    logger.debug("Clear symmetry map cache")
+
+
+def _set_barycentric_fallback(symmetry_map: SymmetryMap, triangles: np.ndarray, tolerance: float) -> None:
+    """Set the barycentric fallback of the mesh vertices without a symmetric vertex.
+
+    Notes:
+        - The closest points of all the fallback vertices are queried at once on the rest triangles.
+
+    Args:
+        symmetry_map (SymmetryMap): The symmetry map to update.
+        triangles (np.ndarray): The vertex indices of the rest mesh triangles. Shape is (num_triangles, 3).
+        tolerance (float): The maximum distance to treat two vertices as symmetric.
+    """
+    if not len(triangles):
+        return
+
+    positions = symmetry_map.positions
+    mirrored = positions * np.array([-1.0, 1.0, 1.0])
+    fallback = np.flatnonzero(np.linalg.norm(positions[symmetry_map.indices[:, 0]] - mirrored, axis=1) > tolerance)
+
+    triangle_ids, weights, _ = get_closest_points_on_triangles(mirrored[fallback], positions, triangles)
+
+    symmetry_map.indices[fallback] = triangles[triangle_ids]
+    symmetry_map.weights[fallback] = weights
+
+
+def _get_rest_shape(shape: str) -> str:
+    """Get the original shape of the deformed shape.
+
+    Args:
+        shape (str): The deformable shape.
+
+    Returns:
+        str: The original shape, or the shape itself if it is not deformed.
+    """
+    original_geometry = cmds.deformableShape(shape, originalGeometry=True)
+    if original_geometry and original_geometry[0]:
+        orig_shape = original_geometry[0].split(".")[0]
+        if cmds.objExists(orig_shape):
+            return orig_shape
+
+    return shape
+
+
+def _get_fingerprint(shape_type: str, topology: list[np.ndarray], positions: np.ndarray, tolerance: float) -> str:
+    """Get the fingerprint of the shape for the symmetry map cache.
+
+    Args:
+        shape_type (str): The shape node type.
+        topology (list[np.ndarray]): The topology arrays of the shape.
+        positions (np.ndarray): The rest positions.
+        tolerance (float): The symmetry tolerance.
+
+    Returns:
+        str: The fingerprint.
+    """
+    hasher = hashlib.sha1()
+    hasher.update(f"{shape_type}:{tolerance}".encode())
+    for array in topology:
+        hasher.update(np.ascontiguousarray(array).tobytes())
+    hasher.update(np.ascontiguousarray(positions).tobytes())
+
+    return hasher.hexdigest()
@@ -1,14 +1,20 @@
 """Convert skinCluster to mesh."""
 
-import itertools
 from logging import getLogger
 
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import numpy as np
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
 
-from ..lib import lib_skinCluster
+from ..lib import lib_skinWeights
 
 logger = getLogger(__name__)
 
+# Distance relative to the source bounding box to match the preview vertices with the subdivided points.
+MATCH_TOLERANCE = 1e-4
+
 
 class SkinClusterToMesh:
     """Convert skinCluster to mesh.
@@ -70,53 +76,319 @@ class SkinClusterToMesh:
     def convert(self) -> str:
         """Convert the skinCluster to mesh.
 
+        Notes:
+            - The converted weights are the source weights interpolated by the stencil of the preview mesh.
+              See get_stencil.
+
         Returns:
             str: The converted mesh.
         """
         # Create reference mesh
         preview_geometry, _ = self.preview()
+        preview_shape = cmds.listRelatives(preview_geometry, shapes=True, fullPath=True)[0]
 
-        # Create temporary influences
-        infs = cmds.skinCluster(self.skinCluster, q=True, inf=True)
-
-        tmp_infs = []
-        for inf in infs:
-            tmp_inf = cmds.createNode("joint", ss=True)
-            cmds.xform(tmp_inf, ws=True, t=cmds.xform(inf, q=True, ws=True, t=True))
-
-            tmp_infs.append(tmp_inf)
-
-        lib_skinCluster.exchange_influences(self.skinCluster, infs, tmp_infs)
-
-        # Get the skinCluster weights
-        default_positions = cmds.xform(f"{preview_geometry}.vtx[*]", q=True, ws=True, t=True)[1::3]
-        vtx_num = len(default_positions)
-
-        weights = []
-        for inf in tmp_infs:
-            cmds.move(1.0, inf, r=True, y=True)
-            moved_positions = cmds.xform(f"{preview_geometry}.vtx[*]", q=True, ws=True, t=True)[1::3]
-            weights.append([moved_positions[i] - default_positions[i] for i in range(vtx_num)])
-            cmds.move(-1.0, inf, r=True, y=True)
+        # Interpolate the skinCluster weights
+        stencil = self.get_stencil(preview_shape)
+        src_weights = lib_skinWeights.get_weights(self.skinCluster, [f"{self.geometry}.cp[*]"])
+        if stencil.shape[1] != len(src_weights):
+            cmds.error(f"Stencil does not match the skin weights: {stencil.shape[1]} != {len(src_weights)}")
 
-        weights = list(itertools.chain(*zip(*weights)))
+        weights = lib_skinWeights.normalize_weights(np.asarray(stencil @ src_weights))
 
         # Create the mesh
+        infs = cmds.skinCluster(self.skinCluster, q=True, inf=True)
         convert_mesh = cmds.duplicate(preview_geometry, n=f"{self.geometry}_converted")[0]
         convert_skinCluster = cmds.skinCluster(infs, convert_mesh, tsb=True)[0]
 
         # Set the skinCluster weights
-        cmds.setAttr(f"{convert_skinCluster}.nw", False)
-        lib_skinCluster.set_skin_weights_custom(convert_skinCluster, weights, [f"{convert_mesh}.vtx[*]"])
-        cmds.setAttr(f"{convert_skinCluster}.nw", True)
+        convert_infs = cmds.skinCluster(convert_skinCluster, q=True, inf=True)
+        weights = lib_skinWeights.permute_influences(weights, lib_skinWeights.get_influence_permutation(infs, convert_infs))
+        lib_skinWeights.set_weights(convert_skinCluster, [f"{convert_mesh}.vtx[*]"], weights)
 
         # Clean up
-        lib_skinCluster.exchange_influences(self.skinCluster, tmp_infs, infs)
-        cmds.delete(tmp_infs, preview_geometry)
-
-        # Normalize the weights
-        cmds.skinPercent(convert_skinCluster, f"{convert_mesh}.vtx[*]", nrm=True)
+        cmds.delete(preview_geometry)
 
         logger.debug(f"Converted skinCluster to mesh: {convert_mesh}")
 
         return convert_mesh
+
+    def get_stencil(self, preview_shape: str) -> sp.csr_matrix:
+        """Get the interpolation of the preview mesh vertices from the source components.
+
+        Notes:
+            - Mesh: The Catmull-Clark subdivision stencil. Preview vertices that do not match a subdivided point
+              fall back to the barycentric coordinates of the closest point on the source mesh.
+            - NurbsSurface: The basis functions of the surface at the closest parameters of the preview vertices.
+
+        Args:
+            preview_shape (str): The preview mesh shape.
+
+        Returns:
+            sp.csr_matrix: The stencil. Shape is (num_preview_vertices, num_source_components).
+        """
+        preview_points = np.array(om.MFnMesh(_get_dag_path(preview_shape)).getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
+
+        if self.geometry_type == "mesh":
+            stencil = self._get_mesh_stencil(preview_points)
+        else:
+            stencil = self._get_nurbsSurface_stencil(preview_points)
+
+        logger.debug(f"Computed stencil: {self.geometry} ({stencil.shape[0]} x {stencil.shape[1]})")
+
+        return stencil
+
+    def _get_mesh_stencil(self, preview_points: np.ndarray) -> sp.csr_matrix:
+        """Get the stencil of the subdivided source mesh.
+
+        Args:
+            preview_points (np.ndarray): The preview mesh points. Shape is (num_preview_vertices, 3).
+
+        Returns:
+            sp.csr_matrix: The stencil. Shape is (num_preview_vertices, num_source_vertices).
+        """
+        dag_path = _get_dag_path(self.geometry)
+        mesh_fn = om.MFnMesh(dag_path)
+        src_points = np.array(mesh_fn.getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
+        counts, connects = mesh_fn.getVertices()
+
+        subdivision_stencil = catmull_clark_stencil(
+            np.array(counts, dtype=np.int64), np.array(connects, dtype=np.int64), len(src_points), self.divisions
+        )
+
+        # Match the preview vertices with the subdivided points
+        distances, rows = cKDTree(subdivision_stencil @ src_points).query(preview_points, workers=-1)
+        tolerance = MATCH_TOLERANCE * max(float(np.linalg.norm(np.ptp(src_points, axis=0))), 1.0)
+        unmatched = np.flatnonzero(distances > tolerance)
+        if not len(unmatched):
+            return subdivision_stencil[rows]
+
+        logger.debug(f"Preview vertices not matching the subdivided points: {len(unmatched)}")
+
+        stencil = subdivision_stencil[rows].tocoo()
+        keep = ~np.isin(stencil.row, unmatched)
+        fallback_rows = []
+        fallback_cols = []
+        fallback_data = []
+
+        mesh_intersector = om.MMeshIntersector()
+        mesh_intersector.create(dag_path.node(), dag_path.inclusiveMatrix())
+        for index in unmatched:
+            point_on_mesh = mesh_intersector.getClosestPoint(om.MPoint(*preview_points[index]))
+            u, v = point_on_mesh.barycentricCoords
+
+            fallback_rows.extend([index] * 3)
+            fallback_cols.extend(mesh_fn.getPolygonTriangleVertices(point_on_mesh.face, point_on_mesh.triangle))
+            fallback_data.extend([u, v, 1.0 - u - v])
+
+        return sp.csr_matrix(
+            (np.r_[stencil.data[keep], fallback_data], (np.r_[stencil.row[keep], fallback_rows], np.r_[stencil.col[keep], fallback_cols])),
+            shape=stencil.shape,
+        )
+
+    def _get_nurbsSurface_stencil(self, preview_points: np.ndarray) -> sp.csr_matrix:
+        """Get the stencil of the source nurbsSurface.
+
+        Notes:
+            - For periodic directions, the overlapping CVs are folded onto the CVs they repeat
+              when the skinCluster only holds the unique CVs.
+
+        Args:
+            preview_points (np.ndarray): The preview mesh points. Shape is (num_preview_vertices, 3).
+
+        Returns:
+            sp.csr_matrix: The stencil. Shape is (num_preview_vertices, num_source_cvs).
+        """
+        dag_path = _get_dag_path(self.geometry)
+        surface_fn = om.MFnNurbsSurface(dag_path)
+        matrix_inverse = dag_path.inclusiveMatrixInverse()
+
+        params = np.array(
+            [surface_fn.closestPoint(om.MPoint(*point) * matrix_inverse, space=om.MSpace.kObject)[1:3] for point in preview_points], dtype=np.float64
+        )
+
+        num_u = surface_fn.numCVsInU
+        num_v = surface_fn.numCVsInV
+        basis_u = bspline_basis(params[:, 0], np.array(surface_fn.knotsInU(), dtype=np.float64), surface_fn.degreeInU, num_u)
+        basis_v = bspline_basis(params[:, 1], np.array(surface_fn.knotsInV(), dtype=np.float64), surface_fn.degreeInV, num_v)
+
+        # Rational basis, the CVs are ordered with V changing fastest
+        cv_weights = np.array([point.w for point in surface_fn.cvPositions()], dtype=np.float64).reshape(num_u, num_v)
+        basis = np.einsum("pi,pj,ij->pij", basis_u, basis_v, cv_weights)
+        basis /= basis.sum(axis=(1, 2), keepdims=True)
+
+        # Fold the overlapping CVs of the periodic directions
+        num_cvs = cmds.getAttr(f"{self.skinCluster}.weightList", size=True)
+        unique_u = num_u - surface_fn.degreeInU if surface_fn.formInU == om.MFnNurbsSurface.kPeriodic else num_u
+        unique_v = num_v - surface_fn.degreeInV if surface_fn.formInV == om.MFnNurbsSurface.kPeriodic else num_v
+        if num_cvs == num_u * num_v:
+            unique_u, unique_v = num_u, num_v
+
+        cv_u, cv_v = np.meshgrid(np.arange(num_u) % unique_u, np.arange(num_v) % unique_v, indexing="ij")
+        columns = (cv_u * unique_v + cv_v).ravel()
+
+        rows = np.repeat(np.arange(len(preview_points)), num_u * num_v)
+        stencil = sp.csr_matrix((basis.ravel(), (rows, np.tile(columns, len(preview_points)))), shape=(len(preview_points), unique_u * unique_v))
+        stencil.eliminate_zeros()
+
+        return stencil
+
+
+def catmull_clark_stencil(counts: np.ndarray, connects: np.ndarray, num_vertices: int, levels: int) -> sp.csr_matrix:
+    """Get the Catmull-Clark subdivision stencil of a polygon mesh.
+
+    Notes:
+        - The subdivided points are ordered as the vertex points, the edge points and the face points of each level.
+        - Boundary edges and vertices follow the cubic B-spline curve rule, and vertices of a single face are kept as corners.
+
+    Args:
+        counts (np.ndarray): The number of vertices of each polygon.
+        connects (np.ndarray): The vertex indices of the polygons.
+        num_vertices (int): The number of vertices.
+        levels (int): The number of subdivision levels.
+
+    Returns:
+        sp.csr_matrix: The stencil. Shape is (num_subdivided_points, num_vertices).
+    """
+    stencil = sp.identity(num_vertices, dtype=np.float64, format="csr")
+    for _ in range(levels):
+        level_stencil, counts, connects = _catmull_clark_level(counts, connects, stencil.shape[0])
+        stencil = (level_stencil @ stencil).tocsr()
+
+    return stencil
+
+
+def _catmull_clark_level(counts: np.ndarray, connects: np.ndarray, num_vertices: int) -> tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+    """Subdivide a polygon mesh once.
+
+    Args:
+        counts (np.ndarray): The number of vertices of each polygon.
+        connects (np.ndarray): The vertex indices of the polygons.
+        num_vertices (int): The number of vertices.
+
+    Returns:
+        tuple[sp.csr_matrix, np.ndarray, np.ndarray]: The stencil of the subdivided points from the vertices,
+            and the counts and connects of the subdivided quads.
+    """
+    num_faces = len(counts)
+    face_ids = np.repeat(np.arange(num_faces), counts)
+
+    # The previous and next face vertex of each face vertex, wrapping around each polygon
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    ends = np.repeat(np.cumsum(counts) - 1, counts)
+    positions = np.arange(len(connects))
+    next_positions = np.where(positions == ends, starts, positions + 1)
+    prev_positions = np.where(positions == starts, ends, positions - 1)
+
+    # Edge of each face vertex to the next face vertex
+    edges, edge_ids = np.unique(np.sort(np.column_stack([connects, connects[next_positions]]), axis=1), axis=0, return_inverse=True)
+    edge_ids = edge_ids.ravel()
+    num_edges = len(edges)
+
+    edge_face_counts = np.bincount(edge_ids, minlength=num_edges)
+    boundary_edges = edge_face_counts == 1
+
+    # Face points
+    face_stencil = sp.csr_matrix((1.0 / counts[face_ids], (face_ids, connects)), shape=(num_faces, num_vertices))
+
+    # Edge points
+    edge_rows = np.repeat(np.arange(num_edges), 2)
+    midpoint_stencil = sp.csr_matrix((np.full(num_edges * 2, 0.5), (edge_rows, edges.ravel())), shape=(num_edges, num_vertices))
+    edge_faces = sp.csr_matrix((1.0 / edge_face_counts[edge_ids], (edge_ids, face_ids)), shape=(num_edges, num_faces))
+    interior_edge_stencil = 0.5 * midpoint_stencil + 0.5 * (edge_faces @ face_stencil)
+    edge_stencil = (
+        sp.diags(boundary_edges.astype(np.float64)) @ midpoint_stencil + sp.diags((~boundary_edges).astype(np.float64)) @ interior_edge_stencil
+    )
+
+    # Vertex points
+    vertex_face_counts = np.bincount(connects, minlength=num_vertices)
+    vertex_faces = sp.csr_matrix((np.ones(len(connects)), (connects, face_ids)), shape=(num_vertices, num_faces))
+    vertex_edges = sp.csr_matrix((np.ones(num_edges * 2), (edges.ravel(), edge_rows)), shape=(num_vertices, num_edges))
+    valences = np.asarray(vertex_edges.sum(axis=1)).ravel()
+
+    safe_face_counts = np.maximum(vertex_face_counts, 1)
+    safe_valences = np.maximum(valences, 1)
+    average_faces = sp.diags(1.0 / safe_face_counts) @ vertex_faces @ face_stencil
+    average_midpoints = sp.diags(1.0 / safe_valences) @ vertex_edges @ midpoint_stencil
+    interior_vertex_stencil = sp.diags(1.0 / safe_valences) @ (average_faces + 2.0 * average_midpoints) + sp.diags((valences - 3.0) / safe_valences)
+
+    boundary_vertex_edges = vertex_edges @ sp.diags(boundary_edges.astype(np.float64))
+    boundary_valences = np.asarray(boundary_vertex_edges.sum(axis=1)).ravel()
+    boundary_neighbors = sp.diags(1.0 / np.maximum(boundary_valences, 1)) @ boundary_vertex_edges @ (2.0 * midpoint_stencil)
+    boundary_neighbors = boundary_neighbors - sp.diags(np.ones(num_vertices))
+    boundary_vertex_stencil = 0.75 * sp.identity(num_vertices) + 0.25 * boundary_neighbors
+
+    is_boundary = boundary_valences > 0
+    is_corner = is_boundary & (vertex_face_counts == 1)
+    is_interior = ~is_boundary & (vertex_face_counts > 0)
+    is_smooth_boundary = is_boundary & ~is_corner
+    vertex_stencil = (
+        sp.diags(is_interior.astype(np.float64)) @ interior_vertex_stencil
+        + sp.diags(is_smooth_boundary.astype(np.float64)) @ boundary_vertex_stencil
+        + sp.diags((~is_interior & ~is_smooth_boundary).astype(np.float64))
+    )
+
+    level_stencil = sp.vstack([vertex_stencil, edge_stencil, face_stencil]).tocsr()
+    level_stencil.eliminate_zeros()
+
+    # Quads of each face vertex
+    quad_connects = np.column_stack(
+        [connects, num_vertices + edge_ids, np.full(len(connects), num_vertices + num_edges) + face_ids, num_vertices + edge_ids[prev_positions]]
+    ).ravel()
+    quad_counts = np.full(len(connects), 4, dtype=np.int64)
+
+    return level_stencil, quad_counts, quad_connects
+
+
+def bspline_basis(params: np.ndarray, knots: np.ndarray, degree: int, num_cvs: int) -> np.ndarray:
+    """Get the B-spline basis functions at the parameters.
+
+    Notes:
+        - The knots are in Maya's form, without the first and last knots of the full knot vector.
+
+    Args:
+        params (np.ndarray): The parameters. Shape is (num_params,).
+        knots (np.ndarray): The knots. Shape is (num_cvs + degree - 1,).
+        degree (int): The degree.
+        num_cvs (int): The number of CVs.
+
+    Returns:
+        np.ndarray: The basis function values. Shape is (num_params, num_cvs).
+    """
+    knots = np.r_[2.0 * knots[0] - knots[1], knots, 2.0 * knots[-1] - knots[-2]]
+    params = np.clip(params, knots[degree], knots[num_cvs])
+
+    # Degree 0, the last span is closed at the end of the domain
+    spans = np.clip(np.searchsorted(knots, params, side="right") - 1, degree, num_cvs - 1)
+    basis = np.zeros((len(params), len(knots) - 1), dtype=np.float64)
+    basis[np.arange(len(params)), spans] = 1.0
+
+    for p in range(1, degree + 1):
+        left_denoms = knots[p : p + basis.shape[1] - 1] - knots[: basis.shape[1] - 1]
+        right_denoms = knots[p + 1 : p + basis.shape[1]] - knots[1 : basis.shape[1]]
+        left = np.divide(
+            params[:, None] - knots[None, : basis.shape[1] - 1], left_denoms, out=np.zeros((len(params), basis.shape[1] - 1)), where=left_denoms > 0
+        )
+        right = np.divide(
+            knots[None, p + 1 : p + basis.shape[1]] - params[:, None],
+            right_denoms,
+            out=np.zeros((len(params), basis.shape[1] - 1)),
+            where=right_denoms > 0,
+        )
+        basis = left * basis[:, :-1] + right * basis[:, 1:]
+
+    return basis[:, :num_cvs]
+
+
+def _get_dag_path(node: str) -> om.MDagPath:
+    """Get the DAG path of the node.
+
+    Args:
+        node (str): The DAG node.
+
+    Returns:
+        om.MDagPath: The DAG path.
+    """
+    selection_list = om.MSelectionList()
+    selection_list.add(node)
+
+    return selection_list.getDagPath(0)
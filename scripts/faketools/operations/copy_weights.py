@@ -3,6 +3,7 @@
 from logging import getLogger
 import re
 
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 
 from ..lib import lib_skinCluster
@@ -114,12 +115,21 @@ def mirror_skin_weights(
 ) -> None:
     """Mirror the skin weights.
 
+    Notes:
+        - The components are associated with the cached symmetry map of the shape's rest positions.
+          See lib_symmetry.get_symmetry_map.
+        - The weights are gathered from the mirrored location, the influence columns are swapped with the
+          influence mirror table and the destination side is written in bulk. Components on the center are not changed.
+
     Args:
         obj (str): The transform object.
         left_right_names (list[str, str]): The left and right names. 0 is regex, 1 is replace.
         right_left_names (list[str, str]): The right and left names. 0 is regex, 1 is replace.
         mirrorInverse (bool, optional): Mirror the inverse weights. Defaults to False.
     """
+    # numpy and scipy are only required to mirror, the copy commands are loaded at startup without them
+    from ..lib import lib_skinWeights, lib_symmetry
+
     if not left_right_names or not right_left_names:
         raise ValueError("Invalid substitute names.")
 
@@ -144,49 +154,104 @@ def mirror_skin_weights(
 
     infs = cmds.skinCluster(skinCluster, q=True, inf=True)
 
-    not_exists_infs = []
-    replace_infs = []
+    mirror_table, not_exists_infs = get_influence_mirror_table(infs, left_right_names, right_left_names)
+    if not_exists_infs:
+        for inf, replace_inf in not_exists_infs:
+            logger.warning(f"Node does not exist: {replace_inf} ({inf})")
+        raise RuntimeError("Some nodes do not exist.")
+
+    bind_infs = list(dict.fromkeys(inf for inf in mirror_table.values() if inf not in infs))
+    if bind_infs:
+        cmds.skinCluster(skinCluster, e=True, lw=True, wt=0.0, ai=bind_infs)
+
+        logger.debug(f"Add new influences: {bind_infs}")
+
+        infs = cmds.skinCluster(skinCluster, q=True, inf=True)
+
+    # The mirrored influence of the added influences is the influence they were added for
+    for inf, replace_inf in list(mirror_table.items()):
+        mirror_table.setdefault(replace_inf, inf)
+
+    symmetry_map = lib_symmetry.get_symmetry_map(shp)
+    components = [f"{shp}.cp[*]"]
+    weights = lib_skinWeights.get_weights(skinCluster, components)
+    if len(weights) != len(symmetry_map.positions):
+        raise RuntimeError(f"Components do not match the skin weights: {shp}")
+
+    # Gather the weights at the mirrored location and swap the influence columns
+    permutation = lib_skinWeights.get_influence_permutation(infs, [mirror_table.get(inf, inf) for inf in infs])
+    mirrored_weights = lib_skinWeights.normalize_weights(lib_skinWeights.permute_influences(symmetry_map.mirror(weights), permutation))
+
+    dst_mask = symmetry_map.get_side_mask(1 if mirror_inverse else -1)
+    weights[dst_mask] = mirrored_weights[dst_mask]
+
+    lib_skinWeights.set_weights(skinCluster, components, weights)
+
+    logger.debug(f"Mirror skin weights: {obj}")
+
+
+def get_influence_mirror_table(
+    infs: list[str], left_right_names: list[str, str], right_left_names: list[str, str]
+) -> tuple[dict[str, str], list[list[str, str]]]:
+    """Get the mirrored influence of each influence.
+
+    Notes:
+        - The side of an influence is given by its world X position.
+        - Influences on the center, or whose name does not change, are mirrored to themselves.
+
+    Args:
+        infs (list[str]): The influences.
+        left_right_names (list[str, str]): The left and right names. 0 is regex, 1 is replace.
+        right_left_names (list[str, str]): The right and left names. 0 is regex, 1 is replace.
+
+    Returns:
+        tuple[dict[str, str], list[list[str, str]]]: The mirrored influence of each influence,
+            and the influences whose mirrored influence does not exist with the missing name.
+    """
     p_left = re.compile(left_right_names[0])
     p_right = re.compile(right_left_names[0])
 
-    for inf in infs:
-        pos = cmds.xform(inf, q=True, ws=True, t=True)
+    mirror_table = {}
+    not_exists_infs = []
+    for inf, pos in zip(infs, _get_world_positions(infs)):
         if pos[0] > 1e-3:
             replace_inf = p_left.sub(left_right_names[1], inf)
         elif pos[0] < -1e-3:
             replace_inf = p_right.sub(right_left_names[1], inf)
         else:
+            mirror_table[inf] = inf
             continue
 
         if replace_inf == inf:
             cmds.warning(f"No change in name: {inf}")
+            mirror_table[inf] = inf
         elif not cmds.objExists(replace_inf):
             not_exists_infs.append([inf, replace_inf])
         else:
-            replace_infs.append(replace_inf)
+            mirror_table[inf] = replace_inf
 
-    if not_exists_infs:
-        for inf, replace_inf in not_exists_infs:
-            logger.warning(f"Node does not exist: {replace_inf} ({inf})")
-        raise RuntimeError("Some nodes do not exist.")
+    return mirror_table, not_exists_infs
 
-    if replace_infs:
-        bind_infs = list(set(replace_infs) - set(infs))
-        if bind_infs:
-            cmds.skinCluster(skinCluster, e=True, lw=True, wt=0.0, ai=bind_infs)
 
-            logger.debug(f"Add new influences: {replace_infs}")
+def _get_world_positions(nodes: list[str]) -> list[list[float]]:
+    """Get the world positions of the transform nodes.
 
-    cmds.copySkinWeights(
-        ss=skinCluster,
-        ds=skinCluster,
-        mirrorInverse=mirror_inverse,
-        mirrorMode="YZ",
-        surfaceAssociation="closestPoint",
-        influenceAssociation=["label", "closestJoint"],
-    )
+    Args:
+        nodes (list[str]): The transform nodes.
 
-    logger.debug(f"Mirror skin weights: {obj}")
+    Returns:
+        list[list[float]]: The world positions.
+    """
+    selection_list = om.MSelectionList()
+    for node in nodes:
+        selection_list.add(node)
+
+    positions = []
+    for i in range(len(nodes)):
+        matrix = selection_list.getDagPath(i).inclusiveMatrix()
+        positions.append([matrix[12], matrix[13], matrix[14]])
+
+    return positions
 
 
 def mirror_skin_weights_with_objects(
@@ -237,29 +302,8 @@ def mirror_skin_weights_with_objects(
 
     infs = cmds.skinCluster(src_skinCluster, q=True, inf=True)
 
-    not_exists_infs = []
-    bind_infs = []
-    p_left = re.compile(left_right_names[0])
-    p_right = re.compile(right_left_names[0])
-
-    for inf in infs:
-        name_changed = True
-        pos = cmds.xform(inf, q=True, ws=True, t=True)
-        if pos[0] > 1e-3:
-            replace_inf = p_left.sub(left_right_names[1], inf)
-        elif pos[0] < -1e-3:
-            replace_inf = p_right.sub(right_left_names[1], inf)
-        else:
-            replace_inf = inf
-            name_changed = False
-
-        if replace_inf == inf and name_changed:
-            cmds.warning(f"No change in name: {inf}")
-            bind_infs.append(inf)
-        elif not cmds.objExists(replace_inf):
-            not_exists_infs.append([inf, replace_inf])
-        else:
-            bind_infs.append(replace_inf)
+    mirror_table, not_exists_infs = get_influence_mirror_table(infs, left_right_names, right_left_names)
+    bind_infs = list(dict.fromkeys(mirror_table.values()))
 
     if not_exists_infs:
         for inf, replace_inf in not_exists_infs:
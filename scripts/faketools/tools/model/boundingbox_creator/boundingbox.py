@@ -10,6 +10,17 @@ from scipy.spatial import ConvexHull
 
 logger = getLogger(__name__)
 
+# Number of projected coordinates evaluated at once when the candidate orientations are evaluated in chunks.
+CHUNK_ELEMENTS = 2**22
+
+# Number of hull vertices sampled to bound the candidate volumes from below when the hull is larger.
+BOUND_SAMPLE_SIZE = 2048
+
+# Initial rotation step of the local refinement in radians, halved until it falls below the tolerance.
+REFINE_INITIAL_ANGLE = np.radians(5.0)
+REFINE_ANGLE_TOLERANCE = 1e-6
+REFINE_MAX_ITERATIONS = 200
+
 
 class BoundingBox(ABC):
     """Abstract base class for bounding boxes."""
@@ -23,10 +34,12 @@ class BoundingBox(ABC):
         if not isinstance(points, (list, np.ndarray)):
             raise ValueError("Points must be a list or numpy array.")
 
-        if isinstance(points, list):
-            points = np.array(points)
+        try:
+            points = np.asarray(points, dtype=np.float64)
+        except ValueError:
+            raise ValueError("Points must be a list of 3-element lists or numpy arrays.") from None
 
-        if not all(isinstance(pt, (list, np.ndarray)) and len(pt) == 3 for pt in points):
+        if points.ndim != 2 or points.shape[1] != 3:
             raise ValueError("Points must be a list of 3-element lists or numpy arrays.")
 
         self._points = points
@@ -170,60 +183,194 @@ class WorldBoundingBox(BoundingBox):
 class MinimumBoundingBox(BoundingBox):
     """Class representing the bounding box with the minimum volume."""
 
-    def __init__(self, points: Union[list[list[float]], np.ndarray]):
+    def __init__(self, points: Union[list[list[float]], np.ndarray], refine: bool = False):
         """Initialize the MinimumBoundingBox with a list of points.
 
         Args:
             points (Union[list[list[float]], np.ndarray]): The list of points.
+            refine (bool): Refine the best hull face orientation with a local rotation search. Default is False.
         """
         super().__init__(points)
 
+        self._refine = refine
         self._volume, self._R, self._min_pt, self._max_pt = self._compute_minimum_bounding_box()
 
     def _compute_minimum_bounding_box(self):
         """Compute the minimum bounding box.
 
+        Notes:
+            - Each convex hull face gives a candidate orientation, with the face normal as the local Z axis.
+            - The extents only depend on the hull vertices, so the candidates are evaluated on them
+              with a batched product instead of rotating all the points for each face.
+            - Large hulls are searched with the volume lower bounds from a sample of the hull vertices,
+              so only the candidates that can still beat the best volume are evaluated on all of them.
+            - If refine is enabled, the best candidate is then improved by rotating around its local axes.
+
         Returns:
             tuple[float, np.ndarray, np.ndarray, np.ndarray]: The volume, rotation matrix, min point, and max point.
         """
         hull = ConvexHull(self._points)
+        hull_points = self._points[hull.vertices]
+
+        rotations = self._get_face_rotations(self._points[hull.simplices])
+        if not len(rotations):
+            raise ValueError("Failed to compute the minimum bounding box. All hull faces are degenerate.")
+
+        best_volume, best_R, best_min, best_max = self._search_rotations(hull_points, rotations)
+
+        logger.debug(f"Evaluated {len(rotations)} orientations on {len(hull_points)} hull vertices: volume {best_volume}")
+
+        if self._refine:
+            best_volume, best_R, best_min, best_max = self._refine_rotation(hull_points, best_volume, best_R, best_min, best_max)
+
+        return best_volume, best_R, best_min, best_max
+
+    def _search_rotations(self, points: np.ndarray, rotations: np.ndarray) -> tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+        """Search the orientation with the minimum volume.
+
+        Notes:
+            - The extents of a subset of the points never exceed those of all the points, so the sample volumes are lower bounds.
+              The candidates are evaluated in ascending order of the bound, and the search stops when the bound exceeds the best volume.
+              The result is the same as evaluating every candidate, ties go to the first candidate.
+
+        Args:
+            points (np.ndarray): The hull vertices. Shape is (num_points, 3).
+            rotations (np.ndarray): The candidate rotation matrices. Shape is (num_rotations, 3, 3).
+
+        Returns:
+            tuple[float, np.ndarray, np.ndarray, np.ndarray]: The volume, rotation matrix, min point, and max point.
+        """
+        if len(points) <= BOUND_SAMPLE_SIZE:
+            volumes, min_pts, max_pts = self._evaluate_rotations(points, rotations)
+            best_index = int(np.argmin(volumes))
+
+            return volumes[best_index], rotations[best_index], min_pts[best_index], max_pts[best_index]
+
+        sample_points = points[np.linspace(0, len(points) - 1, BOUND_SAMPLE_SIZE).astype(np.int64)]
+        lower_bounds, _, _ = self._evaluate_rotations(sample_points, rotations)
+        order = np.argsort(lower_bounds, kind="stable")
+
         best_volume = np.inf
-        best_R = None
+        best_index = -1
         best_min = None
         best_max = None
+        chunk_size = max(1, CHUNK_ELEMENTS // (3 * len(points)))
+        for start in range(0, len(order), chunk_size):
+            if lower_bounds[order[start]] > best_volume:
+                break
 
-        for simplex in hull.simplices:
-            face_pts = self._points[simplex]
-            v1 = face_pts[1] - face_pts[0]
-            v2 = face_pts[2] - face_pts[0]
-            normal = np.cross(v1, v2)
-            norm = np.linalg.norm(normal)
-            if norm < 1e-8:
-                continue
-            normal = normal / norm
-
-            u = v1 - np.dot(v1, normal) * normal
-            u_norm = np.linalg.norm(u)
-            if u_norm < 1e-8:
-                continue
-            u = u / u_norm
-            v = np.cross(normal, u)
-
-            R = np.vstack([u, v, normal])
-
-            rot_points = np.dot(self._points, R.T)
-            min_pt = np.min(rot_points, axis=0)
-            max_pt = np.max(rot_points, axis=0)
-            extents = max_pt - min_pt
-            volume = np.prod(extents)
-
-            if volume < best_volume:
-                best_volume = volume
-                best_R = R
-                best_min = min_pt
-                best_max = max_pt
+            indices = order[start : start + chunk_size]
+            volumes, min_pts, max_pts = self._evaluate_rotations(points, rotations[indices])
 
-        return best_volume, best_R, best_min, best_max
+            # The smallest volume, then the first candidate
+            i = np.lexsort((indices, volumes))[0]
+            if volumes[i] < best_volume or (volumes[i] == best_volume and indices[i] < best_index):
+                best_volume, best_index, best_min, best_max = volumes[i], indices[i], min_pts[i], max_pts[i]
+
+        logger.debug(f"Evaluated {start + len(indices)} of {len(rotations)} orientations on all the hull vertices")
+
+        return best_volume, rotations[best_index], best_min, best_max
+
+    @staticmethod
+    def _get_face_rotations(face_points: np.ndarray) -> np.ndarray:
+        """Get the orientations of the hull faces.
+
+        Args:
+            face_points (np.ndarray): The vertex positions of the faces. Shape is (num_faces, 3, 3).
+
+        Returns:
+            np.ndarray: The rotation matrices of the non-degenerate faces, each row is a local axis. Shape is (num_rotations, 3, 3).
+        """
+        v1 = face_points[:, 1] - face_points[:, 0]
+        v2 = face_points[:, 2] - face_points[:, 0]
+        normals = np.cross(v1, v2)
+        normal_lengths = np.linalg.norm(normals, axis=1)
+        valid = normal_lengths >= 1e-8
+        normals = normals[valid] / normal_lengths[valid, np.newaxis]
+        v1 = v1[valid]
+
+        u = v1 - np.einsum("ij,ij->i", v1, normals)[:, np.newaxis] * normals
+        u_lengths = np.linalg.norm(u, axis=1)
+        valid = u_lengths >= 1e-8
+        u = u[valid] / u_lengths[valid, np.newaxis]
+        normals = normals[valid]
+
+        return np.stack([u, np.cross(normals, u), normals], axis=1)
+
+    @staticmethod
+    def _evaluate_rotations(points: np.ndarray, rotations: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Evaluate the bounding boxes of the points in the orientations.
+
+        Notes:
+            - The orientations are evaluated in chunks, so the peak memory is bounded by CHUNK_ELEMENTS.
+
+        Args:
+            points (np.ndarray): The points. Shape is (num_points, 3).
+            rotations (np.ndarray): The rotation matrices. Shape is (num_rotations, 3, 3).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The volumes (num_rotations,), the local min points and the local max points (num_rotations, 3).
+        """
+        num_rotations = len(rotations)
+        chunk_size = max(1, CHUNK_ELEMENTS // (3 * max(len(points), 1)))
+
+        min_pts = np.empty((num_rotations, 3), dtype=np.float64)
+        max_pts = np.empty((num_rotations, 3), dtype=np.float64)
+        for start in range(0, num_rotations, chunk_size):
+            rot_points = np.einsum("pj,sij->spi", points, rotations[start : start + chunk_size], optimize=True)
+            min_pts[start : start + chunk_size] = rot_points.min(axis=1)
+            max_pts[start : start + chunk_size] = rot_points.max(axis=1)
+
+        return np.prod(max_pts - min_pts, axis=1), min_pts, max_pts
+
+    def _refine_rotation(
+        self, points: np.ndarray, volume: float, R: np.ndarray, min_pt: np.ndarray, max_pt: np.ndarray
+    ) -> tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+        """Refine the orientation by rotating it around its local axes while the volume decreases.
+
+        Notes:
+            - The six rotations of the current step are evaluated at once. The step is halved when none of them
+              decreases the volume, until it falls below REFINE_ANGLE_TOLERANCE or REFINE_MAX_ITERATIONS is reached.
+
+        Args:
+            points (np.ndarray): The hull vertices. Shape is (num_points, 3).
+            volume (float): The volume of the orientation.
+            R (np.ndarray): The rotation matrix, each row is a local axis.
+            min_pt (np.ndarray): The local min point.
+            max_pt (np.ndarray): The local max point.
+
+        Returns:
+            tuple[float, np.ndarray, np.ndarray, np.ndarray]: The volume, rotation matrix, min point, and max point.
+        """
+        start_volume = volume
+        angle = REFINE_INITIAL_ANGLE
+        for _ in range(REFINE_MAX_ITERATIONS):
+            if angle < REFINE_ANGLE_TOLERANCE:
+                break
+
+            steps = []
+            for axis_a, axis_b in ((1, 2), (2, 0), (0, 1)):
+                for sign in (1.0, -1.0):
+                    step = np.eye(3)
+                    step[[axis_a, axis_a, axis_b, axis_b], [axis_a, axis_b, axis_a, axis_b]] = [
+                        np.cos(angle),
+                        sign * np.sin(angle),
+                        -sign * np.sin(angle),
+                        np.cos(angle),
+                    ]
+                    steps.append(step)
+
+            rotations = np.array(steps) @ R
+            volumes, min_pts, max_pts = self._evaluate_rotations(points, rotations)
+            best_index = int(np.argmin(volumes))
+            if volumes[best_index] < volume:
+                volume, R, min_pt, max_pt = volumes[best_index], rotations[best_index], min_pts[best_index], max_pts[best_index]
+            else:
+                angle *= 0.5
+
+        logger.debug(f"Refined minimum bounding box volume: {start_volume} -> {volume}")
+
+        return volume, R, min_pt, max_pt
 
     @property
     def center(self) -> np.ndarray:
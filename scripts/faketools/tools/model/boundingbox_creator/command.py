@@ -7,6 +7,7 @@ from typing import Optional
 
 import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import numpy as np
 
 from ....lib import lib_transform
 from .boundingbox import AxisAlignedBoundingBox, BoundingBox, MinimumBoundingBox, WorldBoundingBox
@@ -90,6 +91,8 @@ def main(bounding_box_type: str = "world", box_type="mesh", include_scale: bool
         - Bounding box types:
             - world: World bounding box.
             - minimum: Bounding box with the smallest volume.
+                - Keyword arguments:
+                    - refine (bool): Refine the orientation with a local rotation search. Default is False.
             - axis_aligned: Bounding box with the smallest volume around the specified axis.
                 - Keyword arguments:
                     - axis_direction (Union[list[float], np.ndarray]): The direction vector of the fixed axis.
@@ -143,11 +146,14 @@ def main(bounding_box_type: str = "world", box_type="mesh", include_scale: bool
     cmds.select(result_objs, r=True)
 
 
-def _get_mesh_points(meshs: list[str]):
+def _get_mesh_points(meshs: list[str]) -> np.ndarray:
     """Get mesh points.
 
     Args:
         meshs (list[str]): Mesh list.
+
+    Returns:
+        np.ndarray: The world positions of the mesh vertices. Shape is (num_points, 3).
     """
     points = []
     for mesh in meshs:
@@ -155,6 +161,6 @@ def _get_mesh_points(meshs: list[str]):
         sel.add(mesh)
         dag_path = sel.getDagPath(0)
         mfn_mesh = om.MFnMesh(dag_path)
-        points.extend([[p.x, p.y, p.z] for p in mfn_mesh.getPoints(om.MSpace.kWorld)])
+        points.append(np.array(mfn_mesh.getPoints(om.MSpace.kWorld), dtype=np.float64).reshape(-1, 4)[:, :3])
 
-    return points
+    return np.concatenate(points)
@@ -93,8 +93,16 @@ class MinimumBoxWidget(BaseBoxWidget):
         """Constructor."""
         super().__init__(parent=parent)
 
-        label = QLabel("No options available.")
-        self.main_layout.addWidget(label)
+        self.refine_checkbox = QCheckBox("Refine")
+        self.main_layout.addWidget(self.refine_checkbox)
+
+    def get_options(self) -> dict:
+        """Get the options.
+
+        Returns:
+            dict: Options for the bounding box type.
+        """
+        return {"refine": self.refine_checkbox.isChecked()}
 
 
 class AxisAlignedBoxWidget(BaseBoxWidget):
@@ -333,6 +341,11 @@ class MainWindow(base_window.BaseMainWindow):
             "is_parent": self.is_parent_box.isChecked(),
         }
 
+        # Save Minimum widget options
+        minimum_widget = self.stock_widget.widget(1)  # Minimum is at index 1
+        if isinstance(minimum_widget, MinimumBoxWidget):
+            settings["refine"] = minimum_widget.get_options()["refine"]
+
         # Save AxisAligned widget options
         axis_aligned_widget = self.stock_widget.widget(2)  # AxisAligned is at index 2
         if isinstance(axis_aligned_widget, AxisAlignedBoxWidget):
@@ -360,6 +373,11 @@ class MainWindow(base_window.BaseMainWindow):
         if "is_parent" in settings_data:
             self.is_parent_box.setChecked(settings_data["is_parent"])
 
+        # Restore Minimum widget options
+        minimum_widget = self.stock_widget.widget(1)  # Minimum is at index 1
+        if isinstance(minimum_widget, MinimumBoxWidget) and "refine" in settings_data:
+            minimum_widget.refine_checkbox.setChecked(settings_data["refine"])
+
         # Restore AxisAligned widget options
         axis_aligned_widget = self.stock_widget.widget(2)  # AxisAligned is at index 2
         if isinstance(axis_aligned_widget, AxisAlignedBoxWidget):
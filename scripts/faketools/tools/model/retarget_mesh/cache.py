@@ -0,0 +1,277 @@
+"""On-disk cache of the solved retarget deformation data.
+
+Each entry is a compressed npz file named by its key, the hash of the input point arrays and the solver parameters.
+The file stores its key and a checksum of its arrays, entries that fail the check are deleted on load.
+The access time of an entry is its modification time, and the least recently used entries are evicted
+when the total size of the directory exceeds the limit. Entries larger than the limit are not saved.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+from logging import getLogger
+import os
+from typing import Optional
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# Default maximum total size of the cache files in bytes.
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+_KEY_ENTRY = "__key__"
+_CHECKSUM_ENTRY = "__checksum__"
+
+
+class DeformationCache:
+    """On-disk LRU cache of deformation arrays."""
+
+    def __init__(self, dir_path: str, max_size: int = DEFAULT_CACHE_SIZE):
+        """Initialize the cache.
+
+        Args:
+            dir_path (str): The cache directory. Created when the first entry is saved.
+            max_size (int): The maximum total size of the cache files in bytes. Defaults to DEFAULT_CACHE_SIZE.
+        """
+        self._dir_path = os.path.normpath(dir_path)
+        self._max_size = max_size
+
+    @property
+    def dir_path(self) -> str:
+        """Get the cache directory.
+
+        Returns:
+            str: The cache directory.
+        """
+        return self._dir_path
+
+    @staticmethod
+    def make_key(*arrays: np.ndarray, **params) -> str:
+        """Make the cache key of the input arrays and the solver parameters.
+
+        Args:
+            *arrays (np.ndarray): The input arrays, such as the source and target points.
+            **params: The solver parameters. Must be json serializable.
+
+        Returns:
+            str: The cache key.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps({"version": CACHE_VERSION, **params}, sort_keys=True).encode())
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            hasher.update(f"{array.dtype.str}{array.shape}".encode())
+            hasher.update(array.tobytes())
+
+        return hasher.hexdigest()
+
+    def get_file_path(self, key: str) -> str:
+        """Get the file path of the entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The file path.
+        """
+        return os.path.join(self._dir_path, f"{key}.npz")
+
+    def load(self, key: str) -> Optional[dict[str, np.ndarray]]:
+        """Load the arrays of the entry.
+
+        Notes:
+            - Entries that can not be read or fail the integrity check are deleted.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[dict[str, np.ndarray]]: The arrays. None if the entry does not exist or is broken.
+        """
+        file_path = self.get_file_path(key)
+        if not os.path.isfile(file_path):
+            return None
+
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except Exception as e:
+            logger.warning(f"Failed to read cache file, deleted: {file_path}: {e}")
+            self._remove(file_path)
+            return None
+
+        stored_key = arrays.pop(_KEY_ENTRY, np.array("")).item()
+        stored_checksum = arrays.pop(_CHECKSUM_ENTRY, np.array("")).item()
+        if stored_key != key or stored_checksum != _get_checksum(arrays):
+            logger.warning(f"Cache file failed the integrity check, deleted: {file_path}")
+            self._remove(file_path)
+            return None
+
+        # Mark the entry as recently used
+        with contextlib.suppress(OSError):
+            os.utime(file_path)
+
+        logger.debug(f"Loaded cache: {file_path}")
+
+        return arrays
+
+    def save(self, key: str, arrays: dict[str, np.ndarray]) -> bool:
+        """Save the arrays of the entry and evict the least recently used entries over the size limit.
+
+        Notes:
+            - The entry is compressed in memory first, and is not written if it is larger than the size limit,
+              as it would be evicted right away.
+
+        Args:
+            key (str): The cache key.
+            arrays (dict[str, np.ndarray]): The arrays. Object arrays are not supported.
+
+        Returns:
+            bool: True if the entry is saved.
+        """
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays, **{_KEY_ENTRY: np.array(key), _CHECKSUM_ENTRY: np.array(_get_checksum(arrays))})
+        if buffer.tell() > self._max_size:
+            logger.debug(f"Cache entry is larger than the cache size, not saved: {key} ({buffer.tell()} > {self._max_size} bytes)")
+            return False
+
+        os.makedirs(self._dir_path, exist_ok=True)
+
+        file_path = self.get_file_path(key)
+        tmp_file_path = f"{file_path}.tmp"
+        with open(tmp_file_path, "wb") as f:
+            f.write(buffer.getbuffer())
+        os.replace(tmp_file_path, file_path)
+
+        logger.debug(f"Saved cache: {file_path}")
+
+        self.evict()
+
+        return True
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the total size is within the limit."""
+        entries = []
+        for file_name in os.listdir(self._dir_path) if os.path.isdir(self._dir_path) else []:
+            if not file_name.endswith(".npz"):
+                continue
+
+            file_path = os.path.join(self._dir_path, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_path in sorted(entries):
+            if total_size <= self._max_size:
+                break
+
+            self._remove(file_path)
+            total_size -= size
+
+            logger.debug(f"Evicted cache: {file_path}")
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        if not os.path.isdir(self._dir_path):
+            return
+
+        for file_name in os.listdir(self._dir_path):
+            if file_name.endswith(".npz"):
+                self._remove(os.path.join(self._dir_path, file_name))
+
+        logger.debug(f"Cleared cache: {self._dir_path}")
+
+    @staticmethod
+    def _remove(file_path: str) -> None:
+        """Remove the cache file, ignoring errors.
+
+        Args:
+            file_path (str): The file path.
+        """
+        with contextlib.suppress(OSError):
+            os.remove(file_path)
+
+
+def pack_arrays(arrays: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pack a list of 2D arrays into a flat array with their shapes and offsets.
+
+    Args:
+        arrays (list[np.ndarray]): The 2D arrays.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The flat values, the shapes (num_arrays, 2) and the offsets (num_arrays + 1,).
+    """
+    shapes = np.array([array.shape for array in arrays], dtype=np.int64).reshape(-1, 2)
+    offsets = np.r_[0, np.cumsum(shapes.prod(axis=1))].astype(np.int64)
+    values = np.concatenate([np.ravel(array) for array in arrays]) if arrays else np.empty(0)
+
+    return values, shapes, offsets
+
+
+def unpack_arrays(values: np.ndarray, shapes: np.ndarray, offsets: np.ndarray) -> list[np.ndarray]:
+    """Unpack the arrays packed with pack_arrays.
+
+    Args:
+        values (np.ndarray): The flat values.
+        shapes (np.ndarray): The shapes. Shape is (num_arrays, 2).
+        offsets (np.ndarray): The offsets. Shape is (num_arrays + 1,).
+
+    Returns:
+        list[np.ndarray]: The 2D arrays.
+    """
+    return [values[offsets[i] : offsets[i + 1]].reshape(shapes[i]) for i in range(len(shapes))]
+
+
+def pack_index_lists(index_lists: list) -> tuple[np.ndarray, np.ndarray]:
+    """Pack a list of index lists into CSR form.
+
+    Args:
+        index_lists (list): The index lists.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The offsets (num_lists + 1,) and the concatenated indices.
+    """
+    index_arrays = [np.asarray(indices, dtype=np.int64) for indices in index_lists]
+    indptr = np.r_[0, np.cumsum([len(indices) for indices in index_arrays])].astype(np.int64)
+    indices = np.concatenate(index_arrays) if index_arrays else np.empty(0, dtype=np.int64)
+
+    return indptr, indices
+
+
+def unpack_index_lists(indptr: np.ndarray, indices: np.ndarray) -> list[np.ndarray]:
+    """Unpack the index lists packed with pack_index_lists.
+
+    Args:
+        indptr (np.ndarray): The offsets. Shape is (num_lists + 1,).
+        indices (np.ndarray): The concatenated indices.
+
+    Returns:
+        list[np.ndarray]: The index arrays.
+    """
+    return np.split(indices, indptr[1:-1]) if len(indptr) > 1 else []
+
+
+def _get_checksum(arrays: dict[str, np.ndarray]) -> str:
+    """Get the checksum of the arrays.
+
+    Args:
+        arrays (dict[str, np.ndarray]): The arrays.
+
+    Returns:
+        str: The checksum.
+    """
+    hasher = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        hasher.update(f"{name}:{array.dtype.str}{array.shape}".encode())
+        hasher.update(array.tobytes())
+
+    return hasher.hexdigest()
@@ -1,45 +1,21 @@
 """Retarget mesh to another mesh command."""
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from typing import Optional
 
 import maya.cmds as cmds
 import numpy as np
-from scipy.spatial import KDTree
+from scipy.spatial import cKDTree
 
-from ....lib import lib_cluster, lib_retarget, lib_selection
+from ....lib import lib_cluster, lib_retarget
 from ....lib.lib_mesh import is_same_topology
 from ....lib.lib_mesh_vertex import MeshVertex
-from ....operations import component_selection
+from .cache import DeformationCache, pack_arrays, pack_index_lists, unpack_arrays, unpack_index_lists
 
 logger = logging.getLogger(__name__)
 
 
-def _get_points_from_soft_selection(src_objs: list[str], trg_mesh: str, *, radius: float = 1.0) -> list[str]:
-    """Get the points from the soft selection.
-
-    Args:
-        src_objs (list[str]): The source objects.
-        trg_mesh (str): The target mesh.
-        radius (float): The radius.
-
-    Returns:
-        list[str]: The points from the soft selection.
-    """
-    with lib_selection.restore_selection():
-        cmds.select(src_objs, r=True)
-        cmds.softSelect(e=True, ssd=radius, ssf=2, sse=True)  # Set soft selection radius and change to global space
-
-        sel_components: dict = component_selection.get_unique_selections(filter_geometries=[trg_mesh])
-
-        cmds.softSelect(e=True, sse=False)
-
-    if not sel_components:
-        logger.warning(f"No components selected: {trg_mesh}.")
-        return []
-
-    return list(sel_components.keys())
-
-
 def _get_positions(mesh: MeshVertex) -> np.ndarray:
     """Get the vertex positions of the mesh.
 
@@ -55,76 +31,82 @@ def _get_positions(mesh: MeshVertex) -> np.ndarray:
 
 
 def _compute_src_indices(
-    kd_tree: KDTree,
-    trg_indices: list[int],
+    kd_tree: cKDTree,
     trg_points: np.ndarray,
-    trg_mesh_vtx: MeshVertex,
-    src_mesh_vtx: MeshVertex,
+    target_indices: list[list[int]],
     radius_multiplier: float,
     *,
     min_src_vertices: int = 10,
     max_iterations: int = 10,
-) -> list[int]:
-    """Compute the source indices with adaptive radius adjustment.
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the source indices of each target cluster with adaptive radius adjustment.
 
-    This function ensures that a minimum number of source vertices are found
-    by adaptively increasing the search radius if necessary.
+    The source vertices within the radius of any vertex of a cluster are used for the cluster.
+    The radius starts from the farthest nearest source distance of the cluster scaled by the radius multiplier,
+    and grows until a minimum number of source vertices are found.
 
     Args:
-        kd_tree (KDTree): The KDTree object.
-        trg_indices (list[int]): The target indices.
+        kd_tree (cKDTree): The KDTree of the source points.
         trg_points (np.ndarray): The target points.
-        trg_mesh_vtx (MeshVertex): The target mesh vertex.
-        src_mesh_vtx (MeshVertex): The source mesh vertex.
+        target_indices (list[list[int]]): The target indices of each cluster.
         radius_multiplier (float): The radius multiplier.
         min_src_vertices (int): Minimum number of source vertices to find (default: 10).
         max_iterations (int): Maximum iterations for adaptive radius adjustment (default: 10).
 
     Returns:
-        list[int]: The source indices.
+        tuple[np.ndarray, np.ndarray]: The source indices in CSR form (indptr, indices).
+            The sorted source indices of cluster i are indices[indptr[i]:indptr[i + 1]].
     """
-    distances, _ = kd_tree.query(trg_points)
-    base_distance = np.max(distances)
-    point_distance = base_distance * radius_multiplier
-
-    # Adaptive radius adjustment to ensure minimum source vertices
-    current_multiplier = radius_multiplier
-    iteration = 0
-
-    while iteration < max_iterations:
-        trg_vertices = trg_mesh_vtx.get_components_from_indices(trg_indices, component_type="vertex")
-        src_selection_vertices = _get_points_from_soft_selection(trg_vertices, src_mesh_vtx.get_mesh_name(), radius=point_distance)
-
-        if not src_selection_vertices:
-            logger.warning(f"No source vertices found with radius {point_distance:.4f}, increasing radius...")
-            current_multiplier *= 1.5
-            point_distance = base_distance * current_multiplier
-            iteration += 1
-            continue
-
-        src_indices = src_mesh_vtx.get_components_indices(src_selection_vertices, component_type="vertex")
-
-        # Check if we have enough source vertices
-        if len(src_indices) >= min_src_vertices:
-            if iteration > 0:
-                logger.info(f"Found {len(src_indices)} source vertices after {iteration} iterations (radius: {point_distance:.4f})")
-            return src_indices
-
-        # Not enough vertices, increase radius
-        logger.debug(f"Only found {len(src_indices)} source vertices (need {min_src_vertices}), increasing radius...")
-        current_multiplier *= 1.5
-        point_distance = base_distance * current_multiplier
-        iteration += 1
-
-    # Return whatever we found after max iterations
-    if src_selection_vertices:
-        src_indices = src_mesh_vtx.get_components_indices(src_selection_vertices, component_type="vertex")
-        logger.warning(f"Reached max iterations ({max_iterations}), using {len(src_indices)} source vertices (radius: {point_distance:.4f})")
-        return src_indices
-
-    # Fallback: use all source vertices
-    logger.error("Failed to find any source vertices, using all source vertices as fallback")
-    return list(range(src_mesh_vtx.num_vertices()))
+    num_src = kd_tree.n
+    min_src_vertices = min(min_src_vertices, num_src)
+    cluster_points = [trg_points[np.asarray(indices, dtype=np.int64)] for indices in target_indices]
+
+    # Base distance of each cluster, the farthest distance from a cluster vertex to its nearest source vertex
+    nearest_distances, _ = kd_tree.query(trg_points, workers=-1)
+    base_distances = np.array([nearest_distances[np.asarray(indices, dtype=np.int64)].max() for indices in target_indices])
+
+    # Coincident clusters start from the distance that covers the minimum number of source vertices
+    for cluster in np.flatnonzero(base_distances <= 0.0):
+        distances, _ = kd_tree.query(cluster_points[cluster], k=max(min_src_vertices, 1), workers=-1)
+        base_distances[cluster] = np.max(distances)
+
+    multipliers = np.full(len(target_indices), radius_multiplier, dtype=np.float64)
+    src_indices = [np.empty(0, dtype=np.int64)] * len(target_indices)
+
+    pending = list(range(len(target_indices)))
+    for iteration in range(max_iterations):
+        not_enough = []
+        for cluster in pending:
+            point_distance = base_distances[cluster] * multipliers[cluster]
+            neighbors = kd_tree.query_ball_point(cluster_points[cluster], point_distance, workers=-1)
+            src_indices[cluster] = np.unique(np.concatenate([np.asarray(indices, dtype=np.int64) for indices in neighbors]))
+
+            # Check if we have enough source vertices
+            if len(src_indices[cluster]) >= min_src_vertices:
+                if iteration > 0:
+                    logger.info(f"Found {len(src_indices[cluster])} source vertices after {iteration} iterations (radius: {point_distance:.4f})")
+                continue
+
+            # Not enough vertices, increase radius
+            logger.debug(f"Only found {len(src_indices[cluster])} source vertices (need {min_src_vertices}), increasing radius...")
+            multipliers[cluster] *= 1.5
+            not_enough.append(cluster)
+
+        pending = not_enough
+        if not pending:
+            break
+
+    for cluster in pending:
+        if len(src_indices[cluster]):
+            logger.warning(f"Reached max iterations ({max_iterations}), using {len(src_indices[cluster])} source vertices")
+        else:
+            # Fallback: use all source vertices
+            logger.error("Failed to find any source vertices, using all source vertices as fallback")
+            src_indices[cluster] = np.arange(num_src, dtype=np.int64)
+
+    indptr = np.r_[0, np.cumsum([len(indices) for indices in src_indices])].astype(np.int64)
+
+    return indptr, np.concatenate(src_indices)
 
 
 def retarget_mesh(
@@ -137,6 +119,9 @@ def retarget_mesh(
     radius_multiplier: float = 1.0,
     min_src_vertices: int = 10,
     max_iterations: int = 10,
+    use_partition_of_unity: bool = False,
+    max_workers: int = 1,
+    cache_dir: Optional[str] = None,
 ) -> list[str]:
     """Retarget the mesh to another mesh.
 
@@ -144,6 +129,12 @@ def retarget_mesh(
         - Applies the deformation of two meshes with the same topology to the specified mesh.
         - src_mesh and dst_meshes must have the same topology.
         - The determination of the same topology is only based on the number of vertices, so it is not strictly determined.
+        - With use_partition_of_unity, the whole source mesh is covered by overlapping local RBF patches
+          instead of clustering the target mesh, which scales to large meshes. The clustering parameters are ignored.
+        - The RBF kernel of each cluster only depends on the source and target meshes, so it is factorized once
+          and the deformation of all destination meshes is a matrix product per cluster.
+        - With cache_dir, the solved deformation data is cached on disk by the hash of the input points and the parameters,
+          so repeated retargets with the same meshes skip the solve.
 
     Args:
         src_mesh (str): The source mesh for deformation.
@@ -158,6 +149,9 @@ def retarget_mesh(
                                 Lower values may result in less accurate deformation.
         max_iterations (int): Maximum iterations for adaptive radius adjustment.
                               Higher values allow more attempts to find sufficient vertices.
+        use_partition_of_unity (bool): If True, deform with blended local RBF patches of the whole source mesh.
+        max_workers (int): The number of threads factorizing the clusters. Defaults to 1 (no thread pool).
+        cache_dir (Optional[str]): The directory of the deformation cache. Defaults to None (no cache).
 
     Returns:
         list[str]: The retargeted meshes (transform nodes).
@@ -184,68 +178,85 @@ def retarget_mesh(
 
     src_mesh_vtx = MeshVertex(src_mesh)
     src_points = _get_positions(src_mesh_vtx)
-    src_kd_tree = KDTree(src_points)
+    src_kd_tree = cKDTree(src_points)
 
     if src_mesh_vtx.num_vertices() < 4:
         raise ValueError(f"The source mesh must have at least 4 vertices: {src_mesh}.")
 
+    if use_partition_of_unity:
+        return _retarget_mesh_partition_of_unity(
+            src_mesh, src_points, dst_meshes, trg_meshes, is_create=is_create, max_workers=max_workers, cache_dir=cache_dir
+        )
+
+    cache = DeformationCache(cache_dir) if cache_dir else None
+
     # Compute target mesh data for each target mesh
     trg_mesh_data = {}
     for trg_mesh in trg_meshes:
         trg_mesh_vtx = MeshVertex(trg_mesh)
         trg_points = _get_positions(trg_mesh_vtx)
 
-        data = {}
-        data["trg_positions"] = trg_points
-        if trg_mesh_vtx.num_vertices() > max_vertices:
-            data["target_indices"] = lib_cluster.KMeansClustering(trg_mesh).get_clusters(int(trg_mesh_vtx.num_vertices() / max_vertices))
-            data["src_indices"] = [
-                _compute_src_indices(
-                    src_kd_tree,
-                    indices,
-                    trg_points[indices],
-                    trg_mesh_vtx,
-                    src_mesh_vtx,
-                    radius_multiplier,
-                    min_src_vertices=min_src_vertices,
-                    max_iterations=max_iterations,
-                )
-                for indices in data["target_indices"]
-            ]
-        else:
-            data["target_indices"] = [range(trg_mesh_vtx.num_vertices())]
-            data["src_indices"] = [
-                _compute_src_indices(
-                    src_kd_tree,
-                    range(trg_mesh_vtx.num_vertices()),
-                    trg_points,
-                    trg_mesh_vtx,
-                    src_mesh_vtx,
-                    radius_multiplier,
-                    min_src_vertices=min_src_vertices,
-                    max_iterations=max_iterations,
-                )
-            ]
+        cache_key = DeformationCache.make_key(
+            src_points,
+            trg_points,
+            method="cluster",
+            max_vertices=max_vertices,
+            radius_multiplier=radius_multiplier,
+            min_src_vertices=min_src_vertices,
+            max_iterations=max_iterations,
+        )
+        data = _load_cluster_data(cache, cache_key) if cache else None
+        if data is None:
+            data = {}
+            if trg_mesh_vtx.num_vertices() > max_vertices:
+                data["target_indices"] = lib_cluster.KMeansClustering(trg_mesh).get_clusters(int(trg_mesh_vtx.num_vertices() / max_vertices))
+            else:
+                data["target_indices"] = [range(trg_mesh_vtx.num_vertices())]
+
+            indptr, src_indices = _compute_src_indices(
+                src_kd_tree,
+                trg_points,
+                data["target_indices"],
+                radius_multiplier,
+                min_src_vertices=min_src_vertices,
+                max_iterations=max_iterations,
+            )
+            data["src_indices"] = np.split(src_indices, indptr[1:-1])
+
+            # Factorize the kernel of each cluster once, the linear maps are shared by all destination meshes
+            data["linear_maps"] = _compute_linear_maps(src_points, trg_points, data["target_indices"], data["src_indices"], max_workers=max_workers)
 
+            if cache:
+                _save_cluster_data(cache, cache_key, data)
+
+        data["trg_positions"] = trg_points
         trg_mesh_data[trg_mesh] = data
 
-    # Process each destination mesh and apply deformations
-    deform_mesh_transforms = []
+    # Destination mesh points stacked to deform all destinations with a single product per cluster
+    dst_positions = []
+    dst_points_list = []
     for dst_mesh in dst_meshes:
         if not is_same_topology(src_mesh, dst_mesh):
             raise ValueError(f"The topology of the source and destination meshes must be the same: {src_mesh} -> {dst_mesh}.")
 
         dst_mesh_vtx = MeshVertex(dst_mesh)
-        dst_points = _get_positions(dst_mesh_vtx)
+        dst_points_list.append(_get_positions(dst_mesh_vtx))
 
         dst_transform = cmds.listRelatives(dst_mesh_vtx.get_mesh_name(), parent=True)[0]
-        dst_position = cmds.xform(dst_transform, q=True, ws=True, t=True)
+        dst_positions.append(cmds.xform(dst_transform, q=True, ws=True, t=True))
+
+    dst_points = np.stack(dst_points_list).astype(np.float64)
 
-        for trg_mesh in trg_mesh_data:
-            trg_positions = trg_mesh_data[trg_mesh]["trg_positions"]
-            trg_index_list = trg_mesh_data[trg_mesh]["target_indices"]
-            src_index_list = trg_mesh_data[trg_mesh]["src_indices"]
+    for data in trg_mesh_data.values():
+        data["deformed_indices"] = np.concatenate([np.asarray(indices, dtype=np.int64) for indices in data["target_indices"]])
+        data["deformed_positions"] = np.concatenate(
+            [linear_map @ dst_points[:, src_indices] for linear_map, src_indices in zip(data["linear_maps"], data["src_indices"])], axis=1
+        )
 
+    # Apply the deformations of each destination mesh
+    deform_mesh_transforms = []
+    for dst_index, dst_position in enumerate(dst_positions):
+        for trg_mesh, data in trg_mesh_data.items():
             if is_create:
                 deform_mesh = cmds.listRelatives(cmds.duplicate(trg_mesh)[0], shapes=True, noIntermediate=True)[0]
             else:
@@ -254,16 +265,171 @@ def retarget_mesh(
             deform_transform = cmds.listRelatives(deform_mesh, parent=True)[0]
             cmds.xform(deform_transform, ws=True, t=dst_position)
 
-            # Create MeshVertex instance for batch vertex position updates
+            # Batch update vertex positions for better performance
             deform_mesh_vtx = MeshVertex(deform_mesh)
+            deform_mesh_vtx.set_vertex_positions(data["deformed_positions"][dst_index], data["deformed_indices"].tolist())
+
+            deform_mesh_transforms.append(deform_transform)
+
+            logger.debug(f"Re targeted mesh: {deform_transform}.")
+
+    return deform_mesh_transforms
+
+
+def _load_cluster_data(cache: DeformationCache, cache_key: str) -> Optional[dict]:
+    """Load the clusters and their linear maps from the cache.
 
-            for trg_indices, src_indices in zip(trg_index_list, src_index_list):
-                rbf_deform = lib_retarget.RBFDeform(src_points[src_indices])
-                weight_x, weight_y, weight_z = rbf_deform.compute_weights(dst_points[src_indices])
-                computed_points = rbf_deform.compute_points(trg_positions[trg_indices], weight_x, weight_y, weight_z)
+    Args:
+        cache (DeformationCache): The deformation cache.
+        cache_key (str): The cache key.
+
+    Returns:
+        Optional[dict]: The cluster data with target_indices, src_indices and linear_maps. None if not cached.
+    """
+    arrays = cache.load(cache_key)
+    if arrays is None:
+        return None
+
+    try:
+        data = {
+            "target_indices": unpack_index_lists(arrays["target_indptr"], arrays["target_indices"]),
+            "src_indices": unpack_index_lists(arrays["src_indptr"], arrays["src_indices"]),
+            "linear_maps": unpack_arrays(arrays["map_values"], arrays["map_shapes"], arrays["map_offsets"]),
+        }
+    except (KeyError, ValueError) as e:
+        logger.warning(f"Invalid cache data, ignored: {cache_key}: {e}")
+        return None
+
+    logger.info(f"Use cached deformation data: {cache.get_file_path(cache_key)}")
+
+    return data
+
+
+def _save_cluster_data(cache: DeformationCache, cache_key: str, data: dict) -> None:
+    """Save the clusters and their linear maps to the cache.
+
+    Args:
+        cache (DeformationCache): The deformation cache.
+        cache_key (str): The cache key.
+        data (dict): The cluster data with target_indices, src_indices and linear_maps.
+    """
+    target_indptr, target_indices = pack_index_lists(data["target_indices"])
+    src_indptr, src_indices = pack_index_lists(data["src_indices"])
+    map_values, map_shapes, map_offsets = pack_arrays(data["linear_maps"])
+
+    try:
+        cache.save(
+            cache_key,
+            {
+                "target_indptr": target_indptr,
+                "target_indices": target_indices,
+                "src_indptr": src_indptr,
+                "src_indices": src_indices,
+                "map_values": map_values,
+                "map_shapes": map_shapes,
+                "map_offsets": map_offsets,
+            },
+        )
+    except OSError as e:
+        logger.warning(f"Failed to save cache: {cache.get_file_path(cache_key)}: {e}")
+
+
+def _compute_linear_maps(
+    src_points: np.ndarray, trg_positions: np.ndarray, target_indices: list[list[int]], src_indices: list[list[int]], *, max_workers: int = 1
+) -> list[np.ndarray]:
+    """Compute the linear map of each cluster from the destination points to the deformed target points.
+
+    Args:
+        src_points (np.ndarray): The source mesh vertex positions.
+        trg_positions (np.ndarray): The target mesh vertex positions.
+        target_indices (list[list[int]]): The target vertex indices of each cluster.
+        src_indices (list[list[int]]): The source vertex indices of each cluster.
+        max_workers (int): The number of threads computing the clusters. Defaults to 1 (no thread pool).
+
+    Returns:
+        list[np.ndarray]: The linear map of each cluster. Shape is (num_target_indices, num_src_indices).
+    """
+
+    def _compute_linear_map(cluster: int) -> np.ndarray:
+        rbf_deform = lib_retarget.RBFDeform(src_points[src_indices[cluster]], use_cache=False)
+        return rbf_deform.get_linear_map(trg_positions[target_indices[cluster]])
+
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_compute_linear_map, range(len(target_indices))))
+
+    return [_compute_linear_map(cluster) for cluster in range(len(target_indices))]
+
+
+def _retarget_mesh_partition_of_unity(
+    src_mesh: str,
+    src_points: np.ndarray,
+    dst_meshes: list[str],
+    trg_meshes: list[str],
+    *,
+    is_create: bool = True,
+    max_workers: int = 1,
+    cache_dir: Optional[str] = None,
+) -> list[str]:
+    """Retarget the meshes with a partition of unity RBF deformation of the whole source mesh.
+
+    Args:
+        src_mesh (str): The source mesh for deformation.
+        src_points (np.ndarray): The source mesh vertex positions.
+        dst_meshes (list[str]): The target meshes for deformation. They must have the same topology as the source mesh.
+        trg_meshes (list[str]): The meshes to be deformed.
+        is_create (bool): If True, create new meshes by duplicating trg_meshes. If False, modify trg_meshes directly.
+        max_workers (int): The number of threads solving and evaluating the patches. Defaults to 1 (no thread pool).
+        cache_dir (Optional[str]): The directory of the deformation cache. Defaults to None (no cache).
+
+    Returns:
+        list[str]: The retargeted meshes (transform nodes).
+    """
+    rbf_deform = lib_retarget.PartitionOfUnityDeform(src_points)
+    cache = DeformationCache(cache_dir) if cache_dir else None
+    trg_positions = {trg_mesh: _get_positions(MeshVertex(trg_mesh)) for trg_mesh in trg_meshes}
+
+    deform_mesh_transforms = []
+    for dst_mesh in dst_meshes:
+        if not is_same_topology(src_mesh, dst_mesh):
+            raise ValueError(f"The topology of the source and destination meshes must be the same: {src_mesh} -> {dst_mesh}.")
+
+        dst_mesh_vtx = MeshVertex(dst_mesh)
+        dst_points = _get_positions(dst_mesh_vtx)
+
+        dst_transform = cmds.listRelatives(dst_mesh_vtx.get_mesh_name(), parent=True)[0]
+        dst_position = cmds.xform(dst_transform, q=True, ws=True, t=True)
+
+        cache_key = DeformationCache.make_key(
+            src_points,
+            dst_points,
+            method="partition_of_unity",
+            patch_size=lib_retarget.DEFAULT_PATCH_SIZE,
+            overlap=lib_retarget.DEFAULT_PATCH_OVERLAP,
+        )
+        arrays = cache.load(cache_key) if cache else None
+        if arrays is not None and len(arrays.get("weight_shapes", [])) == rbf_deform.num_patches:
+            weights = unpack_arrays(arrays["weight_values"], arrays["weight_shapes"], arrays["weight_offsets"])
+            logger.info(f"Use cached deformation data: {cache.get_file_path(cache_key)}")
+        else:
+            weights = rbf_deform.solve_weights(dst_points, max_workers=max_workers)
+            if cache:
+                weight_values, weight_shapes, weight_offsets = pack_arrays(weights)
+                try:
+                    cache.save(cache_key, {"weight_values": weight_values, "weight_shapes": weight_shapes, "weight_offsets": weight_offsets})
+                except OSError as e:
+                    logger.warning(f"Failed to save cache: {cache.get_file_path(cache_key)}: {e}")
+
+        for trg_mesh, positions in trg_positions.items():
+            if is_create:
+                deform_mesh = cmds.listRelatives(cmds.duplicate(trg_mesh)[0], shapes=True, noIntermediate=True)[0]
+            else:
+                deform_mesh = trg_mesh
+
+            deform_transform = cmds.listRelatives(deform_mesh, parent=True)[0]
+            cmds.xform(deform_transform, ws=True, t=dst_position)
 
-                # Batch update vertex positions for better performance
-                deform_mesh_vtx.set_vertex_positions(computed_points, list(trg_indices))
+            MeshVertex(deform_mesh).set_vertex_positions(rbf_deform.evaluate_points(positions, weights, max_workers=max_workers))
 
             deform_mesh_transforms.append(deform_transform)
 
@@ -22,6 +22,7 @@ from ....lib_ui.qt_compat import (
     QVBoxLayout,
     QWidget,
 )
+from ....lib_ui.tool_data import ToolDataManager
 from ....lib_ui.tool_settings import ToolSettingsManager
 from ....lib_ui.widgets import extra_widgets, nodeAttr_widgets
 from . import command
@@ -117,6 +118,18 @@ class MainWindow(BaseMainWindow):
         )
         params_layout.addWidget(self.max_iterations_widget)
 
+        # Partition of Unity
+        self.partition_of_unity_checkbox = QCheckBox("Partition of Unity")
+        self.partition_of_unity_checkbox.setToolTip(
+            "Deform with blended local RBF patches of the whole source mesh. Faster for large meshes, the cluster parameters are ignored."
+        )
+        params_layout.addWidget(self.partition_of_unity_checkbox)
+
+        # Use Cache
+        self.use_cache_checkbox = QCheckBox("Use Cache")
+        self.use_cache_checkbox.setToolTip("Cache the solved deformation data on disk. Retargeting the same meshes again skips the solve.")
+        params_layout.addWidget(self.use_cache_checkbox)
+
         params_group.setLayout(params_layout)
         self.central_layout.addWidget(params_group)
 
@@ -144,6 +157,8 @@ class MainWindow(BaseMainWindow):
         max_vertices = self.max_vertices_widget.get_value()
         min_src_vertices = self.min_src_vertices_widget.get_value()
         max_iterations = self.max_iterations_widget.get_value()
+        use_partition_of_unity = self.partition_of_unity_checkbox.isChecked()
+        cache_dir = str(ToolDataManager("retarget_mesh", "model").get_data_dir() / "cache") if self.use_cache_checkbox.isChecked() else None
 
         result_meshes = command.retarget_mesh(
             src_mesh,
@@ -154,6 +169,8 @@ class MainWindow(BaseMainWindow):
             max_vertices=max_vertices,
             min_src_vertices=min_src_vertices,
             max_iterations=max_iterations,
+            use_partition_of_unity=use_partition_of_unity,
+            cache_dir=cache_dir,
         )
 
         if result_meshes:
@@ -189,6 +206,8 @@ class MainWindow(BaseMainWindow):
             "max_vertices": self.max_vertices_widget.get_value(),
             "min_src_vertices": self.min_src_vertices_widget.get_value(),
             "max_iterations": self.max_iterations_widget.get_value(),
+            "use_partition_of_unity": self.partition_of_unity_checkbox.isChecked(),
+            "use_cache": self.use_cache_checkbox.isChecked(),
             "window_geometry": {
                 "size": [self.width(), self.height()],  # Save for width only, height will be ignored
                 "position": [self.x(), self.y()],
@@ -207,6 +226,8 @@ class MainWindow(BaseMainWindow):
         self.max_vertices_widget.set_value(settings_data.get("max_vertices", 1000))
         self.min_src_vertices_widget.set_value(settings_data.get("min_src_vertices", 10))
         self.max_iterations_widget.set_value(settings_data.get("max_iterations", 10))
+        self.partition_of_unity_checkbox.setChecked(settings_data.get("use_partition_of_unity", False))
+        self.use_cache_checkbox.setChecked(settings_data.get("use_cache", False))
 
         # Always use minimum height
         self.adjustSize()
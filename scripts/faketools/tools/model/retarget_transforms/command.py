@@ -4,11 +4,11 @@ from __future__ import annotations
 
 import logging
 import os
-import pickle
 
 import maya.cmds as cmds
 
 from ....lib import lib_retarget
+from . import storage
 from .hierarchy import TransformHierarchy
 from .position_methods import DefaultPosition, MeshBaryPosition, MeshRBFPosition
 
@@ -44,7 +44,7 @@ def export_transform_position(output_directory: str, file_name: str, method: str
     if not os.path.exists(output_directory):
         raise ValueError(f"Output file directory not found: {output_directory}")
 
-    output_file_path = os.path.join(output_directory, f"{file_name}.pkl")
+    output_file_path = os.path.join(output_directory, f"{file_name}{storage.FILE_EXTENSION}")
 
     # Validate selection
     sel_nodes = cmds.ls(sl=True)
@@ -114,8 +114,7 @@ def export_transform_position(output_directory: str, file_name: str, method: str
     }
 
     # Write the data to a file
-    with open(output_file_path, "wb") as f:
-        pickle.dump(export_data, f)
+    storage.save_data(output_file_path, export_data)
 
     logger.debug(f"Exported transform positions: {output_file_path}")
 
@@ -123,6 +122,9 @@ def export_transform_position(output_directory: str, file_name: str, method: str
 def load_transform_position_data(input_file_path: str) -> dict:
     """Get the transform position data from a file.
 
+    Notes:
+        - Legacy pickle files are not loaded, convert them with convert_transform_position_file first.
+
     Args:
         input_file_path (str): The input file path.
 
@@ -139,9 +141,11 @@ def load_transform_position_data(input_file_path: str) -> dict:
     if not os.path.exists(input_file_path):
         raise ValueError(f"Input file path not found: {input_file_path}")
 
+    if input_file_path.endswith(storage.LEGACY_FILE_EXTENSION):
+        raise ValueError(f"Legacy pickle file, convert it with convert_transform_position_file: {input_file_path}")
+
     # Read the data
-    with open(input_file_path, "rb") as f:
-        input_data = pickle.load(f)
+    input_data = storage.load_data(input_file_path)
 
     # Validate input data
     if "method" not in input_data:
@@ -156,6 +160,38 @@ def load_transform_position_data(input_file_path: str) -> dict:
     return input_data
 
 
+def convert_transform_position_file(input_file_path: str) -> str:
+    """Convert a legacy pickle file to the npz format next to it.
+
+    Notes:
+        - Loading a pickle file can execute code, only convert files from a trusted source.
+        - The pickle file is kept.
+
+    Args:
+        input_file_path (str): The pickle file path.
+
+    Returns:
+        str: The converted file path.
+
+    Raises:
+        ValueError: If input file is invalid.
+    """
+    if not input_file_path:
+        raise ValueError("Input file path not provided.")
+
+    if not os.path.exists(input_file_path):
+        raise ValueError(f"Input file path not found: {input_file_path}")
+
+    if not input_file_path.endswith(storage.LEGACY_FILE_EXTENSION):
+        raise ValueError(f"Not a pickle file: {input_file_path}")
+
+    output_file_path = storage.convert_pickle_file(input_file_path)
+
+    logger.debug(f"Converted transform position file: {output_file_path}")
+
+    return output_file_path
+
+
 def _create_transform_node(name: str, object_type: str = "transform", size: float = 1.0) -> str:
     """Create a new transform node.
 
@@ -304,4 +340,4 @@ def import_transform_position(input_file_path: str, create_new: bool = False, is
         return reorder_transforms
 
 
-__all__ = ["export_transform_position", "load_transform_position_data", "import_transform_position"]
+__all__ = ["export_transform_position", "load_transform_position_data", "convert_transform_position_file", "import_transform_position"]
@@ -4,13 +4,13 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 import logging
-import math
+from typing import Optional
 
 import maya.api.OpenMaya as om
 import maya.cmds as cmds
 import numpy as np
 
-from ....lib import lib_retarget
+from ....lib import lib_mesh_topology, lib_retarget
 
 logger = logging.getLogger(__name__)
 
@@ -108,21 +108,11 @@ class MeshPosition(PositionBase):
 
 
 class MeshBaryPosition(MeshPosition):
-    """Mesh positions import/export class using barycentric coordinates."""
+    """Mesh positions import/export class using barycentric coordinates.
 
-    def __init__(self, target_mesh: str):
-        """Initialize the MeshPositions class.
-
-        Args:
-            target_mesh (str): The mesh name.
-        """
-        super().__init__(target_mesh)
-
-        self.mit_polygon = om.MItMeshPolygon(self.dag_path)
-
-        # Unify calculations in object space
-        self.mesh_intersector = om.MMeshIntersector()
-        self.mesh_intersector.create(self.dag_path.node(), om.MMatrix())
+    All the positions are computed at once against a single array snapshot of the mesh in object space.
+    The frame of a position is built from the normal interpolated at its closest point and the first edge of the triangle.
+    """
 
     def export_data(self, positions: list[list[float]], **kwargs) -> dict:
         """Export the positions to barycentric coordinates.
@@ -141,46 +131,45 @@ class MeshBaryPosition(MeshPosition):
         if rotations and len(rotations) != len(positions):
             raise ValueError("Rotations and positions length mismatch.")
 
-        mesh_inverse_matrix = self.dag_path.inclusiveMatrixInverse()
-
         data = {}
         data["num_vertices"] = self.mesh_fn.numVertices
 
-        weight_data = []
-        for i, position in enumerate(positions):
-            # Get the position data
-            position = om.MPoint(position) * mesh_inverse_matrix
-
-            point_on_mesh = self.mesh_intersector.getClosestPoint(position)
-            u, v = point_on_mesh.barycentricCoords
-            bary_data = {"weight": [u, v, 1.0 - u - v]}
-
-            self.mit_polygon.setIndex(point_on_mesh.face)
-            points, indices = self.mit_polygon.getTriangle(point_on_mesh.triangle, space=om.MSpace.kObject)
-            bary_data["indices"] = list(indices)
-
-            normal = om.MVector(point_on_mesh.normal)
-            tangent = points[0] - points[1]
-            rot_matrix = self._get_rotation_matrix(normal, tangent)
-            closest_to_pos_vector = position - om.MPoint(point_on_mesh.point)
-            if closest_to_pos_vector.length() < 1e-10:
-                bary_data["position"] = [0.0, 0.0, 0.0]
-            else:
-                rot_matrix_inv_pos = closest_to_pos_vector * rot_matrix.inverse()
-                bary_data["position"] = [rot_matrix_inv_pos.x, rot_matrix_inv_pos.y, rot_matrix_inv_pos.z]
-
-            # Get the rotation data
-            if rotations:
-                rotation = [math.radians(rot) for rot in rotations[i]]
-                quat = om.MEulerRotation(rotation, om.MEulerRotation.kXYZ).asQuaternion()
-                point_quat = om.MTransformationMatrix(rot_matrix).rotation(True)
-                diff_quat = (quat * point_quat.inverse()).normal()
-                bary_data["rotation"] = [diff_quat.x, diff_quat.y, diff_quat.z, diff_quat.w]
-
-            weight_data.append(bary_data)
+        if not len(positions):
+            data["weights"] = []
+            return data
+
+        vertices, triangles, triangle_normals = self._get_mesh_arrays()
+
+        # Unify calculations in object space
+        inverse_matrix = _to_array_matrix(self.dag_path.inclusiveMatrixInverse())
+        points = np.asarray(positions, dtype=np.float64).reshape(-1, 3) @ inverse_matrix[:3, :3] + inverse_matrix[3, :3]
+
+        triangle_ids, weights, closest_points = lib_mesh_topology.get_closest_points_on_triangles(points, vertices, triangles)
+        indices = triangles[triangle_ids]
+
+        normals = np.einsum("nk,nkj->nj", weights, triangle_normals[triangle_ids])
+        frames = _get_frames(normals, vertices[indices[:, 0]] - vertices[indices[:, 1]])
+
+        # The offset from the closest point in the frame
+        offsets = points - closest_points
+        local_offsets = np.einsum("nij,nj->ni", frames, offsets)
+        local_offsets[np.linalg.norm(offsets, axis=1) < 1e-10] = 0.0
+
+        weight_data = [
+            {"weight": weight, "indices": index, "position": local_offset}
+            for weight, index, local_offset in zip(weights.tolist(), indices.tolist(), local_offsets.tolist())
+        ]
+
+        # The rotation relative to the frame
+        if rotations:
+            diff_matrices = _euler_to_matrices(rotations) @ frames.transpose(0, 2, 1)
+            for bary_data, quaternion in zip(weight_data, _matrices_to_quaternions(diff_matrices).tolist()):
+                bary_data["rotation"] = quaternion
 
         data["weights"] = weight_data
 
+        logger.debug(f"Exported barycentric coordinates with positions: {len(weight_data)}")
+
         return data
 
     def import_data(self, data: dict) -> tuple[list[list[float]], list[list[float]]]:
@@ -192,82 +181,63 @@ class MeshBaryPosition(MeshPosition):
         Returns:
             tuple[list[list[float]], list[list[float]]]: The positions and rotations.
         """
-        mesh_matrix = self.dag_path.inclusiveMatrix()
-
-        restored_positions = []
-        restored_rotations = []
-
-        weights = data.get("weights", [])
-
-        for bary_data in weights:
-            # Calculate the restored position
-            points = [self.mesh_fn.getPoint(i) for i in bary_data["indices"]]
-            weight = bary_data["weight"]
-            restored_position = points[0] * weight[0]
-            restored_position += points[1] * weight[1]
-            restored_position += points[2] * weight[2]
-
-            # Adjust position using the stored offset and rotation matrix
-            offset_vector = om.MVector(bary_data["position"])
-            point_on_mesh = self.mesh_intersector.getClosestPoint(restored_position)
-            normal = om.MVector(point_on_mesh.normal)
-            tangent = points[0] - points[1]
-            rot_matrix = self._get_rotation_matrix(normal, tangent)
-            restored_position += offset_vector * rot_matrix
-            restored_position *= mesh_matrix
-
-            restored_positions.append([restored_position.x, restored_position.y, restored_position.z])
-
-            # Restore rotation if present
-            rotation_data = bary_data.get("rotation")
-            if rotation_data:
-                rotation_quat = om.MQuaternion(rotation_data[0], rotation_data[1], rotation_data[2], rotation_data[3])
-                rotation_quat = rotation_quat * om.MTransformationMatrix(rot_matrix).rotation(True)
-                euler_rotation = rotation_quat.asEulerRotation()
-                restored_rotations.append([math.degrees(euler_rotation.x), math.degrees(euler_rotation.y), math.degrees(euler_rotation.z)])
-            else:
-                logger.debug("No rotation data found.")
-                restored_rotations.append([0.0, 0.0, 0.0])
-
-        return restored_positions, restored_rotations
-
-    def _get_rotation_matrix(self, vector_a: om.MVector, vector_b: om.MVector) -> om.MMatrix:
-        """Get the rotation matrix.
+        weight_data = data.get("weights", [])
+        if not weight_data:
+            return [], []
 
-        Args:
-            vector_a (om.MVector): The first vector.
-            vector_b (om.MVector): The second vector.
+        vertices, triangles, triangle_normals = self._get_mesh_arrays()
+
+        indices = np.array([bary_data["indices"] for bary_data in weight_data], dtype=np.int64)
+        weights = np.array([bary_data["weight"] for bary_data in weight_data], dtype=np.float64)
+        local_offsets = np.array([bary_data["position"] for bary_data in weight_data], dtype=np.float64)
+
+        if indices.max() >= len(vertices):
+            raise ValueError(f"Vertex indices out of range: {indices.max()} >= {len(vertices)}")
+
+        # The restored point lies on the triangle, its closest point gives the normal
+        restored_points = np.einsum("nk,nkj->nj", weights, vertices[indices])
+        triangle_ids, closest_weights, _ = lib_mesh_topology.get_closest_points_on_triangles(restored_points, vertices, triangles)
+        normals = np.einsum("nk,nkj->nj", closest_weights, triangle_normals[triangle_ids])
+        frames = _get_frames(normals, vertices[indices[:, 0]] - vertices[indices[:, 1]])
+
+        # Adjust position using the stored offset and the frame
+        restored_points += np.einsum("ni,nij->nj", local_offsets, frames)
+
+        mesh_matrix = _to_array_matrix(self.dag_path.inclusiveMatrix())
+        restored_positions = restored_points @ mesh_matrix[:3, :3] + mesh_matrix[3, :3]
+
+        # Restore rotation if present
+        restored_rotations = np.zeros((len(weight_data), 3), dtype=np.float64)
+        has_rotation = np.array([bool(bary_data.get("rotation")) for bary_data in weight_data], dtype=bool)
+        if has_rotation.any():
+            quaternions = np.array([bary_data["rotation"] for bary_data in weight_data if bary_data.get("rotation")], dtype=np.float64)
+            restored_rotations[has_rotation] = _matrices_to_euler(_quaternions_to_matrices(quaternions) @ frames[has_rotation])
+
+        if not has_rotation.all():
+            logger.debug(f"No rotation data found: {np.count_nonzero(~has_rotation)} positions.")
+
+        return restored_positions.tolist(), restored_rotations.tolist()
+
+    def _get_mesh_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the array snapshot of the mesh in object space.
 
         Returns:
-            om.MMatrix: The rotation matrix.
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The vertex positions (num_vertices, 3), the vertex indices of the triangles (num_triangles, 3)
+                and the face vertex normals of the triangle corners (num_triangles, 3, 3).
         """
-        vector_a.normalize()
-        vector_b.normalize()
-        vector_b = (vector_b - (vector_a * vector_b) * vector_a).normal()
-        cross_product_vector = vector_a ^ vector_b
-
-        matrix = om.MMatrix(
-            [
-                vector_a.x,
-                vector_a.y,
-                vector_a.z,
-                0.0,
-                vector_b.x,
-                vector_b.y,
-                vector_b.z,
-                0.0,
-                cross_product_vector.x,
-                cross_product_vector.y,
-                cross_product_vector.z,
-                0.0,
-                0.0,
-                0.0,
-                0.0,
-                1.0,
-            ]
-        )
-
-        return matrix
+        vertices = np.array(self.mesh_fn.getPoints(om.MSpace.kObject), dtype=np.float64)[:, :3]
+        normals = np.array(self.mesh_fn.getNormals(om.MSpace.kObject), dtype=np.float64)
+
+        # The triangle offsets index the face vertices, shared by the vertex and normal ids
+        _, vertex_ids = self.mesh_fn.getVertices()
+        _, normal_ids = self.mesh_fn.getNormalIds()
+        _, offsets = self.mesh_fn.getTriangleOffsets()
+        offsets = np.array(offsets, dtype=np.int64).reshape(-1, 3)
+
+        triangles = np.array(vertex_ids, dtype=np.int64)[offsets]
+        triangle_normals = normals[np.array(normal_ids, dtype=np.int64)[offsets]]
+
+        return vertices, triangles, triangle_normals
 
 
 class MeshRBFPosition(MeshPosition):
@@ -306,24 +276,22 @@ class MeshRBFPosition(MeshPosition):
             if len(rotations) != len(positions):
                 raise ValueError("Rotations and positions length mismatch.")
 
-            for position, rotation in zip(positions, rotations):
-                quat = om.MEulerRotation([math.radians(rot) for rot in rotation], om.MEulerRotation.kXYZ).asQuaternion()
-                quat_mat = quat.asMatrix()
-                x_vector = om.MVector(om.MVector.kXaxisVector) * quat_mat
-                y_vector = om.MVector(om.MVector.kYaxisVector) * quat_mat
-
-                x_hit_distance = self._intersect_length(position, x_vector)
-                y_hit_distance = self._intersect_length(position, y_vector)
+            # The x and y axes are the first two rows of the rotation matrices
+            rotation_matrices = _euler_to_matrices(rotations)
+            accel_params = self.mesh_fn.autoUniformGridParams()
+            for position, x_vector, y_vector in zip(positions, rotation_matrices[:, 0].tolist(), rotation_matrices[:, 1].tolist()):
+                x_hit_distance = self._intersect_length(position, x_vector, accel_params=accel_params)
+                y_hit_distance = self._intersect_length(position, y_vector, accel_params=accel_params)
 
                 if x_hit_distance == 0.0 and y_hit_distance == 0.0:
                     vector_length = 1.0
                 else:
                     vector_length = min(x_hit_distance, y_hit_distance)
 
-                x_point = om.MPoint(position) + x_vector * vector_length
-                y_point = om.MPoint(position) + y_vector * vector_length
+                x_point = np.asarray(position, dtype=np.float64) + np.asarray(x_vector) * vector_length
+                y_point = np.asarray(position, dtype=np.float64) + np.asarray(y_vector) * vector_length
 
-                rotation_positions.append([[x_point.x, x_point.y, x_point.z], [y_point.x, y_point.y, y_point.z]])
+                rotation_positions.append([x_point.tolist(), y_point.tolist()])
 
         vtx_positions = self._get_vtx_positions()
         indices = method_instance.get_indices(vtx_positions, positions)
@@ -358,39 +326,43 @@ class MeshRBFPosition(MeshPosition):
 
         trg_positions = data["positions"]
         trg_indices_list = data["target_indices"]
-        src_positions_list = np.asarray(data["vtx_positions"])
-        dst_positions_list = np.asarray(self._get_vtx_positions())
+        src_positions_list = np.asarray(data["vtx_positions"], dtype=np.float64)
+        dst_positions_list = np.asarray(self._get_vtx_positions(), dtype=np.float64)
 
         trg_rotations_positions = data.get("rotation_positions", [])
 
         if len(src_positions_list) != len(dst_positions_list):
             raise ValueError(f"Source and destination positions length mismatch: src {len(src_positions_list)} != dest {len(dst_positions_list)}")
 
-        computed_position_list = []
-        computed_rotation_list = []
-        for i in range(len(trg_positions)):
-            src_positions = np.asarray(src_positions_list[trg_indices_list[i]])
-            dst_positions = np.asarray(dst_positions_list[trg_indices_list[i]])
-
-            if trg_rotations_positions:
-                compute_positions = [trg_positions[i]] + trg_rotations_positions[i]
-            else:
-                compute_positions = [trg_positions[i]]
-            compute_positions = np.asarray(compute_positions)
-
-            rbf_deform = lib_retarget.RBFDeform(src_positions, data_type=self._data_type)
-            weight_point_x, weight_point_y, weight_point_z = rbf_deform.compute_weights(dst_positions)
-            computed_positions = rbf_deform.compute_points(compute_positions, weight_point_x, weight_point_y, weight_point_z)
+        num_targets = len(trg_positions)
+        if trg_rotations_positions:
+            compute_positions = np.concatenate(
+                [
+                    np.asarray(trg_positions, dtype=np.float64).reshape(-1, 1, 3),
+                    np.asarray(trg_rotations_positions, dtype=np.float64).reshape(-1, 2, 3),
+                ],
+                axis=1,
+            )
+        else:
+            compute_positions = np.asarray(trg_positions, dtype=np.float64).reshape(-1, 1, 3)
+
+        # Targets with the same number of source vertices are solved as a single batch
+        index_counts = np.array([len(indices) for indices in trg_indices_list], dtype=np.int64)
+        computed_positions = np.empty_like(compute_positions)
+        for count in np.unique(index_counts):
+            targets = np.flatnonzero(index_counts == count)
+            indices = np.array([trg_indices_list[i] for i in targets], dtype=np.int64).reshape(len(targets), count)
+            computed_positions[targets] = lib_retarget.deform_points_batch(
+                src_positions_list[indices], dst_positions_list[indices], compute_positions[targets], data_type=self._data_type
+            )
+
+        computed_position_list = computed_positions[:, 0].tolist()
 
-            logger.debug(f"Computed positions: {computed_positions}")
-
-            computed_position_list.append(computed_positions[0])
-
-            if trg_rotations_positions:
-                computed_rotation = self._vector_to_rotation(computed_positions[0], computed_positions[1], computed_positions[2])
-                computed_rotation_list.append(computed_rotation)
+        computed_rotation_list = []
+        if trg_rotations_positions:
+            computed_rotation_list = self._vector_to_rotation(computed_positions[:, 0], computed_positions[:, 1], computed_positions[:, 2]).tolist()
 
-        logger.debug(f"Imported RBF-like interpolation with positions: {len(trg_positions)}")
+        logger.debug(f"Imported RBF-like interpolation with positions: {num_targets}")
 
         return computed_position_list, computed_rotation_list
 
@@ -402,56 +374,28 @@ class MeshRBFPosition(MeshPosition):
         """
         return [[point.x, point.y, point.z] for point in self.mesh_fn.getPoints(om.MSpace.kWorld)]
 
-    def _vector_to_rotation(self, origin_point: list[float], x_point: list[float], y_point: list[float]) -> list[float]:
-        """Convert the vectors to a euler rotation.
+    def _vector_to_rotation(self, origin_points: np.ndarray, x_points: np.ndarray, y_points: np.ndarray) -> np.ndarray:
+        """Convert the vectors to euler rotations.
 
         Args:
-            origin_point (list[float]): The origin point.
-            x_point (list[float]): The x axis point.
-            y_point (list[float]): The y axis point.
+            origin_points (np.ndarray): The origin points. Shape is (num_points, 3).
+            x_points (np.ndarray): The x axis points. Shape is (num_points, 3).
+            y_points (np.ndarray): The y axis points. Shape is (num_points, 3).
 
         Returns:
-            list[float]: The euler rotation.
+            np.ndarray: The euler rotations in degrees. Shape is (num_points, 3).
         """
-        x_vector = om.MPoint(x_point) - om.MPoint(origin_point)
-        y_vector = om.MPoint(y_point) - om.MPoint(origin_point)
-        x_vector.normalize()
-        y_vector.normalize()
-
-        vector_ortho = (y_vector - (x_vector * y_vector) * x_vector).normal()
-
-        z_vector = x_vector ^ vector_ortho
-
-        matrix = om.MMatrix(
-            [
-                x_vector.x,
-                x_vector.y,
-                x_vector.z,
-                0.0,
-                y_vector.x,
-                y_vector.y,
-                y_vector.z,
-                0.0,
-                z_vector.x,
-                z_vector.y,
-                z_vector.z,
-                0.0,
-                0.0,
-                0.0,
-                0.0,
-                1.0,
-            ]
-        )
-
-        rotation = om.MTransformationMatrix(matrix).rotation(asQuaternion=False)
-        return [math.degrees(rot) for rot in rotation]
-
-    def _intersect_length(self, origin_point: om.MPoint, direction_vector: om.MVector) -> float:
+        return _matrices_to_euler(_get_frames(x_points - origin_points, y_points - origin_points))
+
+    def _intersect_length(
+        self, origin_point: list[float], direction_vector: list[float], accel_params: Optional[om.MMeshIsectAccelParams] = None
+    ) -> float:
         """Get the intersection length.
 
         Args:
-            origin_point (om.MPoint): The origin point.
-            direction_vector (om.MVector): The direction vector.
+            origin_point (list[float]): The origin point.
+            direction_vector (list[float]): The direction vector.
+            accel_params (Optional[om.MMeshIsectAccelParams]): The acceleration parameters shared by repeated queries. Default is None.
 
         Returns:
             float: The intersection length.
@@ -459,7 +403,7 @@ class MeshRBFPosition(MeshPosition):
         ray_origin = om.MFloatPoint(origin_point)
         ray_direction = om.MFloatVector(direction_vector)
 
-        hit_data = self.mesh_fn.closestIntersection(ray_origin, ray_direction, om.MSpace.kWorld, 100, False)
+        hit_data = self.mesh_fn.closestIntersection(ray_origin, ray_direction, om.MSpace.kWorld, 100, False, accelParams=accel_params)
 
         if hit_data is None:
             return 0.0
@@ -467,4 +411,161 @@ class MeshRBFPosition(MeshPosition):
         return hit_data[1]  # hitRayParam ( Parametric distance to the hit point along the ray. )
 
 
+def _to_array_matrix(matrix: om.MMatrix) -> np.ndarray:
+    """Convert the matrix to an array.
+
+    Args:
+        matrix (om.MMatrix): The matrix.
+
+    Returns:
+        np.ndarray: The matrix in row vector convention. Shape is (4, 4).
+    """
+    return np.array([matrix.getElement(row, column) for row in range(4) for column in range(4)], dtype=np.float64).reshape(4, 4)
+
+
+def _get_frames(primary_vectors: np.ndarray, secondary_vectors: np.ndarray) -> np.ndarray:
+    """Get the orthonormal frames of the vectors.
+
+    Args:
+        primary_vectors (np.ndarray): The first axes. Shape is (num_frames, 3).
+        secondary_vectors (np.ndarray): The second axes, orthogonalized to the first axes. Shape is (num_frames, 3).
+
+    Returns:
+        np.ndarray: The rotation matrices whose rows are the axes. Shape is (num_frames, 3, 3).
+    """
+    vector_a = _normalize(primary_vectors)
+    vector_b = _normalize(secondary_vectors)
+    vector_b = _normalize(vector_b - np.einsum("ij,ij->i", vector_a, vector_b)[:, np.newaxis] * vector_a)
+
+    return np.stack([vector_a, vector_b, np.cross(vector_a, vector_b)], axis=1)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalize the vectors, zero vectors are left unchanged.
+
+    Args:
+        vectors (np.ndarray): The vectors. Shape is (num_vectors, 3).
+
+    Returns:
+        np.ndarray: The normalized vectors.
+    """
+    vectors = np.asarray(vectors, dtype=np.float64)
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0.0)
+
+
+def _euler_to_matrices(rotations: list[list[float]]) -> np.ndarray:
+    """Convert the XYZ euler rotations to rotation matrices.
+
+    Args:
+        rotations (list[list[float]]): The euler rotations in degrees. Shape is (num_rotations, 3).
+
+    Returns:
+        np.ndarray: The rotation matrices in row vector convention, same as om.MEulerRotation.asMatrix. Shape is (num_rotations, 3, 3).
+    """
+    radians = np.radians(np.asarray(rotations, dtype=np.float64).reshape(-1, 3))
+    cos = np.cos(radians)
+    sin = np.sin(radians)
+    ones = np.ones(len(radians))
+    zeros = np.zeros(len(radians))
+
+    rotate_x = np.stack([ones, zeros, zeros, zeros, cos[:, 0], sin[:, 0], zeros, -sin[:, 0], cos[:, 0]], axis=1).reshape(-1, 3, 3)
+    rotate_y = np.stack([cos[:, 1], zeros, -sin[:, 1], zeros, ones, zeros, sin[:, 1], zeros, cos[:, 1]], axis=1).reshape(-1, 3, 3)
+    rotate_z = np.stack([cos[:, 2], sin[:, 2], zeros, -sin[:, 2], cos[:, 2], zeros, zeros, zeros, ones], axis=1).reshape(-1, 3, 3)
+
+    return rotate_x @ rotate_y @ rotate_z
+
+
+def _matrices_to_euler(matrices: np.ndarray) -> np.ndarray:
+    """Convert the rotation matrices to XYZ euler rotations.
+
+    Args:
+        matrices (np.ndarray): The rotation matrices in row vector convention. Shape is (num_rotations, 3, 3).
+
+    Returns:
+        np.ndarray: The euler rotations in degrees. Shape is (num_rotations, 3).
+    """
+    cos_y = np.hypot(matrices[:, 0, 0], matrices[:, 0, 1])
+    rotate_y = np.arctan2(-matrices[:, 0, 2], cos_y)
+
+    # Gimbal lock, the z rotation is merged into the x rotation
+    locked = cos_y < 1e-9
+    rotate_x = np.where(
+        locked, np.arctan2(matrices[:, 1, 0] * -np.sign(matrices[:, 0, 2]), matrices[:, 1, 1]), np.arctan2(matrices[:, 1, 2], matrices[:, 2, 2])
+    )
+    rotate_z = np.where(locked, 0.0, np.arctan2(matrices[:, 0, 1], matrices[:, 0, 0]))
+
+    return np.degrees(np.column_stack([rotate_x, rotate_y, rotate_z]))
+
+
+def _matrices_to_quaternions(matrices: np.ndarray) -> np.ndarray:
+    """Convert the rotation matrices to quaternions.
+
+    Args:
+        matrices (np.ndarray): The rotation matrices in row vector convention. Shape is (num_rotations, 3, 3).
+
+    Returns:
+        np.ndarray: The unit quaternions (x, y, z, w), same as om.MQuaternion. Shape is (num_rotations, 4).
+    """
+    m = matrices
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+
+    # Take the largest component first for the numerical stability
+    candidates = np.stack(
+        [
+            np.stack([m[:, 1, 2] - m[:, 2, 1], m[:, 2, 0] - m[:, 0, 2], m[:, 0, 1] - m[:, 1, 0], 1.0 + trace], axis=1),
+            np.stack([1.0 + 2.0 * m[:, 0, 0] - trace, m[:, 0, 1] + m[:, 1, 0], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] - m[:, 2, 1]], axis=1),
+            np.stack([m[:, 0, 1] + m[:, 1, 0], 1.0 + 2.0 * m[:, 1, 1] - trace, m[:, 1, 2] + m[:, 2, 1], m[:, 2, 0] - m[:, 0, 2]], axis=1),
+            np.stack([m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] + m[:, 2, 1], 1.0 + 2.0 * m[:, 2, 2] - trace, m[:, 0, 1] - m[:, 1, 0]], axis=1),
+        ],
+        axis=1,
+    )
+    largest = np.argmax(np.column_stack([trace, m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]]), axis=1)
+    quaternions = candidates[np.arange(len(m)), largest]
+
+    return _normalize_quaternions(quaternions)
+
+
+def _quaternions_to_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """Convert the quaternions to rotation matrices.
+
+    Args:
+        quaternions (np.ndarray): The quaternions (x, y, z, w). Shape is (num_rotations, 4).
+
+    Returns:
+        np.ndarray: The rotation matrices in row vector convention, same as om.MQuaternion.asMatrix. Shape is (num_rotations, 3, 3).
+    """
+    x, y, z, w = _normalize_quaternions(quaternions).T
+
+    return np.stack(
+        [
+            1.0 - 2.0 * (y * y + z * z),
+            2.0 * (x * y + z * w),
+            2.0 * (x * z - y * w),
+            2.0 * (x * y - z * w),
+            1.0 - 2.0 * (x * x + z * z),
+            2.0 * (y * z + x * w),
+            2.0 * (x * z + y * w),
+            2.0 * (y * z - x * w),
+            1.0 - 2.0 * (x * x + y * y),
+        ],
+        axis=1,
+    ).reshape(-1, 3, 3)
+
+
+def _normalize_quaternions(quaternions: np.ndarray) -> np.ndarray:
+    """Normalize the quaternions.
+
+    Args:
+        quaternions (np.ndarray): The quaternions (x, y, z, w). Shape is (num_rotations, 4).
+
+    Returns:
+        np.ndarray: The unit quaternions.
+    """
+    quaternions = np.asarray(quaternions, dtype=np.float64).reshape(-1, 4)
+
+    return quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+
 __all__ = ["PositionBase", "DefaultPosition", "MeshPosition", "MeshBaryPosition", "MeshRBFPosition"]
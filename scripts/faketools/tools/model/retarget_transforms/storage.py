@@ -0,0 +1,246 @@
+"""Binary storage of the retarget transforms data.
+
+The data is saved as an uncompressed npz file of typed arrays with a UTF-8 JSON header entry.
+Files are read without pickle, so opening a file never executes code.
+
+Legacy pickle files are converted with convert_pickle_file, which verifies that the new file
+loads back to exactly the same data.
+"""
+
+from __future__ import annotations
+
+import json
+from logging import getLogger
+import os
+import pickle
+from typing import Optional
+import zipfile
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+FORMAT_NAME = "faketools.retarget_transforms"
+FORMAT_VERSION = 1
+
+FILE_EXTENSION = ".npz"
+LEGACY_FILE_EXTENSION = ".pkl"
+
+_HEADER_ENTRY = "__header__"
+
+
+def save_data(file_path: str, data: dict) -> None:
+    """Save the retarget transforms data.
+
+    Args:
+        file_path (str): The output file path.
+        data (dict): The export data with the method, transforms, position_data and hierarchy_data.
+
+    Raises:
+        ValueError: If the data is invalid.
+    """
+    header, arrays = pack_data(data)
+
+    tmp_file_path = f"{file_path}.tmp"
+    with open(tmp_file_path, "wb") as f:
+        np.savez(f, **arrays, **{_HEADER_ENTRY: np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)})
+    os.replace(tmp_file_path, file_path)
+
+    logger.debug(f"Saved retarget transforms data: {file_path}")
+
+
+def load_data(file_path: str) -> dict:
+    """Load the retarget transforms data.
+
+    Args:
+        file_path (str): The input file path.
+
+    Returns:
+        dict: The data in the same layout as the export data.
+
+    Raises:
+        ValueError: If the file is not a retarget transforms data file or its version is not supported.
+    """
+    if not zipfile.is_zipfile(file_path):
+        raise ValueError(f"Not a retarget transforms data file: {file_path}")
+
+    with np.load(file_path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    if _HEADER_ENTRY not in arrays or arrays[_HEADER_ENTRY].dtype != np.uint8:
+        raise ValueError(f"Not a retarget transforms data file: {file_path}")
+
+    header = json.loads(arrays.pop(_HEADER_ENTRY).tobytes().decode("utf-8"))
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        raise ValueError(f"Not a retarget transforms data file: {file_path}")
+
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported data version {header.get('version')}, this tool supports up to {FORMAT_VERSION}: {file_path}")
+
+    logger.debug(f"Loaded retarget transforms data: {file_path}")
+
+    return unpack_data(header, arrays)
+
+
+def convert_pickle_file(input_file_path: str, output_file_path: Optional[str] = None) -> str:
+    """Convert a legacy pickle file to the npz format.
+
+    Notes:
+        - Loading a pickle file can execute code, only convert files from a trusted source.
+        - The converted file is loaded back and compared with the pickle data, the conversion fails if they differ.
+
+    Args:
+        input_file_path (str): The pickle file path.
+        output_file_path (Optional[str]): The output file path. Defaults to None (the input path with the npz extension).
+
+    Returns:
+        str: The output file path.
+
+    Raises:
+        ValueError: If the pickle data is invalid or does not round-trip.
+    """
+    if output_file_path is None:
+        output_file_path = f"{os.path.splitext(input_file_path)[0]}{FILE_EXTENSION}"
+
+    with open(input_file_path, "rb") as f:
+        data = pickle.load(f)
+
+    save_data(output_file_path, data)
+
+    if _to_builtin(load_data(output_file_path)) != _to_builtin(data):
+        os.remove(output_file_path)
+        raise ValueError(f"Converted data does not match the pickle data: {input_file_path}")
+
+    logger.debug(f"Converted pickle file: {input_file_path} -> {output_file_path}")
+
+    return output_file_path
+
+
+def pack_data(data: dict) -> tuple[dict, dict[str, np.ndarray]]:
+    """Pack the export data into a JSON header and typed arrays.
+
+    Args:
+        data (dict): The export data.
+
+    Returns:
+        tuple[dict, dict[str, np.ndarray]]: The header and the arrays.
+
+    Raises:
+        ValueError: If the data is invalid.
+    """
+    for key in ("method", "transforms", "position_data"):
+        if key not in data:
+            raise ValueError(f"Invalid data. Missing {key}.")
+
+    method = data["method"]
+    position_data = data["position_data"]
+
+    header = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "method": method, "hierarchy_data": data.get("hierarchy_data", {})}
+    arrays = {"transforms": np.array(list(data["transforms"]), dtype=np.str_).reshape(-1)}
+
+    if method == "default":
+        arrays["positions"] = _float_array(position_data["positions"], (-1, 3))
+        arrays["rotations"] = _float_array(position_data.get("rotations", []), (-1, 3))
+    elif method == "barycentric":
+        weight_data = position_data.get("weights", [])
+        has_rotation = np.array([bool(bary_data.get("rotation")) for bary_data in weight_data], dtype=bool)
+
+        header["num_vertices"] = position_data.get("num_vertices")
+        arrays["bary_indices"] = np.array([bary_data["indices"] for bary_data in weight_data], dtype=np.int64).reshape(-1, 3)
+        arrays["bary_weights"] = _float_array([bary_data["weight"] for bary_data in weight_data], (-1, 3))
+        arrays["bary_offsets"] = _float_array([bary_data["position"] for bary_data in weight_data], (-1, 3))
+        arrays["bary_has_rotation"] = has_rotation
+        arrays["bary_rotations"] = _float_array([bary_data["rotation"] for bary_data in weight_data if bary_data.get("rotation")], (-1, 4))
+    elif method == "rbf":
+        index_lists = position_data["target_indices"]
+
+        arrays["positions"] = _float_array(position_data["positions"], (-1, 3))
+        arrays["vtx_positions"] = _float_array(position_data["vtx_positions"], (-1, 3))
+        arrays["target_indptr"] = np.r_[0, np.cumsum([len(indices) for indices in index_lists])].astype(np.int64)
+        arrays["target_indices"] = np.array([index for indices in index_lists for index in indices], dtype=np.int64)
+        arrays["rotation_positions"] = _float_array(position_data.get("rotation_positions", []), (-1, 2, 3))
+    else:
+        raise ValueError(f"Invalid method: {method}")
+
+    return header, arrays
+
+
+def unpack_data(header: dict, arrays: dict[str, np.ndarray]) -> dict:
+    """Unpack the header and the arrays into the export data.
+
+    Args:
+        header (dict): The header.
+        arrays (dict[str, np.ndarray]): The arrays.
+
+    Returns:
+        dict: The export data.
+
+    Raises:
+        ValueError: If the method is invalid.
+    """
+    method = header["method"]
+
+    if method == "default":
+        position_data = {"positions": arrays["positions"].tolist(), "rotations": arrays["rotations"].tolist()}
+    elif method == "barycentric":
+        weight_data = [
+            {"weight": weight, "indices": indices, "position": offset}
+            for weight, indices, offset in zip(arrays["bary_weights"].tolist(), arrays["bary_indices"].tolist(), arrays["bary_offsets"].tolist())
+        ]
+        for index, rotation in zip(np.flatnonzero(arrays["bary_has_rotation"]), arrays["bary_rotations"].tolist()):
+            weight_data[index]["rotation"] = rotation
+
+        position_data = {"num_vertices": header.get("num_vertices"), "weights": weight_data}
+    elif method == "rbf":
+        indptr = arrays["target_indptr"]
+        indices = arrays["target_indices"].tolist()
+
+        position_data = {
+            "positions": arrays["positions"].tolist(),
+            "vtx_positions": arrays["vtx_positions"].tolist(),
+            "target_indices": [indices[indptr[i] : indptr[i + 1]] for i in range(len(indptr) - 1)],
+            "rotation_positions": arrays["rotation_positions"].tolist(),
+        }
+    else:
+        raise ValueError(f"Invalid method: {method}")
+
+    return {
+        "method": method,
+        "transforms": arrays["transforms"].tolist(),
+        "position_data": position_data,
+        "hierarchy_data": header.get("hierarchy_data", {}),
+    }
+
+
+def _float_array(values: list, shape: tuple[int, ...]) -> np.ndarray:
+    """Convert the nested lists to a float array.
+
+    Args:
+        values (list): The nested lists.
+        shape (tuple[int, ...]): The shape, -1 for the number of items.
+
+    Returns:
+        np.ndarray: The float64 array.
+    """
+    return np.array(values, dtype=np.float64).reshape(shape)
+
+
+def _to_builtin(value):
+    """Convert the numpy values and tuples to builtin types for comparison.
+
+    Args:
+        value: The value.
+
+    Returns:
+        The value with numpy arrays and scalars converted to lists and python scalars, and tuples to lists.
+    """
+    if isinstance(value, dict):
+        return {key: _to_builtin(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(item) for item in value]
+
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _to_builtin(value.tolist())
+
+    return value
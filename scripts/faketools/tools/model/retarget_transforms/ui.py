@@ -24,7 +24,7 @@ from ....lib_ui.qt_compat import (
 )
 from ....lib_ui.tool_settings import ToolSettingsManager
 from ....lib_ui.widgets import extra_widgets
-from . import command
+from . import command, storage
 
 logger = getLogger(__name__)
 
@@ -227,6 +227,22 @@ class MainWindow(BaseMainWindow):
 
         logger.debug(f"Removed file: {sel_file_path}")
 
+    @maya_decorator.error_handler
+    def _convert_pickle_files(self) -> None:
+        """Convert the legacy pickle files in the directory that have no converted file."""
+        pickle_files = glob.glob(os.path.join(self.output_directory, f"*{storage.LEGACY_FILE_EXTENSION}"))
+        pickle_files = [file for file in pickle_files if not os.path.exists(f"{os.path.splitext(file)[0]}{storage.FILE_EXTENSION}")]
+        if not pickle_files:
+            cmds.warning("No pickle files to convert.")
+            return
+
+        for pickle_file in pickle_files:
+            command.convert_transform_position_file(pickle_file)
+
+        self._update_file_list()
+
+        logger.debug(f"Converted pickle files: {pickle_files}")
+
     @maya_decorator.error_handler
     def _open_directory(self) -> None:
         """Open file directory."""
@@ -249,6 +265,9 @@ class MainWindow(BaseMainWindow):
         action = menu.addAction("Refresh")
         action.triggered.connect(self._update_file_list)
 
+        action = menu.addAction("Convert Pickle Files")
+        action.triggered.connect(self._convert_pickle_files)
+
         menu.addSeparator()
 
         action = menu.addAction("Open Directory")
@@ -268,7 +287,7 @@ class MainWindow(BaseMainWindow):
 
     def _update_file_list(self) -> None:
         """Update the file list."""
-        directory_file_list = glob.glob(os.path.join(self.output_directory, "*.pkl"))
+        directory_file_list = glob.glob(os.path.join(self.output_directory, f"*{storage.FILE_EXTENSION}"))
         file_list = [os.path.splitext(os.path.basename(file))[0] for file in directory_file_list]
 
         self.file_list_model.setStringList(file_list)
@@ -322,7 +341,7 @@ class MainWindow(BaseMainWindow):
 
         selected_file = self.file_list_model.data(selected_index[0])
 
-        file_path = os.path.join(self.output_directory, f"{selected_file}.pkl")
+        file_path = os.path.join(self.output_directory, f"{selected_file}{storage.FILE_EXTENSION}")
         if not os.path.exists(file_path):
             raise ValueError(f"File does not exist: {file_path}")
 
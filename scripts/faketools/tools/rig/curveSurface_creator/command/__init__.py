@@ -12,7 +12,7 @@ from .....lib import lib_math, lib_nurbsCurve, lib_nurbsSurface, lib_selection,
 from .....operations import convert_weight
 from .constants import OBJECT_TYPE_CURVE, OBJECT_TYPE_MESH, OBJECT_TYPE_SURFACE
 from .create_curve_surface import CreateCurveSurface
-from .curve_weight_setting import CurveWeightSetting
+from .curve_weight_setting import CurveWeightSetting, apply_curve_weights
 from .helpers import create_curve_from_vertices, create_curve_on_surface, move_cv_positions, validate_geometry
 
 logger = getLogger(__name__)
@@ -317,6 +317,7 @@ __all__ = [
     "main",
     "CreateCurveSurface",
     "CurveWeightSetting",
+    "apply_curve_weights",
     "create_curve_from_vertices",
     "create_curve_on_surface",
     "move_cv_positions",
@@ -3,8 +3,10 @@
 from logging import getLogger
 
 import maya.cmds as cmds
+import numpy as np
+import scipy.sparse as sp
 
-from .....lib import lib_nurbsCurve, lib_skinCluster
+from .....lib import lib_nurbsCurve, lib_skinCluster, lib_skinWeights
 from .constants import (
     EASE_IN,
     EASE_INOUT,
@@ -79,31 +81,46 @@ class CurveWeightSetting:
         Raises:
             ValueError: If method is invalid or parent_influence_ratio is out of range.
         """
-        # Validate method
-        if method not in VALID_WEIGHT_METHODS:
-            raise ValueError(f"Invalid method '{method}'. Valid options are: {VALID_WEIGHT_METHODS}")
+        _validate_options(method, parent_influence_ratio)
 
-        # Validate parent_influence_ratio
-        if not 0.0 <= parent_influence_ratio <= 1.0:
-            raise ValueError(f"Invalid parent_influence_ratio '{parent_influence_ratio}'. Must be between 0.0 and 1.0.")
+        sorted_infs, cv_weights = self.calculate_weights(method, smooth_iterations, parent_influence_ratio, remove_end)
+        self.apply_weights(sorted_infs, cv_weights, remove_end)
 
+        logger.debug(f"Applied weights to curve: {self.curve} using method '{method}'")
+
+    def calculate_weights(
+        self, method: str = METHOD_LINEAR, smooth_iterations: int = 10, parent_influence_ratio: float = 0.0, remove_end: bool = False
+    ) -> tuple[list[str], np.ndarray]:
+        """Calculate the weights of the curve without applying them.
+
+        Args:
+            method (str): Weight calculation method. One of: 'linear', 'ease', 'step'.
+            smooth_iterations (int): Number of smoothing iterations.
+            parent_influence_ratio (float): Ratio of influence from parent node (0.0 to 1.0).
+            remove_end (bool): For open curves, merge end influence weights to parent influence.
+
+        Returns:
+            tuple[list[str], np.ndarray]: The influences sorted by their position along the curve,
+                and the weights for them. Shape is (num_cvs, num_influences).
+        """
         # Get influences
         infs = cmds.skinCluster(self.skin_cluster, q=True, inf=True)
 
         # Get CV positions along curve (as length values)
         _, cv_params = self.nurbs_curve.get_closest_positions(self.cv_positions)
-        cv_lengths = [self.nurbs_curve.fn.findLengthFromParam(cv_param) for cv_param in cv_params]
+        cv_lengths = np.array([self.nurbs_curve.fn.findLengthFromParam(cv_param) for cv_param in cv_params], dtype=np.float64)
 
         # Get influence positions along curve (as length values)
         inf_positions = [cmds.xform(inf, q=True, ws=True, t=True) for inf in infs]
         _, inf_params = self.nurbs_curve.get_closest_positions(inf_positions)
-        inf_lengths = [self.nurbs_curve.fn.findLengthFromParam(inf_param) for inf_param in inf_params]
+        inf_lengths = np.array([self.nurbs_curve.fn.findLengthFromParam(inf_param) for inf_param in inf_params], dtype=np.float64)
 
         # Sort influences by their position along the curve
-        sorted_infs, sorted_lengths = zip(*sorted(zip(infs, inf_lengths), key=lambda x: x[1]))
+        order = np.argsort(inf_lengths, kind="stable")
+        sorted_infs = [infs[i] for i in order]
 
         # Calculate weights
-        cv_weights = self._calculate_weights(cv_lengths, sorted_lengths, method, parent_influence_ratio)
+        cv_weights = self._calculate_weights(cv_lengths, inf_lengths[order], method, parent_influence_ratio)
 
         # Apply smoothing if requested
         if smooth_iterations > 0:
@@ -113,11 +130,19 @@ class CurveWeightSetting:
         if remove_end:
             cv_weights = self._merge_end_influence_weights(cv_weights)
 
-        # Apply weights to curve
-        cmds.skinCluster(self.skin_cluster, e=True, normalizeWeights=0)
-        for i in range(len(cv_lengths)):
-            cmds.skinPercent(self.skin_cluster, f"{self.curve}.cv[{i}]", transformValue=list(zip(sorted_infs, cv_weights[i])))
-        cmds.skinCluster(self.skin_cluster, e=True, normalizeWeights=1)
+        return sorted_infs, cv_weights
+
+    def apply_weights(self, sorted_infs: list[str], cv_weights: np.ndarray, remove_end: bool = False) -> None:
+        """Apply the calculated weights to the curve with a single write.
+
+        Args:
+            sorted_infs (list[str]): The influences of the weight columns.
+            cv_weights (np.ndarray): The weights. Shape is (num_cvs, num_influences).
+            remove_end (bool): Whether to remove the end influence of open curves from the skinCluster.
+        """
+        infs = cmds.skinCluster(self.skin_cluster, q=True, inf=True)
+        weights = lib_skinWeights.permute_influences(cv_weights, lib_skinWeights.get_influence_permutation(sorted_infs, infs))
+        lib_skinWeights.set_weights(self.skin_cluster, [f"{self.curve}.cv[0:{len(weights) - 1}]"], weights)
 
         # Remove end influence from skinCluster if weights were merged
         if remove_end and not self.is_closed:
@@ -125,21 +150,17 @@ class CurveWeightSetting:
             cmds.skinCluster(self.skin_cluster, e=True, removeInfluence=end_influence)
             logger.debug(f"Removed end influence from skinCluster: {end_influence}")
 
-        logger.debug(f"Applied weights to curve: {self.curve} using method '{method}'")
-
-    def _calculate_weights(
-        self, cv_lengths: list[float], inf_lengths: list[float], method: str, parent_influence_ratio: float = 0.0
-    ) -> list[list[float]]:
+    def _calculate_weights(self, cv_lengths: np.ndarray, inf_lengths: np.ndarray, method: str, parent_influence_ratio: float = 0.0) -> np.ndarray:
         """Calculate weights for each CV based on influence positions along the curve.
 
         Args:
-            cv_lengths (list[float]): Length values of CVs along the curve.
-            inf_lengths (list[float]): Length values of influences along the curve.
+            cv_lengths (np.ndarray): Length values of CVs along the curve.
+            inf_lengths (np.ndarray): Length values of influences along the curve, sorted ascending.
             method (str): Weight calculation method ('linear', 'ease', or 'step').
             parent_influence_ratio (float): Ratio of influence from parent node (0.0 to 1.0).
 
         Returns:
-            list[list[float]]: Weights for each CV (one list of weights per CV).
+            np.ndarray: Weights for each CV. Shape is (num_cvs, num_influences).
 
         Raises:
             ValueError: If method is invalid.
@@ -147,208 +168,171 @@ class CurveWeightSetting:
         if method not in VALID_WEIGHT_METHODS:
             raise ValueError(f"Invalid method '{method}'. Valid options are: {VALID_WEIGHT_METHODS}")
 
-        cv_weights = []
+        num_cvs = len(cv_lengths)
         num_infs = len(inf_lengths)
 
-        for cv_length in cv_lengths:
-            weights = [0.0] * num_infs
-            weight_assigned = False
-            primary_influence_indices = []  # Track which influences received weight
-
-            # Check if CV is between two influences
-            for j in range(num_infs - 1):
-                # CV exactly at influence position
-                if cv_length == inf_lengths[j]:
-                    weights[j] = 1.0
-                    primary_influence_indices.append(j)
-                    weight_assigned = True
-                    break
-                elif cv_length == inf_lengths[j + 1]:
-                    weights[j + 1] = 1.0
-                    primary_influence_indices.append(j + 1)
-                    weight_assigned = True
-                    break
-                # CV between two influences
-                elif inf_lengths[j] < cv_length < inf_lengths[j + 1]:
-                    # Calculate interpolation factor (0 to 1)
-                    t = (cv_length - inf_lengths[j]) / (inf_lengths[j + 1] - inf_lengths[j])
-
-                    # Calculate interpolated weights using helper method
-                    weights[j], weights[j + 1] = self._interpolate_weight(t, method)
-                    primary_influence_indices.extend([j, j + 1])
-                    weight_assigned = True
-                    break
-
-            # Handle out-of-range CVs
-            if not weight_assigned:
-                if self.is_closed:
-                    # For closed curves, interpolate between last and first influence
-                    if cv_length > inf_lengths[-1]:
-                        numerator = cv_length - inf_lengths[-1]
-                    else:
-                        numerator = cv_length + self.total_length - inf_lengths[-1]
-
-                    if inf_lengths[0] > inf_lengths[-1]:
-                        denominator = inf_lengths[0] - inf_lengths[-1]
-                    else:
-                        denominator = inf_lengths[0] + self.total_length - inf_lengths[-1]
-
-                    t = numerator / denominator
-
-                    # Calculate interpolated weights using helper method
-                    weights[-1], weights[0] = self._interpolate_weight(t, method)
-                    primary_influence_indices.extend([num_infs - 1, 0])
-                else:
-                    # For open curves, clamp to nearest influence
-                    if cv_length < inf_lengths[0]:
-                        weights[0] = 1.0
-                        primary_influence_indices.append(0)
-                    elif cv_length > inf_lengths[-1]:
-                        weights[-1] = 1.0
-                        primary_influence_indices.append(num_infs - 1)
-
-            # Apply parent influence to all primary influences that received weight
-            if parent_influence_ratio > 0.0:
-                for inf_index in primary_influence_indices:
-                    weights = self._apply_parent_influence(weights, inf_index, parent_influence_ratio, num_infs)
-
-            # Normalize weights using helper method
-            weights = self._normalize_weights(weights)
-
-            cv_weights.append(weights)
-
-        logger.debug(f"Calculated {len(cv_weights)} CV weights using method '{method}'")
-
-        return cv_weights
-
-    def _smooth_weights(self, current_weights: list[list[float]], iterations: int = 10) -> list[list[float]]:
+        # Up to two influences receive weight, assigned in slot order. -1 means no influence.
+        first_indices = np.full(num_cvs, -1, dtype=np.int64)
+        second_indices = np.full(num_cvs, -1, dtype=np.int64)
+        factors = np.zeros(num_cvs, dtype=np.float64)
+
+        # First influence segment that contains the CV
+        lengths = cv_lengths[:, np.newaxis]
+        at_start = lengths == inf_lengths[np.newaxis, :-1]
+        at_end = lengths == inf_lengths[np.newaxis, 1:]
+        between = (inf_lengths[np.newaxis, :-1] < lengths) & (lengths < inf_lengths[np.newaxis, 1:])
+        in_segment = at_start | at_end | between
+        assigned = in_segment.any(axis=1)
+        segments = in_segment.argmax(axis=1) if num_infs > 1 else np.zeros(num_cvs, dtype=np.int64)
+
+        rows = np.flatnonzero(assigned)
+        segments = segments[rows]
+        is_start = at_start[rows, segments]
+        is_end = at_end[rows, segments] & ~is_start
+        is_between = ~is_start & ~is_end
+
+        first_indices[rows[is_start]] = segments[is_start]
+        first_indices[rows[is_end]] = segments[is_end] + 1
+
+        between_rows = rows[is_between]
+        between_segments = segments[is_between]
+        first_indices[between_rows] = between_segments
+        second_indices[between_rows] = between_segments + 1
+        factors[between_rows] = (cv_lengths[between_rows] - inf_lengths[between_segments]) / (
+            inf_lengths[between_segments + 1] - inf_lengths[between_segments]
+        )
+
+        # Handle out-of-range CVs
+        out_rows = np.flatnonzero(~assigned)
+        if self.is_closed:
+            # For closed curves, interpolate between last and first influence
+            out_lengths = cv_lengths[out_rows]
+            numerators = np.where(out_lengths > inf_lengths[-1], out_lengths - inf_lengths[-1], out_lengths + self.total_length - inf_lengths[-1])
+            if inf_lengths[0] > inf_lengths[-1]:
+                denominator = inf_lengths[0] - inf_lengths[-1]
+            else:
+                denominator = inf_lengths[0] + self.total_length - inf_lengths[-1]
+
+            first_indices[out_rows] = num_infs - 1
+            second_indices[out_rows] = 0
+            factors[out_rows] = numerators / denominator
+        else:
+            # For open curves, clamp to nearest influence
+            first_indices[out_rows[cv_lengths[out_rows] < inf_lengths[0]]] = 0
+            first_indices[out_rows[cv_lengths[out_rows] > inf_lengths[-1]]] = num_infs - 1
+
+        # Assign the interpolated weights
+        single = second_indices < 0
+        first_weights, second_weights = self._interpolate_weight(factors, method)
+        first_weights = np.where(single, 1.0, first_weights)
+
+        weights = np.zeros((num_cvs, num_infs), dtype=np.float64)
+        has_first = first_indices >= 0
+        weights[np.flatnonzero(has_first), first_indices[has_first]] = first_weights[has_first]
+        weights[np.flatnonzero(~single), second_indices[~single]] = second_weights[~single]
+
+        # Apply parent influence to all primary influences that received weight
+        if parent_influence_ratio > 0.0:
+            for primary_indices in (first_indices, second_indices):
+                weights = self._apply_parent_influence(weights, primary_indices, parent_influence_ratio, num_infs)
+
+        # Normalize weights using helper method
+        weights = self._normalize_weights(weights)
+
+        logger.debug(f"Calculated {num_cvs} CV weights using method '{method}'")
+
+        return weights
+
+    def _smooth_weights(self, current_weights: np.ndarray, iterations: int = 10) -> np.ndarray:
         """Smooth weights by blending with neighboring CV weights.
 
-        Uses distance-weighted averaging to blend weights with neighbors.
+        Uses distance-weighted averaging to blend weights with neighbors, applied as a banded sparse operator.
         For closed curves, the first and last CVs are treated as neighbors.
 
         Args:
-            current_weights (list[list[float]]): Weights before smoothing.
+            current_weights (np.ndarray): Weights before smoothing. Shape is (num_cvs, num_influences).
             iterations (int): Number of smoothing iterations.
 
         Returns:
-            list[list[float]]: Smoothed weights.
+            np.ndarray: Smoothed weights.
         """
-        # Calculate distances between adjacent CVs
-        distances = []
-        for i in range(self.num_cvs - 1):
-            distances.append(self.cv_positions[i + 1].distanceTo(self.cv_positions[i]))
-
-        num_infs = len(current_weights[0])
-
-        # Build neighbor indices for each CV
-        neighbor_indices = []
-        for i in range(self.num_cvs):
-            if i == 0:
-                # First CV
-                if self.is_closed:
-                    # For closed curves, neighbors are: last, self, next
-                    neighbor_indices.append([self.num_cvs - 1, i, i + 1])
-                else:
-                    # For open curves, first CV has no neighbors (skip smoothing)
-                    neighbor_indices.append([])
-            elif i == self.num_cvs - 1:
-                # Last CV
-                if self.is_closed:
-                    # For closed curves, neighbors are: prev, self, first
-                    neighbor_indices.append([i - 1, i, 0])
-                else:
-                    # For open curves, last CV has no neighbors (skip smoothing)
-                    neighbor_indices.append([])
-            else:
-                # Interior CVs: prev, self, next
-                neighbor_indices.append([i - 1, i, i + 1])
-
-        # Perform smoothing iterations
-        smooth_weights = [[0.0] * num_infs for _ in range(self.num_cvs)]
+        operator = self._get_smoothing_operator()
         for _ in range(iterations):
-            for i in range(self.num_cvs):
-                # Skip smoothing for CVs without neighbors (open curve endpoints)
-                if not neighbor_indices[i]:
-                    smooth_weights[i] = current_weights[i]
-                    continue
-
-                # Collect neighbor weights and distances
-                neighbor_weights = []
-                neighbor_distances = []
-
-                for index in neighbor_indices[i]:
-                    neighbor_weights.append(current_weights[index])
-                    # Determine distance to neighbor
-                    if index < i:
-                        neighbor_distances.append(distances[index])
-                    elif index > i:
-                        neighbor_distances.append(distances[i])
-                    else:
-                        # Self (current CV)
-                        neighbor_distances.append(1.0)
-
-                # Calculate weighted average (inverse distance weighting)
-                total_distance = sum(1.0 / d for d in neighbor_distances)
-                weighted_sum = [0.0] * num_infs
-
-                for weight, dist in zip(neighbor_weights, neighbor_distances):
-                    inv_dist = 1.0 / dist
-                    for j in range(num_infs):
-                        weighted_sum[j] += weight[j] * inv_dist
-
-                smooth_weights[i] = [w / total_distance for w in weighted_sum]
-
-            # Update current weights for next iteration
-            current_weights = [w[:] for w in smooth_weights]
+            current_weights = operator @ current_weights
 
         logger.debug(f"Smoothed weights over {iterations} iterations")
 
-        return smooth_weights
+        return current_weights
+
+    def _get_smoothing_operator(self) -> sp.csr_matrix:
+        """Get the smoothing operator of the CVs.
+
+        Each CV is replaced by the inverse distance weighted average of the previous CV, itself (weight 1.0) and the next CV.
+        The endpoints of open curves are not smoothed.
+
+        Returns:
+            sp.csr_matrix: The row-normalized operator. Shape is (num_cvs, num_cvs).
+        """
+        num_cvs = self.num_cvs
+        positions = np.array([[position.x, position.y, position.z] for position in self.cv_positions], dtype=np.float64)
+        distances = np.maximum(np.linalg.norm(np.diff(positions, axis=0), axis=1), 1e-6)
+
+        indices = np.arange(num_cvs)
+        prev_indices = indices - 1
+        next_indices = indices + 1
+        prev_weights = np.zeros(num_cvs, dtype=np.float64)
+        next_weights = np.zeros(num_cvs, dtype=np.float64)
+        prev_weights[1:-1] = 1.0 / distances[:-1]
+        next_weights[1:-1] = 1.0 / distances[1:]
+
+        if self.is_closed and num_cvs > 1:
+            # The wrapped neighbor uses the distance of the adjacent segment of the endpoint
+            prev_indices[0] = num_cvs - 1
+            next_indices[-1] = 0
+            prev_weights[0] = next_weights[0] = 1.0 / distances[0]
+            prev_weights[-1] = 1.0 / distances[-1]
+            next_weights[-1] = 1.0 / distances[0]
+        else:
+            prev_indices[0] = 0
+            next_indices[-1] = num_cvs - 1
+
+        operator = sp.csr_matrix(
+            (np.r_[prev_weights, np.ones(num_cvs), next_weights], (np.tile(indices, 3), np.r_[prev_indices, indices, next_indices])),
+            shape=(num_cvs, num_cvs),
+        )
+
+        return sp.diags(1.0 / np.asarray(operator.sum(axis=1)).ravel()) @ operator
 
-    def _merge_end_influence_weights(self, current_weights: list[list[float]]) -> list[list[float]]:
+    def _merge_end_influence_weights(self, current_weights: np.ndarray) -> np.ndarray:
         """Merge end influence weights to parent influence for open curves.
 
         For open curves (FK joint chains), the end joint usually doesn't need weights.
         This method transfers all weights from the last influence to the second-to-last influence.
 
         Args:
-            current_weights (list[list[float]]): CV weights before merging.
+            current_weights (np.ndarray): CV weights before merging.
 
         Returns:
-            list[list[float]]: CV weights after merging end influence.
+            np.ndarray: CV weights after merging end influence.
         """
         # Only process for open curves
         if self.is_closed:
             logger.debug("Skipping end influence merge (closed curve)")
             return current_weights
 
-        num_infs = len(current_weights[0])
-
         # Need at least 2 influences to merge
-        if num_infs < 2:
+        if current_weights.shape[1] < 2:
             logger.debug("Skipping end influence merge (less than 2 influences)")
             return current_weights
 
-        # Merge weights from last influence to second-to-last
-        merged_weights = []
-        for weights in current_weights:
-            new_weights = weights[:]  # Copy weights
-
-            # Add last influence's weight to second-to-last
-            new_weights[-2] += new_weights[-1]
-
-            # Zero out last influence
-            new_weights[-1] = 0.0
-
-            # Re-normalize (should be unnecessary if weights were normalized, but safe)
-            new_weights = self._normalize_weights(new_weights)
-
-            merged_weights.append(new_weights)
+        # Add last influence's weight to second-to-last and zero out last influence
+        merged_weights = current_weights.copy()
+        merged_weights[:, -2] += merged_weights[:, -1]
+        merged_weights[:, -1] = 0.0
 
         logger.debug("Merged end influence weights to parent influence")
 
-        return merged_weights
+        return self._normalize_weights(merged_weights)
 
     def _get_parent_influence_index(self, inf_index: int, num_infs: int) -> int:
         """Get the parent influence index for a given influence.
@@ -371,80 +355,79 @@ class CurveWeightSetting:
             return inf_index - 1
 
     @staticmethod
-    def _interpolate_weight(t: float, method: str) -> tuple[float, float]:
+    def _interpolate_weight(t: np.ndarray, method: str) -> tuple[np.ndarray, np.ndarray]:
         """Calculate interpolated weights for two influences.
 
         Args:
-            t (float): Interpolation factor (0.0 to 1.0).
+            t (np.ndarray): Interpolation factors (0.0 to 1.0).
             method (str): Weight calculation method ('linear', 'ease', or 'step').
 
         Returns:
-            tuple[float, float]: (weight_for_first_influence, weight_for_second_influence).
+            tuple[np.ndarray, np.ndarray]: (weights_for_first_influence, weights_for_second_influence).
         """
-        if method == METHOD_LINEAR:
-            return (1.0 - t, t)
-        elif method == METHOD_EASE:
+        if method == METHOD_EASE:
             eased_t = CurveWeightSetting._ease_weight(t, ease_type=EASE_INOUT)
             return (1.0 - eased_t, eased_t)
         elif method == METHOD_STEP:
-            return (1.0, 0.0)
+            return (np.ones_like(t), np.zeros_like(t))
         else:
-            return (1.0 - t, t)  # Fallback to linear
+            return (1.0 - t, t)  # Linear, also the fallback
 
-    def _apply_parent_influence(self, weights: list[float], primary_inf_index: int, parent_ratio: float, num_infs: int) -> list[float]:
+    def _apply_parent_influence(self, weights: np.ndarray, primary_inf_indices: np.ndarray, parent_ratio: float, num_infs: int) -> np.ndarray:
         """Apply parent influence to weights.
 
         Args:
-            weights (list[float]): Current weights (will be modified).
-            primary_inf_index (int): Index of the primary influence (the one receiving weight).
+            weights (np.ndarray): Current weights (will be modified). Shape is (num_cvs, num_influences).
+            primary_inf_indices (np.ndarray): Index of the primary influence of each CV. -1 for no influence.
             parent_ratio (float): Ratio of influence from parent (0.0 to 1.0).
             num_infs (int): Total number of influences.
 
         Returns:
-            list[float]: Modified weights with parent influence applied.
+            np.ndarray: Modified weights with parent influence applied.
         """
         if parent_ratio <= 0.0:
             return weights
 
-        parent_index = self._get_parent_influence_index(primary_inf_index, num_infs)
-        if parent_index < 0:
-            # No parent exists (first influence in open curve)
-            return weights
+        parent_table = np.array([self._get_parent_influence_index(i, num_infs) for i in range(num_infs)], dtype=np.int64)
+        rows = np.flatnonzero(primary_inf_indices >= 0)
+        primary_indices = primary_inf_indices[rows]
+        parent_indices = parent_table[primary_indices]
 
-        # Get the current weight for primary influence
-        primary_weight = weights[primary_inf_index]
+        # No parent exists (first influence in open curve)
+        has_parent = parent_indices >= 0
+        rows = rows[has_parent]
+        primary_indices = primary_indices[has_parent]
+        parent_indices = parent_indices[has_parent]
 
         # Redistribute weight between primary and parent
-        weights[primary_inf_index] = primary_weight * (1.0 - parent_ratio)
-        weights[parent_index] += primary_weight * parent_ratio
+        primary_weights = weights[rows, primary_indices]
+        weights[rows, primary_indices] = primary_weights * (1.0 - parent_ratio)
+        weights[rows, parent_indices] += primary_weights * parent_ratio
 
         return weights
 
     @staticmethod
-    def _normalize_weights(weights: list[float]) -> list[float]:
-        """Normalize weights to sum to 1.0.
+    def _normalize_weights(weights: np.ndarray) -> np.ndarray:
+        """Normalize the weights of each CV to sum to 1.0.
 
         Args:
-            weights (list[float]): Weights to normalize.
+            weights (np.ndarray): Weights to normalize. Shape is (num_cvs, num_influences).
 
         Returns:
-            list[float]: Normalized weights.
+            np.ndarray: Normalized weights. Rows with zero total are left unchanged.
         """
-        total_weight = sum(weights)
-        if total_weight > 0:
-            return [w / total_weight for w in weights]
-        return weights
+        return lib_skinWeights.normalize_weights(weights)
 
     @staticmethod
-    def _ease_weight(t: float, ease_type: str = EASE_IN) -> float:
-        """Apply easing function to interpolation value.
+    def _ease_weight(t: np.ndarray, ease_type: str = EASE_IN) -> np.ndarray:
+        """Apply easing function to interpolation values.
 
         Args:
-            t (float): Normalized interpolation value (0.0 to 1.0).
+            t (np.ndarray): Normalized interpolation values (0.0 to 1.0).
             ease_type (str): Type of easing. One of: 'in', 'out', 'inout'.
 
         Returns:
-            float: Eased interpolation value.
+            np.ndarray: Eased interpolation values.
 
         Raises:
             ValueError: If ease_type is invalid.
@@ -457,9 +440,57 @@ class CurveWeightSetting:
             return 1 - (1 - t) ** 2
         elif ease_type == EASE_INOUT:
             # Quadratic ease-in-out: slow start and end, fast middle
-            if t < 0.5:
-                return 2 * (t**2)
-            else:
-                return 1 - 2 * ((1 - t) ** 2)
+            return np.where(t < 0.5, 2 * (t**2), 1 - 2 * ((1 - t) ** 2))
 
         raise ValueError(f"Invalid ease_type '{ease_type}'. Valid options are: {VALID_EASE_TYPES}")
+
+
+def apply_curve_weights(
+    curves: list[str], method: str = METHOD_LINEAR, smooth_iterations: int = 10, parent_influence_ratio: float = 0.0, remove_end: bool = False
+) -> None:
+    """Calculate and apply weights to many curves in one call.
+
+    Notes:
+        - The weights of all curves are calculated first, then each skinCluster is written with a single bulk write.
+
+    Args:
+        curves (list[str]): Curve transform names. Each curve must have a skinCluster.
+        method (str): Weight calculation method. One of: 'linear', 'ease', 'step'.
+        smooth_iterations (int): Number of smoothing iterations.
+        parent_influence_ratio (float): Ratio of influence from parent node (0.0 to 1.0).
+        remove_end (bool): For open curves, merge end influence weights to parent influence.
+
+    Raises:
+        ValueError: If curves are not specified, or method or parent_influence_ratio is invalid.
+    """
+    if not curves:
+        raise ValueError("No curves specified.")
+
+    _validate_options(method, parent_influence_ratio)
+
+    settings = [CurveWeightSetting(curve) for curve in curves]
+    results = [setting.calculate_weights(method, smooth_iterations, parent_influence_ratio, remove_end) for setting in settings]
+
+    for setting, (sorted_infs, cv_weights) in zip(settings, results):
+        setting.apply_weights(sorted_infs, cv_weights, remove_end)
+
+    logger.debug(f"Applied weights to {len(curves)} curves using method '{method}'")
+
+
+def _validate_options(method: str, parent_influence_ratio: float) -> None:
+    """Validate the weight options.
+
+    Args:
+        method (str): Weight calculation method.
+        parent_influence_ratio (float): Ratio of influence from parent node.
+
+    Raises:
+        ValueError: If method is invalid or parent_influence_ratio is out of range.
+    """
+    # Validate method
+    if method not in VALID_WEIGHT_METHODS:
+        raise ValueError(f"Invalid method '{method}'. Valid options are: {VALID_WEIGHT_METHODS}")
+
+    # Validate parent_influence_ratio
+    if not 0.0 <= parent_influence_ratio <= 1.0:
+        raise ValueError(f"Invalid parent_influence_ratio '{parent_influence_ratio}'. Must be between 0.0 and 1.0.")
@@ -4,7 +4,9 @@ from logging import getLogger
 from math import sqrt
 
 import maya.cmds as cmds
+import numpy as np
 
+from .....lib import lib_skinWeights
 from .constants import (
     LOFT_WEIGHT_DISTANCE,
     LOFT_WEIGHT_INDEX,
@@ -432,26 +434,21 @@ class LoftWeightSetting:
         # Pre-calculate CV positions for distance/projection methods
         cv_positions = None
         if loft_weight_method in (LOFT_WEIGHT_DISTANCE, LOFT_WEIGHT_PROJECTION):
-            cv_positions = self._get_nurbs_cv_positions()
-
-        for cv_u in range(self.num_cvs_u):  # curve direction
-            for cv_v in range(self.num_cvs_v):  # loft direction
-                cv_name = f"{self.geometry}.cv[{cv_u}][{cv_v}]"
-
-                # Determine weights for this CV
-                weights = self._get_weights_for_loft_position(
-                    cv_u,
-                    cv_v,
-                    chain_v_indices,
-                    chain_position_weights,
-                    is_nurbs=True,
-                    loft_weight_method=loft_weight_method,
-                    cv_positions=cv_positions,
-                )
-
-                # Apply weights
-                transform_values = list(zip(self.all_influences, weights))
-                cmds.skinPercent(skin_cluster, cv_name, transformValue=transform_values)
+            cv_positions = np.asarray(self._get_nurbs_cv_positions(), dtype=np.float64)
+
+        # Weights of all CVs, U is the curve direction and V is the loft direction
+        weights = self._calculate_loft_weights(
+            chain_position_weights,
+            chain_v_indices,
+            self.num_cvs_v,
+            is_nurbs=True,
+            loft_weight_method=loft_weight_method,
+            positions=cv_positions,
+        )
+
+        # Apply weights, the CVs are ordered with V changing fastest
+        components = [f"{self.geometry}.cv[0:{self.num_cvs_u - 1}][0:{self.num_cvs_v - 1}]"]
+        lib_skinWeights.set_weights(skin_cluster, components, weights.reshape(-1, len(self.all_influences)))
 
     def _apply_mesh_weights(self, skin_cluster: str, chain_position_weights: list[list[list[float]]], loft_weight_method: str) -> None:
         """Apply weights to mesh vertices.
@@ -467,29 +464,78 @@ class LoftWeightSetting:
         # Pre-calculate vertex positions for distance/projection methods
         vtx_positions = None
         if loft_weight_method in (LOFT_WEIGHT_DISTANCE, LOFT_WEIGHT_PROJECTION):
-            vtx_positions = self._get_mesh_vtx_positions()
-
-        for vtx_index in range(self.num_vertices):
-            vtx_name = f"{self.geometry}.vtx[{vtx_index}]"
-
-            # Convert to grid position
-            row = vtx_index // self.num_verts_along_curve  # loft direction
-            col = vtx_index % self.num_verts_along_curve  # curve direction
-
-            # Determine weights for this vertex
-            weights = self._get_weights_for_loft_position(
-                col,
-                row,
-                chain_row_indices,
-                chain_position_weights,
-                is_nurbs=False,
-                loft_weight_method=loft_weight_method,
-                vtx_positions=vtx_positions,
-            )
-
-            # Apply weights
-            transform_values = list(zip(self.all_influences, weights))
-            cmds.skinPercent(skin_cluster, vtx_name, transformValue=transform_values)
+            vtx_positions = np.asarray(self._get_mesh_vtx_positions(), dtype=np.float64).transpose(1, 0, 2)
+
+        # Weights of the vertex grid, columns are the curve direction and rows are the loft direction
+        num_rows = -(-self.num_vertices // self.num_verts_along_curve)
+        weights = self._calculate_loft_weights(
+            chain_position_weights,
+            chain_row_indices,
+            num_rows,
+            is_nurbs=False,
+            loft_weight_method=loft_weight_method,
+            positions=vtx_positions,
+        )
+
+        # Apply weights, vertex index is row * num_verts_along_curve + col
+        weights = weights.transpose(1, 0, 2).reshape(-1, len(self.all_influences))[: self.num_vertices]
+        lib_skinWeights.set_weights(skin_cluster, [f"{self.geometry}.vtx[0:{self.num_vertices - 1}]"], weights)
+
+    def _calculate_loft_weights(
+        self,
+        chain_position_weights: list[list[list[float]]],
+        chain_indices: list[int],
+        num_loft: int,
+        is_nurbs: bool,
+        loft_weight_method: str = LOFT_WEIGHT_INDEX,
+        positions: "np.ndarray | None" = None,
+    ) -> np.ndarray:
+        """Calculate the weights of all CVs/vertices in one pass.
+
+        Positions at a chain take the pre-calculated weights of the chain.
+        Positions between chains interpolate between the weights of the adjacent chains.
+
+        Args:
+            chain_position_weights (list): Pre-calculated weights for each chain.
+                Shape: [num_chains][num_cvs_in_curve_direction][num_influences]
+            chain_indices (list[int]): Loft indices that correspond to chain positions.
+            num_loft (int): Number of CVs/vertices in loft direction.
+            is_nurbs (bool): Whether this is for NURBS surface.
+            loft_weight_method (str): Loft direction weight distribution method.
+            positions (np.ndarray | None): CV or vertex positions (used by distance/projection methods).
+                Shape is (num_cvs_in_curve_direction, num_loft, 3).
+
+        Returns:
+            np.ndarray: Normalized weights. Shape is (num_cvs_in_curve_direction, num_loft, num_influences).
+        """
+        chain_weights = np.asarray(chain_position_weights, dtype=np.float64)
+        num_curve = chain_weights.shape[1]
+
+        # Adjacent chains and interpolation factor of each loft row
+        chain_a, chain_b, index_factors = self._get_loft_chain_table(chain_indices, num_loft, is_nurbs)
+
+        if loft_weight_method == LOFT_WEIGHT_INDEX or positions is None:
+            factors = np.broadcast_to(index_factors, (num_curve, num_loft))
+        else:
+            chain_locations = np.asarray(chain_indices, dtype=np.int64)
+            loft_idx_a = chain_locations[chain_a]
+            loft_idx_b = chain_locations[chain_b]
+            if loft_weight_method == LOFT_WEIGHT_DISTANCE:
+                factors = self._calculate_distance_factors(positions, loft_idx_a, loft_idx_b)
+            else:
+                factors = self._calculate_projection_factors(positions, loft_idx_a, loft_idx_b)
+
+            # Positions at a chain take the chain weights
+            factors = np.where(chain_a == chain_b, 0.0, factors)
+
+        # Interpolate weights between the adjacent chains
+        curve_positions = np.arange(num_curve)[:, np.newaxis]
+        weights_a = chain_weights[chain_a[np.newaxis, :], curve_positions]
+        weights_b = chain_weights[chain_b[np.newaxis, :], curve_positions]
+        weights = weights_a * (1.0 - factors[..., np.newaxis]) + weights_b * factors[..., np.newaxis]
+
+        totals = weights.sum(axis=2, keepdims=True)
+        return np.divide(weights, totals, out=weights, where=totals > 0)
 
     def _get_chain_v_indices_nurbs(self) -> list[int]:
         """Get V indices that correspond to chain positions for NURBS surface.
@@ -537,68 +583,30 @@ class LoftWeightSetting:
             step = (self.num_verts_loft_direction - 1) / (self.num_chains - 1)
             return [int(round(i * step)) for i in range(self.num_chains)]
 
-    def _get_weights_for_loft_position(
-        self,
-        curve_pos: int,
-        loft_pos: int,
-        chain_indices: list[int],
-        chain_position_weights: list[list[list[float]]],
-        is_nurbs: bool,
-        loft_weight_method: str = LOFT_WEIGHT_INDEX,
-        cv_positions: "list[list[list[float]]] | None" = None,
-        vtx_positions: "list[list[list[float]]] | None" = None,
-    ) -> list[float]:
-        """Get weights for a CV/vertex at a specific loft position.
+    def _get_loft_chain_table(self, chain_indices: list[int], num_loft: int, is_nurbs: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the adjacent chains and index-based interpolation factor of each loft position.
 
-        If the position is at a chain, returns the pre-calculated weights.
-        If between chains, interpolates between adjacent chain weights.
+        Positions at a chain refer to the chain on both sides with the factor 0.0.
 
         Args:
-            curve_pos (int): Position in curve direction (CV index or column).
-            loft_pos (int): Position in loft direction (CV index or row).
             chain_indices (list[int]): Loft indices that correspond to chain positions.
-            chain_position_weights (list): Pre-calculated weights for each chain.
+            num_loft (int): Number of CVs/vertices in loft direction.
             is_nurbs (bool): Whether this is for NURBS surface.
-            loft_weight_method (str): Loft direction weight distribution method.
-            cv_positions (list | None): CV positions for NURBS (used by distance/projection methods).
-            vtx_positions (list | None): Vertex positions for mesh (used by distance/projection methods).
 
         Returns:
-            list[float]: Interpolated weights.
+            tuple[np.ndarray, np.ndarray, np.ndarray]: (chain_a_indices, chain_b_indices, interpolation_factors). Shape is (num_loft,).
         """
-        num_influences = len(self.all_influences)
+        chain_a = np.zeros(num_loft, dtype=np.int64)
+        chain_b = np.zeros(num_loft, dtype=np.int64)
+        factors = np.zeros(num_loft, dtype=np.float64)
 
-        # Check if this position is exactly at a chain
-        for chain_idx, chain_loft_idx in enumerate(chain_indices):
-            if loft_pos == chain_loft_idx:
-                return chain_position_weights[chain_idx][curve_pos]
-
-        # Find which two chains this position is between (index-based)
-        chain_a_idx, chain_b_idx, t_index = self._find_adjacent_chains(loft_pos, chain_indices, is_nurbs)
-
-        # Calculate interpolation factor based on method
-        if loft_weight_method == LOFT_WEIGHT_INDEX:
-            t = t_index
-        else:
-            # Get positions for distance/projection calculation
-            positions = cv_positions if is_nurbs else vtx_positions
-            if positions is None:
-                t = t_index
+        for loft_pos in range(num_loft):
+            if loft_pos in chain_indices:
+                chain_a[loft_pos] = chain_b[loft_pos] = chain_indices.index(loft_pos)
             else:
-                loft_idx_a = chain_indices[chain_a_idx]
-                loft_idx_b = chain_indices[chain_b_idx]
-                t = self._calculate_loft_interpolation_factor(curve_pos, loft_pos, loft_idx_a, loft_idx_b, positions, loft_weight_method, is_nurbs)
-
-        # Get weights from both chains
-        weights_a = chain_position_weights[chain_a_idx][curve_pos]
-        weights_b = chain_position_weights[chain_b_idx][curve_pos]
+                chain_a[loft_pos], chain_b[loft_pos], factors[loft_pos] = self._find_adjacent_chains(loft_pos, chain_indices, is_nurbs)
 
-        # Interpolate weights
-        interpolated = [0.0] * num_influences
-        for i in range(num_influences):
-            interpolated[i] = weights_a[i] * (1.0 - t) + weights_b[i] * t
-
-        return self._normalize_weights(interpolated)
+        return chain_a, chain_b, factors
 
     def _find_adjacent_chains(self, loft_pos: int, chain_indices: list[int], is_nurbs: bool) -> tuple[int, int, float]:
         """Find the two chains adjacent to a loft position and interpolation factor.
@@ -822,180 +830,82 @@ class LoftWeightSetting:
         logger.debug(f"Smoothed chain weights {iterations} times (curve direction only)")
         return smoothed_weights
 
-    def _get_nurbs_cv_positions(self) -> list[list[list[float]]]:
+    def _get_nurbs_cv_positions(self) -> np.ndarray:
         """Get all CV positions for NURBS surface.
 
         Returns:
-            list[list[list[float]]]: CV positions as [u][v][xyz].
+            np.ndarray: CV positions. Shape is (num_cvs_u, num_cvs_v, 3).
         """
-        positions = []
-        for cv_u in range(self.num_cvs_u):
-            row_positions = []
-            for cv_v in range(self.num_cvs_v):
-                cv_name = f"{self.geometry}.cv[{cv_u}][{cv_v}]"
-                pos = cmds.xform(cv_name, q=True, ws=True, t=True)
-                row_positions.append(pos)
-            positions.append(row_positions)
-        return positions
-
-    def _get_mesh_vtx_positions(self) -> list[list[list[float]]]:
-        """Get all vertex positions for mesh as a 2D grid.
+        positions = cmds.xform(f"{self.geometry}.cv[0:{self.num_cvs_u - 1}][0:{self.num_cvs_v - 1}]", q=True, ws=True, t=True)
+        return np.asarray(positions, dtype=np.float64).reshape(self.num_cvs_u, self.num_cvs_v, 3)
 
-        Returns:
-            list[list[list[float]]]: Vertex positions as [row][col][xyz].
-        """
-        positions = []
-        for row in range(self.num_verts_loft_direction):
-            row_positions = []
-            for col in range(self.num_verts_along_curve):
-                vtx_idx = row * self.num_verts_along_curve + col
-                vtx_name = f"{self.geometry}.vtx[{vtx_idx}]"
-                pos = cmds.xform(vtx_name, q=True, ws=True, t=True)
-                row_positions.append(pos)
-            positions.append(row_positions)
-        return positions
-
-    def _calculate_loft_interpolation_factor(
-        self,
-        curve_pos: int,
-        loft_pos: int,
-        loft_idx_a: int,
-        loft_idx_b: int,
-        positions: list[list[list[float]]],
-        method: str,
-        is_nurbs: bool,
-    ) -> float:
-        """Calculate interpolation factor for loft direction using distance or projection method.
-
-        Args:
-            curve_pos (int): Position in curve direction (u index for NURBS, col for mesh).
-            loft_pos (int): Current position in loft direction.
-            loft_idx_a (int): Loft index of chain A.
-            loft_idx_b (int): Loft index of chain B.
-            positions (list): 2D array of positions [curve_dir][loft_dir][xyz] for NURBS,
-                              or [loft_dir][curve_dir][xyz] for mesh.
-            method (str): 'distance' or 'projection'.
-            is_nurbs (bool): Whether this is for NURBS surface.
+    def _get_mesh_vtx_positions(self) -> np.ndarray:
+        """Get all vertex positions for mesh as a 2D grid.
 
         Returns:
-            float: Interpolation factor (0.0 to 1.0).
+            np.ndarray: Vertex positions. Shape is (num_verts_loft_direction, num_verts_along_curve, 3).
         """
-        # Get positions for point A (chain A), point B (chain B), and point P (current)
-        if is_nurbs:
-            # NURBS: positions[u][v][xyz], curve_pos=u, loft_pos=v
-            pos_a = positions[curve_pos][loft_idx_a]
-            pos_b = positions[curve_pos][loft_idx_b]
-            pos_p = positions[curve_pos][loft_pos]
-        else:
-            # Mesh: positions[row][col][xyz], curve_pos=col, loft_pos=row
-            pos_a = positions[loft_idx_a][curve_pos]
-            pos_b = positions[loft_idx_b][curve_pos]
-            pos_p = positions[loft_pos][curve_pos]
-
-        if method == LOFT_WEIGHT_DISTANCE:
-            return self._calculate_distance_factor(pos_a, pos_b, pos_p, loft_pos, loft_idx_a, loft_idx_b, positions, curve_pos, is_nurbs)
-        elif method == LOFT_WEIGHT_PROJECTION:
-            return self._calculate_projection_factor(pos_a, pos_b, pos_p)
-        else:
-            return 0.0
+        num_grid_vertices = self.num_verts_loft_direction * self.num_verts_along_curve
+        positions = cmds.xform(f"{self.geometry}.vtx[0:{num_grid_vertices - 1}]", q=True, ws=True, t=True)
+        return np.asarray(positions, dtype=np.float64).reshape(self.num_verts_loft_direction, self.num_verts_along_curve, 3)
 
-    def _calculate_distance_factor(
-        self,
-        pos_a: list[float],
-        pos_b: list[float],
-        pos_p: list[float],
-        loft_pos: int,
-        loft_idx_a: int,
-        loft_idx_b: int,
-        positions: list[list[list[float]]],
-        curve_pos: int,
-        is_nurbs: bool,
-    ) -> float:
-        """Calculate interpolation factor based on cumulative distance along U=0 CVs.
+    @staticmethod
+    def _calculate_distance_factors(positions: np.ndarray, loft_idx_a: np.ndarray, loft_idx_b: np.ndarray) -> np.ndarray:
+        """Calculate interpolation factors based on cumulative distance along U=0 CVs.
 
         Args:
-            pos_a, pos_b, pos_p: Positions of chain A, chain B, and current point.
-            loft_pos: Current loft position index.
-            loft_idx_a, loft_idx_b: Loft indices of chain A and B.
-            positions: 2D position array.
-            curve_pos: Current curve position index.
-            is_nurbs: Whether this is NURBS.
+            positions (np.ndarray): Positions. Shape is (num_curve, num_loft, 3).
+            loft_idx_a (np.ndarray): Loft index of chain A for each loft position. Shape is (num_loft,).
+            loft_idx_b (np.ndarray): Loft index of chain B for each loft position. Shape is (num_loft,).
 
         Returns:
-            float: Interpolation factor based on distance ratio.
+            np.ndarray: Interpolation factors based on distance ratio. Shape is (num_curve, num_loft).
         """
-        # Calculate cumulative distance from A to P and from A to B along the U=0 (or col=0) CVs
-        # Use curve_pos=0 for consistency (distance along first row/column)
-        dist_a_to_p = 0.0
-        dist_a_to_b = 0.0
-
-        # Determine the range of loft indices to traverse
-        start_idx = min(loft_idx_a, loft_idx_b)
-        end_idx = max(loft_idx_a, loft_idx_b)
+        # Cumulative distance along the first row of curve direction (U=0 or col=0)
+        segment_distances = np.linalg.norm(np.diff(positions[0], axis=0), axis=1)
+        cumulative = np.r_[0.0, np.cumsum(segment_distances)]
 
-        # Calculate distances using U=0 (first row of curve direction)
-        ref_curve_pos = 0
+        loft_positions = np.arange(positions.shape[1])
+        start_idx = np.minimum(loft_idx_a, loft_idx_b)
+        end_idx = np.maximum(loft_idx_a, loft_idx_b)
 
-        for i in range(start_idx, end_idx):
-            if is_nurbs:
-                p1 = positions[ref_curve_pos][i]
-                p2 = positions[ref_curve_pos][i + 1]
-            else:
-                p1 = positions[i][ref_curve_pos]
-                p2 = positions[i + 1][ref_curve_pos]
+        # Distance from A to B, and from A to P clamped to the A-B range
+        dist_a_to_b = cumulative[end_idx] - cumulative[start_idx]
+        dist_a_to_p = cumulative[np.clip(loft_positions, start_idx, end_idx)] - cumulative[start_idx]
 
-            segment_dist = sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2 + (p2[2] - p1[2]) ** 2)
-            dist_a_to_b += segment_dist
-
-            if i < loft_pos:
-                dist_a_to_p += segment_dist
-            elif i == loft_pos - 1:
-                # Add partial distance to reach loft_pos
-                dist_a_to_p += segment_dist
-
-        if dist_a_to_b == 0:
-            return 0.0
+        ratios = np.divide(dist_a_to_p, dist_a_to_b, out=np.zeros_like(dist_a_to_b), where=dist_a_to_b != 0)
 
         # If loft_idx_a > loft_idx_b, we need to invert the factor
-        if loft_idx_a > loft_idx_b:
-            return 1.0 - (dist_a_to_p / dist_a_to_b)
+        factors = np.where((loft_idx_a > loft_idx_b) & (dist_a_to_b != 0), 1.0 - ratios, ratios)
 
-        return dist_a_to_p / dist_a_to_b
+        return np.broadcast_to(factors, positions.shape[:2])
 
-    def _calculate_projection_factor(self, pos_a: list[float], pos_b: list[float], pos_p: list[float]) -> float:
-        """Calculate interpolation factor by projecting P onto line AB.
+    @staticmethod
+    def _calculate_projection_factors(positions: np.ndarray, loft_idx_a: np.ndarray, loft_idx_b: np.ndarray) -> np.ndarray:
+        """Calculate interpolation factors by projecting each point P onto the line AB of its chains.
 
         Projects point P onto the line segment AB and calculates the ratio AT:AB
         where T is the projection point.
 
         Args:
-            pos_a: Position of chain A (point A).
-            pos_b: Position of chain B (point B).
-            pos_p: Position of current CV/vertex (point P).
+            positions (np.ndarray): Positions. Shape is (num_curve, num_loft, 3).
+            loft_idx_a (np.ndarray): Loft index of chain A for each loft position. Shape is (num_loft,).
+            loft_idx_b (np.ndarray): Loft index of chain B for each loft position. Shape is (num_loft,).
 
         Returns:
-            float: Interpolation factor (clamped to 0.0-1.0).
+            np.ndarray: Interpolation factors (clamped to 0.0-1.0). Shape is (num_curve, num_loft).
         """
-        # Vector AB
-        ab = [pos_b[i] - pos_a[i] for i in range(3)]
-
-        # Vector AP
-        ap = [pos_p[i] - pos_a[i] for i in range(3)]
-
-        # Length squared of AB
-        ab_length_sq = ab[0] ** 2 + ab[1] ** 2 + ab[2] ** 2
-
-        if ab_length_sq == 0:
-            return 0.0
-
-        # Dot product of AP and AB
-        dot_ap_ab = ap[0] * ab[0] + ap[1] * ab[1] + ap[2] * ab[2]
+        pos_a = positions[:, loft_idx_a]
+        ab = positions[:, loft_idx_b] - pos_a
+        ap = positions - pos_a
 
         # t = (AP · AB) / |AB|² gives the projection factor
-        t = dot_ap_ab / ab_length_sq
+        ab_length_sq = np.einsum("ijk,ijk->ij", ab, ab)
+        dot_ap_ab = np.einsum("ijk,ijk->ij", ap, ab)
+        factors = np.divide(dot_ap_ab, ab_length_sq, out=np.zeros_like(ab_length_sq), where=ab_length_sq != 0)
 
         # Clamp to [0, 1] to ensure we stay within the segment
-        return max(0.0, min(1.0, t))
+        return np.clip(factors, 0.0, 1.0)
 
 
 __all__ = ["LoftWeightSetting"]
@@ -3,8 +3,9 @@
 from logging import getLogger
 
 import maya.cmds as cmds
+import numpy as np
 
-from ....lib import lib_skinCluster
+from ....lib import lib_skinCluster, lib_skinWeights
 
 logger = getLogger(__name__)
 
@@ -38,12 +39,15 @@ class SkinWeightsCopyPaste:
         self._only_unlock_influences = only_unlock_influences
 
         self._src_components = []
-        self._src_weights = []
+        self._src_component_names = []
+        self._src_weights = None
         self._src_skinCluster = None
 
         self._dst_components = []
-        self._dst_weights = []
+        self._dst_component_names = []
+        self._dst_weights = None
         self._dst_skinCluster = None
+        self._influence_permutation = None
 
     @property
     def method(self) -> str:
@@ -143,12 +147,11 @@ class SkinWeightsCopyPaste:
             cmds.error("No skinCluster found.")
 
         self._src_components = components
+        self._src_component_names = cmds.ls(components)
         self._src_skinCluster = skinCluster
 
         # Reset destination components
-        self._dst_components = []
-        self._dst_weights = []
-        self._dst_skinCluster = None
+        self.clear_dst_components()
 
         logger.debug(f"Set source components: {self._src_components}")
 
@@ -163,6 +166,7 @@ class SkinWeightsCopyPaste:
     def clear_src_components(self) -> None:
         """Clear the source components."""
         self._src_components = []
+        self._src_component_names = []
         self._src_skinCluster = None
 
         self.clear_dst_components()
@@ -180,6 +184,9 @@ class SkinWeightsCopyPaste:
     def set_dst_components(self, components: list[str]) -> None:
         """Set the destination components.
 
+        Notes:
+            - The source weights are read here and kept as an array reordered to the destination influences.
+
         Args:
             components (list[str]): The destination components.
         """
@@ -207,25 +214,19 @@ class SkinWeightsCopyPaste:
 
         self._dst_skinCluster = skinCluster
         self._dst_components = components
-        self._dst_weights = lib_skinCluster.get_skin_weights(skinCluster, components)
+        self._dst_component_names = cmds.ls(components)
+        self._dst_weights = lib_skinWeights.get_weights(skinCluster, self._dst_component_names)
 
-        src_weights = lib_skinCluster.get_skin_weights(self._src_skinCluster, self._src_components)
         src_infs = cmds.skinCluster(self._src_skinCluster, q=True, inf=True)
         dst_infs = cmds.skinCluster(self._dst_skinCluster, q=True, inf=True)
+        self._influence_permutation = lib_skinWeights.get_influence_permutation(src_infs, dst_infs)
 
-        self._src_weights = []
-        for src_weight in src_weights:
-            order_weight = []
-            for dst_inf in dst_infs:
-                if dst_inf in src_infs:
-                    order_weight.append(src_weight[src_infs.index(dst_inf)])
-                else:
-                    order_weight.append(0.0)
-
-            self._src_weights.append(order_weight)
-
+        src_weights = lib_skinWeights.get_weights(self._src_skinCluster, self._src_component_names)
         if self._method == "oneToAll":
-            self._src_weights = [self._src_weights[0]] * len(self._dst_components)
+            # A single row is broadcast to all destination components when pasting
+            src_weights = src_weights[:1]
+
+        self._src_weights = lib_skinWeights.permute_influences(src_weights, self._influence_permutation)
 
         logger.debug(f"Set destination components: {self._dst_components}")
 
@@ -239,11 +240,13 @@ class SkinWeightsCopyPaste:
 
     def clear_dst_components(self) -> None:
         """Clear the destination components."""
-        self._src_weights = []
+        self._src_weights = None
 
         self._dst_components = []
-        self._dst_weights = []
+        self._dst_component_names = []
+        self._dst_weights = None
         self._dst_skinCluster = None
+        self._influence_permutation = None
 
         logger.debug("Clear destination components")
 
@@ -269,11 +272,11 @@ class SkinWeightsCopyPaste:
             logger.debug("No destination components")
             return False
 
-        if not self._src_weights:
+        if self._src_weights is None or not len(self._src_weights):
             logger.debug("No source weights")
             return False
 
-        if not self._dst_weights:
+        if self._dst_weights is None or not len(self._dst_weights):
             logger.debug("No destination weights")
             return False
 
@@ -287,90 +290,24 @@ class SkinWeightsCopyPaste:
 
         return True
 
-    def _adjust_unlock_weights(self, new_weight: list[float], original_weight: list[float], unlocked_status: list[bool]) -> list[float]:
-        """Adjust weights to only modify unlocked influences.
-
-        This method ensures that locked influences remain unchanged while
-        unlocked influences are adjusted to maintain proper weight normalization.
-
-        Args:
-            new_weight (list[float]): The new weights after blending.
-            original_weight (list[float]): The original weights before blending.
-            unlocked_status (list[bool]): Boolean list indicating which influences are unlocked.
-
-        Returns:
-            list[float]: The adjusted weights with locked influences preserved.
-        """
-        num_infs = len(new_weight)
-        adjusted_weight = list(original_weight)  # Start with original weights
-
-        # Extract unlocked weights
-        unlock_before_weights = []
-        unlock_new_weights = []
-        for j in range(num_infs):
-            if unlocked_status[j]:
-                unlock_before_weights.append(original_weight[j])
-                unlock_new_weights.append(new_weight[j])
-
-        unlock_before_total = sum(unlock_before_weights)
-        unlock_new_total = sum(unlock_new_weights)
-
-        # If either total is very small, keep original weights
-        if unlock_before_total < 1e-5 or unlock_new_total < 1e-5:
-            return adjusted_weight
-
-        # Adjust weights based on totals
-        if unlock_before_total < unlock_new_total:
-            # Scale down new weights to fit within available space
-            for j in range(num_infs):
-                if unlocked_status[j]:
-                    adjusted_weight[j] = unlock_before_total * new_weight[j] / unlock_new_total
-                else:
-                    adjusted_weight[j] = original_weight[j]
-        else:
-            # Distribute difference proportionally
-            unlock_dif_total = unlock_before_total - unlock_new_total
-
-            for j in range(num_infs):
-                if unlocked_status[j]:
-                    adjusted_weight[j] = unlock_dif_total * (original_weight[j] / unlock_before_total) + new_weight[j]
-                else:
-                    adjusted_weight[j] = original_weight[j]
-
-        return adjusted_weight
-
     def paste_skinWeights(self) -> None:
         """Paste the skin weights."""
         if not self.is_pastable():
             cmds.error("Copy and paste is not ready.")
 
-        # Calculate blended weights
-        blended_weights = []
-        for src_weight, dst_weight in zip(self._src_weights, self._dst_weights):
-            new_weight = []
-            for src_w, dst_w in zip(src_weight, dst_weight):
-                new_weight.append(src_w * self._blend_weights + dst_w * (1.0 - self._blend_weights))
-
-            blended_weights.append(new_weight)
+        # Blend all components at once, a single source row is broadcast for oneToAll
+        blended_weights = self._src_weights * self._blend_weights + self._dst_weights * (1.0 - self._blend_weights)
 
         # Apply only_unlock_influences constraint if enabled
         if self._only_unlock_influences:
-            dst_infs = cmds.skinCluster(self._dst_skinCluster, q=True, inf=True)
-            unlocked_infs = lib_skinCluster.get_lock_influences(self._dst_skinCluster, lock=False)
-
-            if not unlocked_infs:
+            unlocked_mask = ~lib_skinWeights.get_lock_mask(self._dst_skinCluster)
+            if not np.any(unlocked_mask):
                 cmds.error("No unlocked influences found in destination skinCluster.")
 
-            unlocked_status = [inf in unlocked_infs for inf in dst_infs]
-
-            # Adjust weights for each component
-            final_weights = []
-            for new_weight, original_weight in zip(blended_weights, self._dst_weights):
-                adjusted_weight = self._adjust_unlock_weights(new_weight, original_weight, unlocked_status)
-                final_weights.append(adjusted_weight)
+            final_weights = lib_skinWeights.adjust_unlocked_weights(blended_weights, self._dst_weights, unlocked_mask)
         else:
-            final_weights = blended_weights
+            final_weights = lib_skinWeights.normalize_weights(blended_weights)
 
-        lib_skinCluster.set_skin_weights(self._dst_skinCluster, final_weights, self._dst_components)
+        lib_skinWeights.set_weights(self._dst_skinCluster, self._dst_component_names, final_weights)
 
         logger.debug(f"Copy and paste skin weights: {self._src_skinCluster} -> {self._dst_skinCluster}")
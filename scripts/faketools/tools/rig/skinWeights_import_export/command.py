@@ -1,18 +1,37 @@
 """SkinCluster weights Import/Export command."""
 
+import array
 from dataclasses import dataclass
+import hashlib
 import json
 from logging import getLogger
 import os
 import pickle
 from typing import Optional
 
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 
 from ....lib import lib_skinCluster
+from .manifest import WeightsManifest, create_entry, get_influences_hash, get_weights_hash, read_data_file
+
+try:
+    import numpy as np
+
+    from . import remap
+
+    REMAP_AVAILABLE = True
+except ImportError:
+    REMAP_AVAILABLE = False
 
 logger = getLogger(__name__)
 
+# Maximum number of files a delta chain may go through before a full file is written again.
+MAX_DELTA_CHAIN_DEPTH = 8
+
+# Methods to import the weights onto the target components.
+REMAP_METHODS = ["auto", "index", "nearest", "barycentric"]
+
 
 @dataclass
 class SkinClusterData:
@@ -23,14 +42,17 @@ class SkinClusterData:
     geometry_type: str
     num_components: int
     weights: list[list[float]]
+    topology_hash: Optional[str] = None
+    positions: Optional[list[float]] = None
+    triangles: Optional[list[int]] = None
 
     @classmethod
-    def from_geometry(cls, geometry_name: str) -> "SkinClusterData":
+    def from_geometry(cls, geometry_name: str, with_triangles: bool = False) -> "SkinClusterData":
         """Get the skinCluster data from the geometry.
 
         Args:
             geometry_name (str): The geometry name.
-            influences (list[str]): The influences.
+            with_triangles (bool): Whether to get the triangles of meshes for the barycentric remap. Default is False.
 
         Returns:
             SkinClusterData: The skinCluster data.
@@ -49,10 +71,98 @@ class SkinClusterData:
         influences = cmds.skinCluster(skinCluster, q=True, inf=True)
         num_components = len(cmds.ls(f"{geometry_name}.cp[*]", fl=True))
         weights = lib_skinCluster.get_skin_weights_custom(skinCluster, all_components=True)
+        topology_hash = get_topology_hash(geometry_name, geometry_type, num_components)
+        positions, triangles = get_geometry_points(geometry_name, geometry_type, with_triangles=with_triangles)
 
         logger.debug(f"Loaded skinCluster data: {geometry_name}")
 
-        return cls(influences=influences, geometry_name=geometry_name, geometry_type=geometry_type, num_components=num_components, weights=weights)
+        return cls(
+            influences=influences,
+            geometry_name=geometry_name,
+            geometry_type=geometry_type,
+            num_components=num_components,
+            weights=weights,
+            topology_hash=topology_hash,
+            positions=positions,
+            triangles=triangles,
+        )
+
+    def get_hashes(self) -> dict[str, Optional[str]]:
+        """Get the content hashes of the skinCluster data.
+
+        Returns:
+            dict[str, Optional[str]]: The topology, influences and weights hashes.
+        """
+        return {
+            "topology_hash": self.topology_hash,
+            "influences_hash": get_influences_hash(self.influences),
+            "weights_hash": get_weights_hash(self.weights),
+        }
+
+    def remap_weights(self, method: str = "auto") -> None:
+        """Remap the weights onto the components of the geometry.
+
+        Notes:
+            - The weights are remapped from the rest positions stored at export to the current world positions of the geometry.
+            - 'auto' keeps the component order if the number of components and the topology match,
+              otherwise uses 'barycentric' if the triangles are stored and 'nearest' if not.
+            - 'barycentric' falls back to 'nearest' if the triangles are not stored.
+
+        Args:
+            method (str): The remap method. 'auto', 'index', 'nearest' or 'barycentric'. Default is 'auto'.
+        """
+        if method not in REMAP_METHODS:
+            raise ValueError(f"Invalid remap method: {method}")
+
+        if method == "index":
+            return
+
+        if not cmds.objExists(self.geometry_name):
+            raise ValueError(f"Geometry not found: {self.geometry_name}")
+
+        geometry_type = cmds.nodeType(self.geometry_name)
+        if geometry_type != self.geometry_type:
+            raise ValueError(f"Geometry type mismatch: {geometry_type} != {self.geometry_type}")
+
+        positions, triangles = get_geometry_points(self.geometry_name, geometry_type, with_triangles=self.triangles is not None)
+        num_components = len(positions) // 3
+
+        if method == "auto":
+            if num_components == self.num_components and (
+                not self.topology_hash or self.topology_hash == get_topology_hash(self.geometry_name, geometry_type, num_components)
+            ):
+                return
+
+            method = "barycentric" if self.triangles else "nearest"
+
+        if not self.positions:
+            raise ValueError(f"Rest positions are not stored in the data, can not remap: {self.geometry_name}")
+
+        if not REMAP_AVAILABLE:
+            raise RuntimeError("numpy and scipy are required to remap the weights.")
+
+        num_infs = len(self.influences)
+        src_points = np.asarray(self.positions, dtype=np.float64).reshape(-1, 3)
+        src_weights = np.asarray(self.weights, dtype=np.float64).reshape(-1, num_infs)
+        dst_points = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+
+        if method == "barycentric" and not self.triangles:
+            logger.warning(f"Triangles are not stored in the data, remap by the nearest points: {self.geometry_name}")
+            method = "nearest"
+
+        if method == "barycentric":
+            src_triangles = np.asarray(self.triangles, dtype=np.int64).reshape(-1, 3)
+            weights = remap.remap_weights_barycentric(src_points, src_triangles, src_weights, dst_points)
+        else:
+            weights = remap.remap_weights_nearest(src_points, src_weights, dst_points)
+
+        self.num_components = num_components
+        self.weights = weights.ravel().tolist()
+        self.topology_hash = get_topology_hash(self.geometry_name, geometry_type, num_components)
+        self.positions = positions
+        self.triangles = triangles
+
+        logger.debug(f"Remapped skinCluster weights ({method}): {self.geometry_name}")
 
     def apply_weights(self) -> None:
         """Apply the skinCluster weights to the geometry."""
@@ -84,13 +194,33 @@ class SkinClusterData:
 class SkinClusterDataIO:
     """SkinCluster data import/export tools."""
 
-    def export_weights(self, skinCluster_data: SkinClusterData, output_dir_path: str, format: str = "json"):
+    def export_weights(
+        self,
+        skinCluster_data: SkinClusterData,
+        output_dir_path: str,
+        format: str = "json",
+        incremental: bool = False,
+        base_dir_path: Optional[str] = None,
+        delta: bool = False,
+    ) -> str:
         """Export the skinCluster weights.
 
         Args:
             skinCluster_data (SkinClusterData): The skinCluster data.
             output_dir_path (str): The output directory path.
             format (str): The format of the file. Default is 'json'.
+            incremental (bool): Whether to skip the geometry if its weights are unchanged from the base directory. Default is False.
+            base_dir_path (Optional[str]): The directory of the previous snapshot. Default is None (the output directory).
+            delta (bool): Whether to write only the changed component weights against the base directory. Default is False.
+
+        Notes:
+            - The manifest of the output directory is always updated.
+            - Unchanged geometries are skipped if the base directory is the output directory,
+              otherwise a small reference file to the previous snapshot file is written.
+            - Delta files are only written when the topology and the influences are unchanged.
+
+        Returns:
+            str: The export result. 'full', 'delta' or 'unchanged'.
         """
         if not os.path.exists(output_dir_path):
             raise FileNotFoundError(f"Output directory path not found: {output_dir_path}")
@@ -98,15 +228,149 @@ class SkinClusterDataIO:
         if format not in ["json", "pickle"]:
             raise ValueError(f"Invalid format: {format}")
 
+        hashes = skinCluster_data.get_hashes()
+        manifest = WeightsManifest(output_dir_path)
+        output_file_name = f"{skinCluster_data.geometry_name}.{format}"
+
+        if incremental:
+            base_dir_path = os.path.normpath(base_dir_path or output_dir_path)
+            base_manifest = manifest if base_dir_path == manifest.dir_path else WeightsManifest(base_dir_path)
+            base_item = base_manifest.find_geometry(skinCluster_data.geometry_name)
+            if base_item:
+                base_file_name, base_entry = base_item
+                same_layout = all(base_entry.get(key) == hashes[key] for key in ["topology_hash", "influences_hash"])
+                base_file_path, base_depth = self._resolve_base_file(base_manifest.dir_path, base_file_name, base_entry)
+
+                if same_layout and base_entry.get("weights_hash") == hashes["weights_hash"]:
+                    if base_manifest is manifest:
+                        logger.debug(f"Skipped unchanged skinCluster data: {skinCluster_data.geometry_name}")
+                        return "unchanged"
+
+                    if base_depth < MAX_DELTA_CHAIN_DEPTH:
+                        self._write_delta(skinCluster_data, hashes, manifest, output_file_name, format, base_file_path, base_depth, [])
+                        return "unchanged"
+
+                elif same_layout and delta and base_manifest is not manifest and base_depth < MAX_DELTA_CHAIN_DEPTH:
+                    base_data = self.load_data(base_file_path)
+                    changed_indices = get_changed_indices(base_data.weights, skinCluster_data.weights, len(skinCluster_data.influences))
+
+                    # A delta of more than half of the components is not worth the chain
+                    if len(changed_indices) * 2 <= skinCluster_data.num_components:
+                        self._write_delta(skinCluster_data, hashes, manifest, output_file_name, format, base_file_path, base_depth, changed_indices)
+                        return "delta"
+
         output_data = {
             "influences": skinCluster_data.influences,
             "geometry_name": skinCluster_data.geometry_name,
             "geometry_type": skinCluster_data.geometry_type,
             "num_components": skinCluster_data.num_components,
             "weights": skinCluster_data.weights,
+            "topology_hash": skinCluster_data.topology_hash,
+            "weights_hash": hashes["weights_hash"],
+            "positions": skinCluster_data.positions,
         }
+        if skinCluster_data.triangles is not None:
+            output_data["triangles"] = skinCluster_data.triangles
+
+        output_file_path = os.path.join(output_dir_path, output_file_name)
+        self._write_file(output_data, output_file_path, format)
+
+        manifest.set_entry(output_file_name, create_entry(output_data, hashes["weights_hash"]))
+        manifest.save()
+
+        logger.debug(f"Exported skinCluster data: {output_file_path}")
+
+        return "full"
+
+    def _write_delta(
+        self,
+        skinCluster_data: SkinClusterData,
+        hashes: dict,
+        manifest: WeightsManifest,
+        output_file_name: str,
+        format: str,
+        base_file_path: str,
+        base_depth: int,
+        changed_indices: list[int],
+    ) -> None:
+        """Write the delta file against the base file.
+
+        Args:
+            skinCluster_data (SkinClusterData): The skinCluster data.
+            hashes (dict): The content hashes of the skinCluster data.
+            manifest (WeightsManifest): The manifest of the output directory.
+            output_file_name (str): The output file name.
+            format (str): The format of the file.
+            base_file_path (str): The base file path.
+            base_depth (int): The delta chain depth of the base file.
+            changed_indices (list[int]): The changed component indices. Empty for a reference to the base file.
+        """
+        try:
+            base_ref = os.path.relpath(base_file_path, manifest.dir_path)
+        except ValueError:
+            # Different drives on Windows
+            base_ref = base_file_path
+
+        num_infs = len(skinCluster_data.influences)
+        weights = skinCluster_data.weights
+        delta_weights = []
+        for index in changed_indices:
+            delta_weights.extend(weights[index * num_infs : (index + 1) * num_infs])
+
+        output_data = {
+            "influences": skinCluster_data.influences,
+            "geometry_name": skinCluster_data.geometry_name,
+            "geometry_type": skinCluster_data.geometry_type,
+            "num_components": skinCluster_data.num_components,
+            "weights": delta_weights,
+            "topology_hash": skinCluster_data.topology_hash,
+            "weights_hash": hashes["weights_hash"],
+            "delta": {"base": base_ref, "indices": changed_indices},
+        }
+
+        output_file_path = os.path.join(manifest.dir_path, output_file_name)
+        self._write_file(output_data, output_file_path, format)
+
+        manifest.set_entry(
+            output_file_name,
+            create_entry(output_data, hashes["weights_hash"], base=base_ref, delta_rows=len(changed_indices), chain_depth=base_depth + 1),
+        )
+        manifest.save()
+
+        logger.debug(f"Exported skinCluster delta data: {output_file_path} ({len(changed_indices)} components) -> {base_ref}")
+
+    def _resolve_base_file(self, base_dir_path: str, base_file_name: str, base_entry: dict) -> tuple[str, int]:
+        """Resolve the file that a new delta should refer to.
 
-        output_file_path = os.path.join(output_dir_path, f"{skinCluster_data.geometry_name}.{format}")
+        Notes:
+            - A reference file without changed components is skipped so that the chain does not grow for unchanged geometries.
+
+        Args:
+            base_dir_path (str): The base directory path.
+            base_file_name (str): The base file name.
+            base_entry (dict): The manifest entry of the base file.
+
+        Returns:
+            tuple[str, int]: The file path and its delta chain depth.
+        """
+        base_file_path = os.path.join(base_dir_path, base_file_name)
+        depth = base_entry.get("chain_depth")
+        if depth is None:
+            depth = MAX_DELTA_CHAIN_DEPTH
+
+        if base_entry.get("base") and base_entry.get("delta_rows") == 0:
+            return os.path.normpath(os.path.join(base_dir_path, base_entry["base"])), depth - 1
+
+        return os.path.normpath(base_file_path), depth
+
+    def _write_file(self, output_data: dict, output_file_path: str, format: str) -> None:
+        """Write the data to the file.
+
+        Args:
+            output_data (dict): The output data.
+            output_file_path (str): The output file path.
+            format (str): The format of the file.
+        """
         if format == "json":
             with open(output_file_path, "w") as f:
                 json.dump(output_data, f, indent=4)
@@ -116,48 +380,39 @@ class SkinClusterDataIO:
         else:
             raise ValueError(f"Invalid format: {format}")
 
-        logger.debug(f"Exported skinCluster data: {output_file_path}")
-
-    def import_weights(self, skinCluster_data: SkinClusterData, target_geometry: Optional[str] = None) -> None:
+    def import_weights(self, skinCluster_data: SkinClusterData, target_geometry: Optional[str] = None, method: str = "auto") -> None:
         """Import the skinCluster weights.
 
         Args:
             skinCluster_data (SkinClusterData): The skinCluster data.
             target_geometry (str): The target geometry name. Default is None.
+            method (str): The remap method. 'auto', 'index', 'nearest' or 'barycentric'. Default is 'auto'.
 
         Notes:
             - If the target geometry is None, the geometry name will be used.
             - If the target geometry is found, apply the weights to the geometry.
+            - If the components of the target geometry do not match the data, the weights are remapped by the rest positions.
 
         """
         if target_geometry:
             skinCluster_data.geometry_name = target_geometry
 
+        skinCluster_data.remap_weights(method)
         skinCluster_data.apply_weights()
 
     def load_data(self, file_path: str) -> SkinClusterData:
         """Load the skinCluster data.
 
+        Notes:
+            - Delta files are resolved through their base files.
+
         Args:
             file_path (str): The file path.
 
         Returns:
             SkinClusterData: The skinCluster data.
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File path not found: {file_path}")
-
-        if file_path.endswith(".json"):
-            with open(file_path) as f:
-                input_data = json.load(f)
-        elif file_path.endswith(".pickle"):
-            with open(file_path, "rb") as f:
-                input_data = pickle.load(f)
-        else:
-            raise ValueError(f"Invalid file format: {file_path}")
-
-        if not all(k in input_data for k in ["influences", "geometry_name", "geometry_type", "num_components", "weights"]):
-            raise ValueError(f"Invalid input data: {file_path}")
+        input_data = self._load_input_data(file_path, chain=[])
 
         logger.debug(f"Loaded skinCluster data: {file_path}")
 
@@ -167,8 +422,133 @@ class SkinClusterDataIO:
             geometry_type=input_data["geometry_type"],
             num_components=input_data["num_components"],
             weights=input_data["weights"],
+            topology_hash=input_data.get("topology_hash"),
+            positions=input_data.get("positions"),
+            triangles=input_data.get("triangles"),
         )
 
+    def _load_input_data(self, file_path: str, chain: list[str]) -> dict:
+        """Load the input data and resolve the delta chain.
+
+        Args:
+            file_path (str): The file path.
+            chain (list[str]): The file paths already visited in the delta chain.
+
+        Returns:
+            dict: The input data with the full weights.
+        """
+        file_path = os.path.normpath(file_path)
+        if file_path in chain:
+            raise ValueError(f"Circular delta chain: {chain + [file_path]}")
+
+        input_data = read_data_file(file_path)
+
+        delta = input_data.get("delta")
+        if not delta:
+            return input_data
+
+        base_file_path = os.path.join(os.path.dirname(file_path), delta["base"])
+        if not os.path.exists(base_file_path):
+            raise FileNotFoundError(f"Base file of the delta not found: {file_path} -> {base_file_path}")
+
+        base_data = self._load_input_data(base_file_path, chain + [file_path])
+        if base_data["num_components"] != input_data["num_components"] or base_data["influences"] != input_data["influences"]:
+            raise ValueError(f"Delta does not match its base file: {file_path} -> {base_file_path}")
+
+        num_infs = len(input_data["influences"])
+        weights = list(base_data["weights"])
+        delta_weights = input_data["weights"]
+        for i, index in enumerate(delta["indices"]):
+            weights[index * num_infs : (index + 1) * num_infs] = delta_weights[i * num_infs : (i + 1) * num_infs]
+
+        weights_hash = input_data.get("weights_hash")
+        if weights_hash and weights_hash != get_weights_hash(weights):
+            raise ValueError(f"Base file of the delta has been modified: {file_path} -> {base_file_path}")
+
+        input_data["weights"] = weights
+        for key in ["positions", "triangles"]:
+            if input_data.get(key) is None:
+                input_data[key] = base_data.get(key)
+        del input_data["delta"]
+
+        logger.debug(f"Resolved delta data: {file_path} -> {base_file_path}")
+
+        return input_data
+
+
+def get_topology_hash(geometry_name: str, geometry_type: str, num_components: int) -> str:
+    """Get the topology hash of the geometry.
+
+    Notes:
+        - For meshes, the face vertex layout is hashed. For other geometries, only the type and the number of components are hashed.
+
+    Args:
+        geometry_name (str): The geometry name.
+        geometry_type (str): The geometry type.
+        num_components (int): The number of components.
+
+    Returns:
+        str: The topology hash.
+    """
+    hasher = hashlib.blake2b(f"{geometry_type}:{num_components}".encode(), digest_size=16)
+
+    if geometry_type == "mesh":
+        selection_list = om.MSelectionList()
+        selection_list.add(geometry_name)
+        counts, connects = om.MFnMesh(selection_list.getDagPath(0)).getVertices()
+        hasher.update(array.array("i", counts).tobytes())
+        hasher.update(array.array("i", connects).tobytes())
+
+    return hasher.hexdigest()
+
+
+def get_geometry_points(geometry_name: str, geometry_type: str, with_triangles: bool = False) -> tuple[list[float], Optional[list[int]]]:
+    """Get the world positions of the components and the triangles of the geometry.
+
+    Args:
+        geometry_name (str): The geometry name.
+        geometry_type (str): The geometry type.
+        with_triangles (bool): Whether to get the triangles of meshes. Default is False.
+
+    Returns:
+        tuple[list[float], Optional[list[int]]]: The flat positions and the flat triangle vertex indices.
+            Triangles are None if not requested or the geometry is not a mesh.
+    """
+    if geometry_type == "mesh":
+        selection_list = om.MSelectionList()
+        selection_list.add(geometry_name)
+        mesh_fn = om.MFnMesh(selection_list.getDagPath(0))
+        positions = [value for point in mesh_fn.getPoints(om.MSpace.kWorld) for value in (point.x, point.y, point.z)]
+        if not with_triangles:
+            return positions, None
+
+        _, triangles = mesh_fn.getTriangles()
+
+        return positions, list(triangles)
+
+    return cmds.xform(f"{geometry_name}.cp[*]", q=True, ws=True, t=True), None
+
+
+def get_changed_indices(base_weights: list[float], weights: list[float], num_influences: int) -> list[int]:
+    """Get the component indices whose weights differ from the base weights.
+
+    Args:
+        base_weights (list[float]): The flat base weights.
+        weights (list[float]): The flat weights.
+        num_influences (int): The number of influences.
+
+    Returns:
+        list[int]: The changed component indices.
+    """
+    if len(base_weights) != len(weights):
+        raise ValueError("The number of weights does not match.")
+
+    return [
+        i
+        for i, start in enumerate(range(0, len(weights), num_influences))
+        if weights[start : start + num_influences] != base_weights[start : start + num_influences]
+    ]
+
 
 def validate_export_weights(shapes: list[str]) -> None:
     """Validate the export weights command.
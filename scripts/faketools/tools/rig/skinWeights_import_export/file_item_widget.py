@@ -14,19 +14,21 @@ _IMAGES_DIR = Path(__file__).parent / "images"
 class FileItemWidget(QWidget):
     """Custom widget for file list items."""
 
-    def __init__(self, file_path, on_select_influences=None, on_select_geometry=None, parent=None):
+    def __init__(self, file_path, on_select_influences=None, on_select_geometry=None, metadata=None, parent=None):
         """Initialize the file item widget.
 
         Args:
             file_path (str): The file or directory path
             on_select_influences (callable, optional): Callback for Select Influences button
             on_select_geometry (callable, optional): Callback for Select Geometry button
+            metadata (dict, optional): The manifest entry of the file shown as the tooltip
             parent (QWidget, optional): The parent widget
         """
         super().__init__(parent)
         self.file_path = file_path
         self.on_select_influences = on_select_influences
         self.on_select_geometry = on_select_geometry
+        self.metadata = metadata
 
         self._setup_ui()
 
@@ -57,6 +59,13 @@ class FileItemWidget(QWidget):
         else:
             name = os.path.basename(self.file_path)
         name_label.setText(name)
+        if self.metadata:
+            name_label.setToolTip(
+                f"Geometry: {self.metadata['geometry_name']}\n"
+                f"Type: {self.metadata['geometry_type']}\n"
+                f"Components: {self.metadata['num_components']}\n"
+                f"Influences: {len(self.metadata['influences'])}"
+            )
         name_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
         layout.addWidget(name_label)
 
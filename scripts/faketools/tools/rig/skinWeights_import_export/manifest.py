@@ -0,0 +1,544 @@
+"""Manifest of the exported skinCluster weight files.
+
+The manifest is a small json file stored next to the weight files of a directory.
+It records the metadata and the content hashes of each exported file so that the file list
+can be populated and incremental exports can skip unchanged geometries without opening the weight files.
+Each entry keeps the modification time and the size of its file and is re-read from the file when they no longer match.
+Saving merges the changed entries into the manifest on disk under a lock per directory,
+so the background rebuild and the exports do not drop each other's entries.
+"""
+
+import array
+import hashlib
+import json
+from logging import getLogger
+import os
+import pickle
+import tempfile
+import threading
+from typing import Optional
+
+logger = getLogger(__name__)
+
+# Maya node names can not start with a dot, so exported weight files never use this name.
+MANIFEST_FILE_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+# Records the last exported directory under the root directory.
+LAST_EXPORT_FILE_NAME = ".last_export.json"
+
+_locks: dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+class WeightsManifest:
+    """Manifest of the weight files in a directory."""
+
+    def __init__(self, dir_path: str):
+        """Initialize the manifest.
+
+        Args:
+            dir_path (str): The directory path of the weight files.
+        """
+        self._dir_path = os.path.normpath(dir_path)
+        self._files = {}
+        self._changes = {}
+
+        self.load()
+
+    @property
+    def dir_path(self) -> str:
+        """Get the directory path.
+
+        Returns:
+            str: The directory path.
+        """
+        return self._dir_path
+
+    @property
+    def file_path(self) -> str:
+        """Get the manifest file path.
+
+        Returns:
+            str: The manifest file path.
+        """
+        return os.path.join(self._dir_path, MANIFEST_FILE_NAME)
+
+    @property
+    def is_dirty(self) -> bool:
+        """Return True if the manifest has unsaved changes.
+
+        Returns:
+            bool: True if the manifest has unsaved changes.
+        """
+        return bool(self._changes)
+
+    def exists(self) -> bool:
+        """Return True if the manifest file exists.
+
+        Returns:
+            bool: True if the manifest file exists.
+        """
+        return os.path.isfile(self.file_path)
+
+    def load(self) -> None:
+        """Load the manifest file.
+
+        Notes:
+            - A missing, broken or incompatible manifest is treated as empty.
+            - Unsaved changes are discarded.
+        """
+        self._files = self._read_files()
+        self._changes = {}
+
+    def save(self) -> None:
+        """Save the manifest file.
+
+        Notes:
+            - The manifest is re-read and only the entries changed by this instance are updated or removed,
+              so the entries saved by other writers since it was loaded are kept.
+        """
+        with _get_lock(self._dir_path):
+            files = self._read_files()
+            for file_name, entry in self._changes.items():
+                if entry is None:
+                    files.pop(file_name, None)
+                else:
+                    files[file_name] = entry
+
+            data = {"version": MANIFEST_VERSION, "files": files}
+
+            with tempfile.NamedTemporaryFile("w", dir=self._dir_path, prefix=f"{MANIFEST_FILE_NAME}.", suffix=".tmp", delete=False) as f:
+                tmp_file_path = f.name
+                try:
+                    json.dump(data, f, indent=4)
+                except Exception:
+                    f.close()
+                    os.remove(tmp_file_path)
+                    raise
+            os.replace(tmp_file_path, self.file_path)
+
+        self._files = files
+        self._changes = {}
+
+        logger.debug(f"Saved manifest: {self.file_path}")
+
+    def _read_files(self) -> dict:
+        """Read the entries of the manifest file.
+
+        Returns:
+            dict: The entries by file name. Empty if the manifest is missing, broken or incompatible.
+        """
+        if not self.exists():
+            return {}
+
+        try:
+            with open(self.file_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read manifest: {self.file_path}: {e}")
+            return {}
+
+        if data.get("version") != MANIFEST_VERSION:
+            logger.debug(f"Manifest version mismatch, ignored: {self.file_path}")
+            return {}
+
+        return data.get("files", {})
+
+    def get_file_names(self) -> list[str]:
+        """Get the registered file names.
+
+        Returns:
+            list[str]: The file names.
+        """
+        return list(self._files.keys())
+
+    def get_entry(self, file_name: str) -> Optional[dict]:
+        """Get the entry of the file as registered.
+
+        Args:
+            file_name (str): The file name.
+
+        Returns:
+            Optional[dict]: The entry. None if not registered.
+        """
+        return self._files.get(file_name)
+
+    def is_current(self, file_name: str) -> bool:
+        """Return True if the entry of the file matches the modification time and the size of the file.
+
+        Args:
+            file_name (str): The file name.
+
+        Returns:
+            bool: True if the entry is up to date. False if it is missing or stale, or the file does not exist.
+        """
+        entry = self._files.get(file_name)
+        if not entry:
+            return False
+
+        try:
+            stat = os.stat(os.path.join(self._dir_path, file_name))
+        except OSError:
+            return False
+
+        return entry.get("mtime") == stat.st_mtime and entry.get("size") == stat.st_size
+
+    def get_metadata(self, file_name: str) -> Optional[dict]:
+        """Get the verified entry of the file.
+
+        Notes:
+            - If the modification time or the size of the file differs from the entry, the entry is rebuilt from the file.
+            - The rebuilt entry is not saved until save() is called.
+
+        Args:
+            file_name (str): The file name.
+
+        Returns:
+            Optional[dict]: The entry. None if the file does not exist or can not be read.
+        """
+        file_path = os.path.join(self._dir_path, file_name)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.remove_entry(file_name)
+            return None
+
+        entry = self._files.get(file_name)
+        if entry and entry.get("mtime") == stat.st_mtime and entry.get("size") == stat.st_size:
+            return entry
+
+        try:
+            entry = create_entry_from_file(file_path)
+        except Exception as e:
+            logger.warning(f"Failed to read weights file: {file_path}: {e}")
+            return None
+
+        entry["mtime"] = stat.st_mtime
+        entry["size"] = stat.st_size
+        self._files[file_name] = entry
+        self._changes[file_name] = entry
+
+        logger.debug(f"Updated manifest entry: {file_path}")
+
+        return entry
+
+    def find_geometry(self, geometry_name: str) -> Optional[tuple[str, dict]]:
+        """Find the entry of the geometry.
+
+        Args:
+            geometry_name (str): The geometry name.
+
+        Returns:
+            Optional[tuple[str, dict]]: The file name and the verified entry. None if not registered.
+        """
+        for file_name in list(self._files.keys()):
+            if self._files[file_name].get("geometry_name") != geometry_name:
+                continue
+
+            entry = self.get_metadata(file_name)
+            if entry and entry.get("geometry_name") == geometry_name:
+                return file_name, entry
+
+        return None
+
+    def set_entry(self, file_name: str, entry: dict) -> None:
+        """Set the entry of the file.
+
+        Notes:
+            - The modification time and the size are taken from the file.
+            - Other entries of the same geometry are removed.
+
+        Args:
+            file_name (str): The file name.
+            entry (dict): The entry.
+        """
+        geometry_name = entry.get("geometry_name")
+        for other_file_name in list(self._files.keys()):
+            if other_file_name != file_name and self._files[other_file_name].get("geometry_name") == geometry_name:
+                self.remove_entry(other_file_name)
+
+        stat = os.stat(os.path.join(self._dir_path, file_name))
+        self._files[file_name] = dict(entry, mtime=stat.st_mtime, size=stat.st_size)
+        self._changes[file_name] = self._files[file_name]
+
+    def remove_entry(self, file_name: str) -> None:
+        """Remove the entry of the file.
+
+        Args:
+            file_name (str): The file name.
+        """
+        if self._files.pop(file_name, None) is not None:
+            self._changes[file_name] = None
+
+    def rebuild(self) -> None:
+        """Verify the entries of all weight files in the directory and save the manifest.
+
+        Notes:
+            - Entries of deleted files are removed. Entries of new or modified files are read from the files.
+        """
+        file_names = [file_name for file_name in os.listdir(self._dir_path) if is_weights_file(file_name)]
+        for file_name in list(self._files.keys()):
+            if file_name not in file_names:
+                self.remove_entry(file_name)
+
+        for file_name in file_names:
+            self.get_metadata(file_name)
+
+        if self.is_dirty or not self.exists():
+            self.save()
+
+        logger.debug(f"Rebuilt manifest: {self.file_path}")
+
+
+def _get_lock(dir_path: str) -> threading.Lock:
+    """Get the lock of the manifest of the directory.
+
+    Args:
+        dir_path (str): The normalized directory path.
+
+    Returns:
+        threading.Lock: The lock.
+    """
+    with _locks_lock:
+        return _locks.setdefault(dir_path, threading.Lock())
+
+
+def is_weights_file(file_name: str) -> bool:
+    """Return True if the file is an exported skinCluster weights file.
+
+    Notes:
+        - Files starting with a dot are reserved for the manifest and are never weights files.
+
+    Args:
+        file_name (str): The file name or path.
+
+    Returns:
+        bool: True if the file is a weights file.
+    """
+    if os.path.basename(file_name).startswith("."):
+        return False
+
+    return file_name.endswith((".json", ".pickle"))
+
+
+def read_data_file(file_path: str) -> dict:
+    """Read the raw data of the weights file.
+
+    Args:
+        file_path (str): The file path.
+
+    Returns:
+        dict: The raw data. Delta files are not resolved.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File path not found: {file_path}")
+
+    if file_path.endswith(".json"):
+        with open(file_path) as f:
+            input_data = json.load(f)
+    elif file_path.endswith(".pickle"):
+        with open(file_path, "rb") as f:
+            input_data = pickle.load(f)
+    else:
+        raise ValueError(f"Invalid file format: {file_path}")
+
+    if not all(k in input_data for k in ["influences", "geometry_name", "geometry_type", "num_components", "weights"]):
+        raise ValueError(f"Invalid input data: {file_path}")
+
+    return input_data
+
+
+def create_entry(
+    data: dict,
+    weights_hash: Optional[str],
+    base: Optional[str] = None,
+    delta_rows: Optional[int] = None,
+    chain_depth: Optional[int] = 0,
+) -> dict:
+    """Create the manifest entry of the weights data.
+
+    Args:
+        data (dict): The weights data. The same keys as the weights file.
+        weights_hash (Optional[str]): The hash of the full weights.
+        base (Optional[str]): The base file path relative to the directory if the file is a delta.
+        delta_rows (Optional[int]): The number of components stored in the delta file.
+        chain_depth (Optional[int]): The number of delta files until a full file. None if unknown.
+
+    Returns:
+        dict: The manifest entry.
+    """
+    return {
+        "geometry_name": data["geometry_name"],
+        "geometry_type": data["geometry_type"],
+        "num_components": data["num_components"],
+        "influences": data["influences"],
+        "topology_hash": data.get("topology_hash"),
+        "influences_hash": get_influences_hash(data["influences"]),
+        "weights_hash": weights_hash,
+        "base": base,
+        "delta_rows": delta_rows,
+        "chain_depth": chain_depth,
+    }
+
+
+def create_entry_from_file(file_path: str) -> dict:
+    """Create the manifest entry by reading the weights file.
+
+    Notes:
+        - The chain depth of a delta file is found by following its base files, see get_chain_depth.
+
+    Args:
+        file_path (str): The file path.
+
+    Returns:
+        dict: The manifest entry without the modification time and the size.
+    """
+    data = read_data_file(file_path)
+
+    delta = data.get("delta")
+    if delta:
+        chain_depth = get_chain_depth(file_path, data)
+        return create_entry(data, data.get("weights_hash"), base=delta["base"], delta_rows=len(delta["indices"]), chain_depth=chain_depth)
+
+    return create_entry(data, data.get("weights_hash") or get_weights_hash(data["weights"]))
+
+
+def get_chain_depth(file_path: str, data: Optional[dict] = None) -> Optional[int]:
+    """Get the number of delta files from the file until a full file.
+
+    Notes:
+        - The base references are followed through the files. An up to date manifest entry
+          of a base file with a known chain depth ends the walk without reading further files.
+
+    Args:
+        file_path (str): The file path.
+        data (Optional[dict]): The raw data of the file if already read. Defaults to None.
+
+    Returns:
+        Optional[int]: The chain depth. 0 for a full file. None if a base file is missing or invalid, or the chain is circular.
+    """
+    file_path = os.path.normpath(file_path)
+    visited = set()
+    depth = 0
+    while True:
+        if file_path in visited:
+            logger.warning(f"Circular delta chain: {file_path}")
+            return None
+
+        visited.add(file_path)
+
+        if data is None:
+            dir_path, file_name = os.path.split(file_path)
+            manifest = WeightsManifest(dir_path)
+            entry = manifest.get_entry(file_name)
+            if entry and entry.get("chain_depth") is not None and manifest.is_current(file_name):
+                return depth + entry["chain_depth"]
+
+            try:
+                data = read_data_file(file_path)
+            except Exception as e:
+                logger.warning(f"Failed to read base file of the delta: {file_path}: {e}")
+                return None
+
+        delta = data.get("delta")
+        if not delta:
+            return depth
+
+        depth += 1
+        file_path = os.path.normpath(os.path.join(os.path.dirname(file_path), delta["base"]))
+        data = None
+
+
+def get_influences_hash(influences: list[str]) -> str:
+    """Get the hash of the influence list.
+
+    Args:
+        influences (list[str]): The influences.
+
+    Returns:
+        str: The influences hash.
+    """
+    return hashlib.blake2b("\n".join(influences).encode(), digest_size=16).hexdigest()
+
+
+def get_weights_hash(weights: list[float]) -> str:
+    """Get the hash of the flat weights.
+
+    Args:
+        weights (list[float]): The flat weights.
+
+    Returns:
+        str: The weights hash.
+    """
+    return hashlib.blake2b(array.array("d", weights).tobytes(), digest_size=16).hexdigest()
+
+
+def get_last_export_dir(root_dir_path: str, exclude_dir_path: Optional[str] = None) -> Optional[str]:
+    """Get the directory of the last export under the root directory.
+
+    Notes:
+        - The directory is recorded by set_last_export_dir, browsing or rebuilding manifests does not change it.
+
+    Args:
+        root_dir_path (str): The root directory path.
+        exclude_dir_path (Optional[str]): The directory path to exclude.
+
+    Returns:
+        Optional[str]: The directory path. None if not recorded, excluded or the directory has no manifest.
+    """
+    file_path = os.path.join(root_dir_path, LAST_EXPORT_FILE_NAME)
+    if not os.path.isfile(file_path):
+        return None
+
+    try:
+        with open(file_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to read last export file: {file_path}: {e}")
+        return None
+
+    dir_path = data.get("dir_path")
+    if not dir_path:
+        return None
+
+    dir_path = os.path.normpath(os.path.join(root_dir_path, dir_path))
+    if exclude_dir_path and dir_path == os.path.normpath(exclude_dir_path):
+        return None
+
+    if not os.path.isfile(os.path.join(dir_path, MANIFEST_FILE_NAME)):
+        return None
+
+    return dir_path
+
+
+def set_last_export_dir(root_dir_path: str, dir_path: str) -> None:
+    """Record the directory of the last export under the root directory.
+
+    Args:
+        root_dir_path (str): The root directory path.
+        dir_path (str): The exported directory path.
+    """
+    file_path = os.path.join(root_dir_path, LAST_EXPORT_FILE_NAME)
+    data = {"dir_path": os.path.relpath(dir_path, root_dir_path)}
+
+    tmp_file_path = f"{file_path}.tmp"
+    with open(tmp_file_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_file_path, file_path)
+
+    logger.debug(f"Recorded last export: {dir_path}")
+
+
+__all__ = [
+    "MANIFEST_FILE_NAME",
+    "WeightsManifest",
+    "create_entry",
+    "get_chain_depth",
+    "get_influences_hash",
+    "get_last_export_dir",
+    "get_weights_hash",
+    "is_weights_file",
+    "read_data_file",
+    "set_last_export_dir",
+]
@@ -0,0 +1,69 @@
+"""Spatial remapping of skinCluster weights between geometries with different components.
+
+The weights are transferred from the rest positions stored in the weights file to the target positions,
+either from the nearest source vertex or by barycentric interpolation on the closest source triangle.
+"""
+
+from logging import getLogger
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from ....lib import lib_mesh_topology
+
+logger = getLogger(__name__)
+
+# Number of target points processed at once in the barycentric remap.
+CHUNK_SIZE = 20000
+
+
+def remap_weights_nearest(src_points: np.ndarray, src_weights: np.ndarray, dst_points: np.ndarray) -> np.ndarray:
+    """Remap the weights from the nearest source point.
+
+    Args:
+        src_points (np.ndarray): The source points. Shape is (N, 3).
+        src_weights (np.ndarray): The source weights. Shape is (N, I).
+        dst_points (np.ndarray): The target points. Shape is (M, 3).
+
+    Returns:
+        np.ndarray: The remapped weights. Shape is (M, I).
+    """
+    _, indices = cKDTree(src_points).query(dst_points, workers=-1)
+
+    logger.debug(f"Remapped weights from nearest points: {len(src_points)} -> {len(dst_points)}")
+
+    return src_weights[indices]
+
+
+def remap_weights_barycentric(src_points: np.ndarray, src_triangles: np.ndarray, src_weights: np.ndarray, dst_points: np.ndarray) -> np.ndarray:
+    """Remap the weights by barycentric interpolation on the closest source triangle.
+
+    Notes:
+        - The closest points are queried with lib_mesh_topology.get_closest_points_on_triangles in chunks of target points.
+        - Without any source triangle, the target points take the weights of the nearest source point.
+
+    Args:
+        src_points (np.ndarray): The source points. Shape is (N, 3).
+        src_triangles (np.ndarray): The source triangle vertex indices. Shape is (T, 3).
+        src_weights (np.ndarray): The source weights. Shape is (N, I).
+        dst_points (np.ndarray): The target points. Shape is (M, 3).
+
+    Returns:
+        np.ndarray: The remapped weights. Shape is (M, I).
+    """
+    if not len(src_triangles):
+        return remap_weights_nearest(src_points, src_weights, dst_points)
+
+    result = np.empty((len(dst_points), src_weights.shape[1]), dtype=np.float64)
+
+    for start in range(0, len(dst_points), CHUNK_SIZE):
+        points = dst_points[start : start + CHUNK_SIZE]
+        triangle_ids, bary, _ = lib_mesh_topology.get_closest_points_on_triangles(points, src_points, src_triangles)
+        result[start : start + len(points)] = np.einsum("ij,ijk->ik", bary, src_weights[src_triangles[triangle_ids]])
+
+    logger.debug(f"Remapped weights by barycentric interpolation: {len(src_points)} -> {len(dst_points)}")
+
+    return result
+
+
+__all__ = ["remap_weights_barycentric", "remap_weights_nearest"]
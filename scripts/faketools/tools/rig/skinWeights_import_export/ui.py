@@ -12,6 +12,7 @@ from ....lib_ui import maya_decorator, maya_ui, tool_data
 from ....lib_ui.base_window import BaseMainWindow
 from ....lib_ui.maya_qt import get_maya_main_window
 from ....lib_ui.qt_compat import (
+    QCheckBox,
     QFileSystemWatcher,
     QHBoxLayout,
     QLabel,
@@ -19,6 +20,7 @@ from ....lib_ui.qt_compat import (
     QMenu,
     QPushButton,
     Qt,
+    QThread,
     QTreeWidget,
     QTreeWidgetItem,
 )
@@ -26,6 +28,7 @@ from ....lib_ui.ui_utils import scale_by_dpi
 from ....lib_ui.widgets import IconToggleButton, extra_widgets
 from .command import SkinClusterData, SkinClusterDataIO, validate_export_weights
 from .file_item_widget import FileItemWidget
+from .manifest import WeightsManifest, get_last_export_dir, is_weights_file, set_last_export_dir
 
 logger = getLogger(__name__)
 _instance = None
@@ -34,6 +37,28 @@ _IMAGES_DIR = Path(__file__).parent / "images"
 TEMP_DIR = os.path.normpath(os.path.join(tempfile.gettempdir(), "skinWeights"))
 
 
+class ManifestRebuildThread(QThread):
+    """Thread to rebuild the manifests of the weight directories in the background."""
+
+    def __init__(self, dir_paths: list[str], parent=None):
+        """Constructor.
+
+        Args:
+            dir_paths (list[str]): The directory paths to rebuild.
+            parent (QObject, optional): The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self._dir_paths = dir_paths
+
+    def run(self):
+        """Rebuild the manifests."""
+        for dir_path in self._dir_paths:
+            try:
+                WeightsManifest(dir_path).rebuild()
+            except Exception as e:
+                logger.warning(f"Failed to rebuild manifest: {dir_path}: {e}")
+
+
 class MainWindow(BaseMainWindow):
     """Main Window for Skin Weights Import/Export Tool."""
 
@@ -80,6 +105,12 @@ class MainWindow(BaseMainWindow):
         label.setStyleSheet("font-weight: bold;")
         self.central_layout.addWidget(label)
 
+        # Filter field
+        self.filter_field = QLineEdit()
+        self.filter_field.setPlaceholderText("Filter (File, Geometry, Influence)")
+        self.filter_field.setClearButtonEnabled(True)
+        self.central_layout.addWidget(self.filter_field)
+
         # File tree widget
         self.tree_widget = QTreeWidget()
         self.tree_widget.setSelectionMode(QTreeWidget.ExtendedSelection)
@@ -89,6 +120,10 @@ class MainWindow(BaseMainWindow):
         self.tree_widget.setIndentation(scale_by_dpi(16, self))
         self.central_layout.addWidget(self.tree_widget)
 
+        # Manifest rebuild thread
+        self._rebuild_thread = None
+        self._rebuild_states = {}
+
         # File system watcher
         self.file_watcher = QFileSystemWatcher()
         self.file_watcher.addPath(self.root_path)
@@ -111,6 +146,25 @@ class MainWindow(BaseMainWindow):
 
         layout = QHBoxLayout()
 
+        self.incremental_checkBox = QCheckBox("Incremental")
+        self.incremental_checkBox.setToolTip("Skip geometries whose weights are unchanged from the previous export.")
+        layout.addWidget(self.incremental_checkBox)
+
+        self.delta_checkBox = QCheckBox("Delta")
+        self.delta_checkBox.setToolTip("Write only the changed components against the previous export.")
+        self.delta_checkBox.setEnabled(False)
+        layout.addWidget(self.delta_checkBox)
+
+        self.triangles_checkBox = QCheckBox("Triangles")
+        self.triangles_checkBox.setToolTip("Store the triangles of meshes to interpolate the weights when importing to modified meshes.")
+        layout.addWidget(self.triangles_checkBox)
+
+        layout.addStretch()
+
+        self.central_layout.addLayout(layout)
+
+        layout = QHBoxLayout()
+
         export_button = QPushButton("Export")
         layout.addWidget(export_button)
 
@@ -124,6 +178,8 @@ class MainWindow(BaseMainWindow):
         self.quick_import_button.clicked.connect(self.import_weights_quick)
         export_button.clicked.connect(self.export_weights)
         import_button.clicked.connect(self.import_weights)
+        self.incremental_checkBox.toggled.connect(self.delta_checkBox.setEnabled)
+        self.filter_field.textChanged.connect(self._apply_filter)
 
         # Apply stylesheet to tree widget
         self.tree_widget.setStyleSheet(
@@ -143,7 +199,13 @@ class MainWindow(BaseMainWindow):
         )
 
     def _populate_file_list(self):
-        """Populate the tree widget with files and directories."""
+        """Populate the tree widget with files and directories.
+
+        Notes:
+            - The file metadata is read from the manifest of each directory, the weight files are never read here.
+            - Files with a missing or stale entry are listed with the entry as stored, or without metadata,
+              and the manifests of their directories are rebuilt in the background.
+        """
         self.tree_widget.clear()
 
         if not os.path.exists(self.root_path):
@@ -151,6 +213,7 @@ class MainWindow(BaseMainWindow):
 
         # Build directory structure
         dir_items = {}  # path -> QTreeWidgetItem
+        rebuild_states = {}
 
         for root, dirs, files in os.walk(self.root_path):
             # Sort directories and files
@@ -182,6 +245,7 @@ class MainWindow(BaseMainWindow):
                 )
 
                 dir_tree_item.setSizeHint(0, widget.sizeHint())
+                dir_tree_item.setData(0, Qt.UserRole, dir_name.lower())
                 self.tree_widget.setItemWidget(dir_tree_item, 0, widget)
 
                 # Store directory item for children
@@ -190,27 +254,113 @@ class MainWindow(BaseMainWindow):
                 # Collapse by default
                 dir_tree_item.setExpanded(False)
 
-            # Add files (filter by extension)
-            for file_name in files:
-                if file_name.endswith(".json") or file_name.endswith(".pickle"):
-                    file_path = os.path.join(root, file_name)
+            weights_files = [file_name for file_name in files if is_weights_file(file_name)]
+            if not weights_files:
+                continue
+
+            manifest = WeightsManifest(root)
+            stale_files = [file_name for file_name in weights_files if not manifest.is_current(file_name)]
+            if stale_files or not manifest.exists():
+                rebuild_states[root] = self._get_rebuild_state(root, stale_files)
+
+            # Add files
+            for file_name in weights_files:
+                file_path = os.path.join(root, file_name)
+                metadata = manifest.get_entry(file_name)
+
+                # Create file item
+                if parent_item:
+                    file_tree_item = QTreeWidgetItem(parent_item)
+                else:
+                    file_tree_item = QTreeWidgetItem(self.tree_widget)
+
+                # Create custom widget for file
+                widget = FileItemWidget(
+                    file_path,
+                    on_select_influences=self._select_influences_from_item,
+                    on_select_geometry=self._select_geometry_from_item,
+                    metadata=metadata,
+                    parent=self.tree_widget,
+                )
+
+                filter_keys = [file_name]
+                if metadata:
+                    filter_keys.append(metadata["geometry_name"])
+                    filter_keys.extend(metadata["influences"])
+
+                file_tree_item.setSizeHint(0, widget.sizeHint())
+                file_tree_item.setData(0, Qt.UserRole, "\n".join(filter_keys).lower())
+                self.tree_widget.setItemWidget(file_tree_item, 0, widget)
 
-                    # Create file item
-                    if parent_item:
-                        file_tree_item = QTreeWidgetItem(parent_item)
-                    else:
-                        file_tree_item = QTreeWidgetItem(self.tree_widget)
+        # Directories already rebuilt in the same state are skipped, files that can not be read stay stale
+        rebuild_states = {dir_path: state for dir_path, state in rebuild_states.items() if self._rebuild_states.get(dir_path) != state}
+        if rebuild_states:
+            self._start_manifest_rebuild(rebuild_states)
 
-                    # Create custom widget for file
-                    widget = FileItemWidget(
-                        file_path,
-                        on_select_influences=self._select_influences_from_item,
-                        on_select_geometry=self._select_geometry_from_item,
-                        parent=self.tree_widget,
-                    )
+        self._apply_filter()
 
-                    file_tree_item.setSizeHint(0, widget.sizeHint())
-                    self.tree_widget.setItemWidget(file_tree_item, 0, widget)
+    @staticmethod
+    def _get_rebuild_state(dir_path, file_names):
+        """Get the state of the stale files of a directory to rebuild.
+
+        Args:
+            dir_path (str): The directory path
+            file_names (list): The stale file names
+
+        Returns:
+            tuple: The file names with their modification times and sizes
+        """
+        state = []
+        for file_name in file_names:
+            try:
+                stat = os.stat(os.path.join(dir_path, file_name))
+            except OSError:
+                continue
+
+            state.append((file_name, stat.st_mtime, stat.st_size))
+
+        return tuple(state)
+
+    def _start_manifest_rebuild(self, rebuild_states):
+        """Rebuild the manifests of the directories in the background.
+
+        Notes:
+            - If a rebuild is running, the directories are rebuilt when the file list is populated after it finishes.
+
+        Args:
+            rebuild_states (dict): The directory paths and the states of their stale files
+        """
+        if self._rebuild_thread is not None and self._rebuild_thread.isRunning():
+            return
+
+        self._rebuild_states.update(rebuild_states)
+
+        dir_paths = list(rebuild_states.keys())
+        self._rebuild_thread = ManifestRebuildThread(dir_paths, parent=self)
+        self._rebuild_thread.finished.connect(self._populate_file_list)
+        self._rebuild_thread.start()
+
+        logger.debug(f"Started manifest rebuild: {dir_paths}")
+
+    def _apply_filter(self):
+        """Show only the items matching the filter text."""
+        filter_text = self.filter_field.text().strip().lower()
+
+        def _filter_item(item, parent_matched):
+            # Children of a matched directory are all shown
+            matched = parent_matched or not filter_text or filter_text in (item.data(0, Qt.UserRole) or "")
+
+            visible = matched
+            for i in range(item.childCount()):
+                if _filter_item(item.child(i), matched):
+                    visible = True
+
+            item.setHidden(not visible)
+
+            return visible
+
+        for i in range(self.tree_widget.topLevelItemCount()):
+            _filter_item(self.tree_widget.topLevelItem(i), False)
 
     def _select_influences_from_item(self, file_path):
         """Select influences from a single file.
@@ -243,15 +393,13 @@ class MainWindow(BaseMainWindow):
                 # Recursively get files in directory
                 for root, _, files in os.walk(file_path):
                     for file in files:
-                        if file.endswith(".json") or file.endswith(".pickle"):
+                        if is_weights_file(file):
                             file_path_inner = os.path.join(root, file)
-                            data = SkinClusterDataIO().load_data(file_path_inner)
-                            for inf in data.influences:
+                            for inf in self._load_file_metadata(file_path_inner)["influences"]:
                                 if inf not in sel_nodes:
                                     sel_nodes.append(inf)
             else:
-                data = SkinClusterDataIO().load_data(file_path)
-                for inf in data.influences:
+                for inf in self._load_file_metadata(file_path)["influences"]:
                     if inf not in sel_nodes:
                         sel_nodes.append(inf)
 
@@ -272,18 +420,38 @@ class MainWindow(BaseMainWindow):
                 # Recursively get files in directory
                 for root, _, files in os.walk(file_path):
                     for file in files:
-                        if file.endswith(".json") or file.endswith(".pickle"):
+                        if is_weights_file(file):
                             file_path_inner = os.path.join(root, file)
-                            data = SkinClusterDataIO().load_data(file_path_inner)
-                            if data.geometry_name not in sel_nodes:
-                                sel_nodes.append(data.geometry_name)
+                            geometry_name = self._load_file_metadata(file_path_inner)["geometry_name"]
+                            if geometry_name not in sel_nodes:
+                                sel_nodes.append(geometry_name)
             else:
-                data = SkinClusterDataIO().load_data(file_path)
-                if data.geometry_name not in sel_nodes:
-                    sel_nodes.append(data.geometry_name)
+                geometry_name = self._load_file_metadata(file_path)["geometry_name"]
+                if geometry_name not in sel_nodes:
+                    sel_nodes.append(geometry_name)
 
         cmds.select(sel_nodes, r=True)
 
+    def _load_file_metadata(self, file_path):
+        """Load the metadata of a weights file from the manifest of its directory.
+
+        Args:
+            file_path (str): The file path
+
+        Returns:
+            dict: The manifest entry of the file
+        """
+        dir_path, file_name = os.path.split(os.path.normpath(file_path))
+        manifest = WeightsManifest(dir_path)
+        metadata = manifest.get_metadata(file_name)
+        if not metadata:
+            cmds.error(f"Failed to read weights file: {file_path}")
+
+        if manifest.is_dirty:
+            manifest.save()
+
+        return metadata
+
     def on_context_menu(self, point):
         """Show the context menu for the tree widget."""
         menu = QMenu()
@@ -396,7 +564,7 @@ class MainWindow(BaseMainWindow):
     @maya_decorator.error_handler
     def _select_influences_quick(self):
         """Select influences quickly."""
-        file_path_list = [os.path.join(TEMP_DIR, file) for file in os.listdir(TEMP_DIR)]
+        file_path_list = [os.path.join(TEMP_DIR, file) for file in os.listdir(TEMP_DIR) if is_weights_file(file)]
         if not file_path_list:
             cmds.error("No temp file found.")
 
@@ -404,8 +572,7 @@ class MainWindow(BaseMainWindow):
 
         sel_nodes = []
         for file_path in file_path_list:
-            data = SkinClusterDataIO().load_data(file_path)
-            for inf in data.influences:
+            for inf in self._load_file_metadata(file_path)["influences"]:
                 if inf not in sel_nodes:
                     sel_nodes.append(inf)
 
@@ -414,7 +581,7 @@ class MainWindow(BaseMainWindow):
     @maya_decorator.error_handler
     def _select_geometry_quick(self):
         """Select geometry quickly."""
-        file_path_list = [os.path.join(TEMP_DIR, file) for file in os.listdir(TEMP_DIR)]
+        file_path_list = [os.path.join(TEMP_DIR, file) for file in os.listdir(TEMP_DIR) if is_weights_file(file)]
         if not file_path_list:
             cmds.error("No temp file found.")
 
@@ -422,9 +589,9 @@ class MainWindow(BaseMainWindow):
 
         sel_nodes = []
         for file_path in file_path_list:
-            data = SkinClusterDataIO().load_data(file_path)
-            if data.geometry_name not in sel_nodes:
-                sel_nodes.append(data.geometry_name)
+            geometry_name = self._load_file_metadata(file_path)["geometry_name"]
+            if geometry_name not in sel_nodes:
+                sel_nodes.append(geometry_name)
 
         cmds.select(sel_nodes, r=True)
 
@@ -448,7 +615,7 @@ class MainWindow(BaseMainWindow):
                     # Directory - recursively get files
                     for root, _, files in os.walk(file_path):
                         for file in files:
-                            if not (file.endswith(".json") or file.endswith(".pickle")):
+                            if not is_weights_file(file):
                                 continue
 
                             file_path_inner = os.path.join(root, file)
@@ -477,9 +644,30 @@ class MainWindow(BaseMainWindow):
         if not os.path.exists(output_dir_path):
             os.makedirs(output_dir_path, exist_ok=True)
 
+        incremental = self.incremental_checkBox.isChecked()
+        delta = incremental and self.delta_checkBox.isChecked()
+
+        # Compare with the output directory itself if it was exported before, otherwise with the last export
+        base_dir_path = None
+        if incremental and not WeightsManifest(output_dir_path).exists():
+            base_dir_path = get_last_export_dir(self.root_path, exclude_dir_path=output_dir_path)
+
+        logger.debug(f"Export options: incremental={incremental}, delta={delta}, base={base_dir_path}")
+
+        results = []
         for shape in shapes:
-            skinCluster_data = SkinClusterData.from_geometry(shape)
-            SkinClusterDataIO().export_weights(skinCluster_data, output_dir_path, format=format)
+            skinCluster_data = SkinClusterData.from_geometry(shape, with_triangles=self.triangles_checkBox.isChecked())
+            result = SkinClusterDataIO().export_weights(
+                skinCluster_data, output_dir_path, format=format, incremental=incremental, base_dir_path=base_dir_path, delta=delta
+            )
+            results.append(result)
+
+        set_last_export_dir(self.root_path, output_dir_path)
+
+        if incremental:
+            logger.info(
+                f"Exported skinCluster weights: full={results.count('full')}, delta={results.count('delta')}, unchanged={results.count('unchanged')}"
+            )
 
         logger.debug("Completed export skinCluster weights.")
 
@@ -543,7 +731,7 @@ class MainWindow(BaseMainWindow):
         os.makedirs(TEMP_DIR, exist_ok=True)
 
         for shape in shapes:
-            skinCluster_data = SkinClusterData.from_geometry(shape)
+            skinCluster_data = SkinClusterData.from_geometry(shape, with_triangles=self.triangles_checkBox.isChecked())
             SkinClusterDataIO().export_weights(skinCluster_data, TEMP_DIR, format=format)
 
         logger.debug("Completed export skinCluster weights.")
@@ -552,7 +740,7 @@ class MainWindow(BaseMainWindow):
     @maya_decorator.error_handler
     def import_weights_quick(self):
         """Import the skinCluster weights quickly."""
-        file_path_list = [os.path.join(TEMP_DIR, file) for file in os.listdir(TEMP_DIR)]
+        file_path_list = [os.path.join(TEMP_DIR, file) for file in os.listdir(TEMP_DIR) if is_weights_file(file)]
         if not file_path_list:
             cmds.error("No temp file found.")
 
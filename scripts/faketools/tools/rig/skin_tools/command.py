@@ -1,13 +1,16 @@
 """Skin tools commands."""
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 import itertools
 from logging import getLogger
 import re
 from typing import Optional
 
 import maya.cmds as cmds
+import numpy as np
 
-from ....lib import lib_mesh, lib_skinCluster
+from ....lib import lib_mesh_topology, lib_skinCluster, lib_skinWeights
 
 logger = getLogger(__name__)
 
@@ -81,14 +84,12 @@ def average_skin_weights(components: list[str]) -> None:
     if not skinCluster:
         raise RuntimeError(f"Object is not bound to a skinCluster: {obj}")
 
-    components = cmds.ls(components, flatten=True)
-    weights = lib_skinCluster.get_skin_weights(skinCluster, components)
-    num_components = len(components)
+    components = cmds.ls(components)
+    weights = lib_skinWeights.get_weights(skinCluster, components)
 
-    average_weights = [sum(ws) / num_components for ws in list(zip(*weights))]
-    average_weights = [average_weights for _ in range(num_components)]
+    average_weights = np.broadcast_to(weights.mean(axis=0), weights.shape)
 
-    lib_skinCluster.set_skin_weights(skinCluster, average_weights, components)
+    lib_skinWeights.set_weights(skinCluster, components, average_weights)
 
     logger.debug(f"Averaged skin weights: {components}")
 
@@ -96,6 +97,9 @@ def average_skin_weights(components: list[str]) -> None:
 def average_skin_weights_shell(mesh: str) -> None:
     """Average the weights of the mesh shell components.
 
+    Notes:
+        - All shells are averaged at once and written with a single command.
+
     Args:
         mesh (str): The mesh node.
     """
@@ -108,19 +112,25 @@ def average_skin_weights_shell(mesh: str) -> None:
     if cmds.nodeType(mesh) != "mesh":
         raise RuntimeError(f"Node is not a mesh: {mesh}")
 
-    vertex_shells = lib_mesh.MeshVertex(mesh).get_vertex_shells()
-    if len(vertex_shells) < 2:
+    topology = lib_mesh_topology.MeshTopology(mesh)
+    num_shells, shell_ids = topology.get_shell_ids()
+    if num_shells < 2:
         logger.warning(f"Mesh has no shells: {mesh}")
 
     skinCluster = lib_skinCluster.get_skinCluster(mesh)
     if not skinCluster:
         raise RuntimeError(f"Object is not bound to a skinCluster: {mesh}")
 
-    vertex_components = cmds.ls(f"{mesh}.vtx[*]", flatten=True)
+    components = lib_skinWeights.get_component_names(topology.get_dag_path().fullPathName(), np.arange(topology.num_vertices))
+    weights = lib_skinWeights.get_weights(skinCluster, components)
 
-    for vertex_shell in vertex_shells:
-        components = [vertex_components[i] for i in vertex_shell]
-        average_skin_weights(components)
+    # Sum the weights of each shell over the vertices sorted by shell
+    order = np.argsort(shell_ids, kind="stable")
+    counts = np.bincount(shell_ids, minlength=num_shells)
+    starts = np.cumsum(counts) - counts
+    shell_weights = np.add.reduceat(weights[order], starts, axis=0) / counts[:, np.newaxis]
+
+    lib_skinWeights.set_weights(skinCluster, components, shell_weights[shell_ids])
 
     logger.debug(f"Averaged skin weights shell: {mesh}")
 
@@ -144,21 +154,7 @@ def combine_pair_skin_weights(components: list[str], method: str = "auto", stati
     if method not in ["auto", "manual"]:
         raise ValueError("Invalid method")
 
-    # Validate the components
-    components = cmds.filterExpand(components, sm=[28, 31, 46], ex=True)
-    if not components:
-        raise RuntimeError("No components specified or unsupported component type")
-
-    objs = list(set(cmds.ls(components, objectsOnly=True)))
-    if len(objs) > 1:
-        raise RuntimeError("Components must belong to the same object")
-    else:
-        obj = objs[0]
-
-    skinCluster = lib_skinCluster.get_skinCluster(obj)
-    if not skinCluster:
-        raise RuntimeError(f"Object is not bound to a skinCluster: {obj}")
-
+    skinCluster, components = _get_components_skinCluster(components)
     infs = cmds.skinCluster(skinCluster, q=True, inf=True)
 
     # Validate the influences
@@ -211,46 +207,69 @@ def combine_pair_skin_weights(components: list[str], method: str = "auto", stati
         if static_inf not in infs:
             raise RuntimeError(f"Static influence not bound: {static_inf}")
 
-        if static_inf in all_infs:
+        if static_inf in itertools.chain(*pair_infs):
             raise RuntimeError(f"Static influence cannot be in the pair influences: {static_inf}")
 
-    weights = lib_skinCluster.get_skin_weights(skinCluster, components)
+    if not pair_infs:
+        logger.warning(f"No pair influences found: {skinCluster}")
+        return
+
+    # Influence column indices of the pairs
+    inf_indices = {inf: i for i, inf in enumerate(infs)}
+    src_columns = np.array([inf_indices[pair_inf[0]] for pair_inf in pair_infs], dtype=np.int64)
+    dst_columns = np.array([inf_indices[pair_inf[1]] for pair_inf in pair_infs], dtype=np.int64)
+
+    weights = lib_skinWeights.get_weights(skinCluster, components)
 
     if not static_inf:
-        for i in range(len(weights)):
-            for pair_inf in pair_infs:
-                pair_weight = weights[i][infs.index(pair_inf[0])] + weights[i][infs.index(pair_inf[1])]
-                if pair_weight > 0.0:
-                    apply_weight = pair_weight / 2.0
-                    weights[i][infs.index(pair_inf[0])] = apply_weight
-                    weights[i][infs.index(pair_inf[1])] = apply_weight
+        # Split the total of each pair equally
+        apply_weights = (weights[:, src_columns] + weights[:, dst_columns]) / 2.0
+        weights[:, src_columns] = apply_weights
+        weights[:, dst_columns] = apply_weights
     else:
-        for i in range(len(weights)):
-            current_total_weights = weights[i][infs.index(static_inf)]
-            pair_total_weights = 0.0
-            for pair_inf in pair_infs:
-                current_total_weights += weights[i][infs.index(pair_inf[0])] + weights[i][infs.index(pair_inf[1])]
-                pair_total_weights += weights[i][infs.index(pair_inf[0])] * 2.0
-
-            if current_total_weights == 0.0:
-                continue
+        static_column = inf_indices[static_inf]
+        src_weights = weights[:, src_columns]
+        current_total_weights = weights[:, static_column] + src_weights.sum(axis=1) + weights[:, dst_columns].sum(axis=1)
+        pair_total_weights = src_weights.sum(axis=1) * 2.0
+
+        # Mirror the source side and keep the remainder on the static influence if there is room,
+        # otherwise scale the pairs down to the current total and clear the static influence.
+        has_room = current_total_weights > pair_total_weights
+        scale = np.divide(current_total_weights, pair_total_weights, out=np.zeros_like(current_total_weights), where=pair_total_weights > 0.0)
+        apply_weights = np.where(has_room[:, np.newaxis], src_weights, src_weights * scale[:, np.newaxis])
+        static_weights = np.where(has_room, current_total_weights - pair_total_weights, 0.0)
+
+        update = current_total_weights != 0.0
+        weights[np.ix_(update, src_columns)] = apply_weights[update]
+        weights[np.ix_(update, dst_columns)] = apply_weights[update]
+        weights[update, static_column] = static_weights[update]
 
-            if current_total_weights > pair_total_weights:
-                for pair_inf in pair_infs:
-                    weights[i][infs.index(pair_inf[1])] = weights[i][infs.index(pair_inf[0])]
+    logger.debug(f"Combined pair influences weights: {components}")
 
-                weights[i][infs.index(static_inf)] = current_total_weights - pair_total_weights
-            else:
-                for pair_inf in pair_infs:
-                    apply_weight = current_total_weights * weights[i][infs.index(pair_inf[0])] * 2.0 / pair_total_weights
-                    weights[i][infs.index(pair_inf[0])] = apply_weight
-                    weights[i][infs.index(pair_inf[1])] = apply_weight
+    lib_skinWeights.set_weights(skinCluster, components, weights)
 
-                weights[i][infs.index(static_inf)] = 0.0
 
-    logger.debug(f"Combined pair influences weights: {components}")
+def combine_pair_skin_weights_batch(targets: list[str], method: str = "auto", static_inf: Optional[str] = None, **kwargs) -> None:
+    """Combine the pair influences weights of multiple shapes in a single undo chunk.
+
+    Args:
+        targets (list[str]): The components or the nodes. All components of the deformable shapes of the nodes are processed.
+        method (str, optional): The combine method. Defaults to 'auto'. Options are 'auto', 'manual'.
+        static_inf (str): The static influence. If specified, the combined weights will be applied to this influence.
 
-    lib_skinCluster.set_skin_weights(skinCluster, weights, components)
+    Keyword Args:
+        See combine_pair_skin_weights.
+    """
+    component_groups = _group_components_by_shape(targets)
+
+    cmds.undoInfo(openChunk=True, chunkName="combine_pair_skin_weights_batch")
+    try:
+        for components in component_groups.values():
+            combine_pair_skin_weights(components, method=method, static_inf=static_inf, **kwargs)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    logger.debug(f"Combined pair influences weights: {list(component_groups.keys())}")
 
 
 def combine_skin_weights(src_infs: list[str], target_inf: str, components: list[str]) -> None:
@@ -270,8 +289,68 @@ def combine_skin_weights(src_infs: list[str], target_inf: str, components: list[
     if not components:
         raise ValueError("No components specified")
 
-    # Validate the components
-    components = cmds.filterExpand(components, sm=[28, 31, 46], ex=True)
+    skinCluster, components = _get_components_skinCluster(components)
+    infs = cmds.skinCluster(skinCluster, q=True, inf=True)
+
+    # Validate the influences
+    if not cmds.objExists(target_inf):
+        raise RuntimeError(f"Target influence not found: {target_inf}")
+    if target_inf not in infs:
+        raise RuntimeError(f"Target influence not bound: {target_inf}")
+
+    not_exists_infs = [inf for inf in src_infs if not cmds.objExists(inf)]
+    if not_exists_infs:
+        raise RuntimeError(f"Source influences not found: {not_exists_infs}")
+
+    not_bound_infs = [inf for inf in src_infs if inf not in infs]
+    if not_bound_infs:
+        raise RuntimeError(f"Source influences not bound: {not_bound_infs}")
+
+    target_column = infs.index(target_inf)
+    src_columns = np.array([infs.index(src_inf) for src_inf in dict.fromkeys(src_infs) if src_inf != target_inf], dtype=np.int64)
+
+    weights = lib_skinWeights.get_weights(skinCluster, components)
+
+    # Move the source columns to the target column
+    weights[:, target_column] += weights[:, src_columns].sum(axis=1)
+    weights[:, src_columns] = 0.0
+
+    logger.debug(f"Combined source influences weights: {components}")
+
+    lib_skinWeights.set_weights(skinCluster, components, weights)
+
+
+def combine_skin_weights_batch(src_infs: list[str], target_inf: str, targets: list[str]) -> None:
+    """Combine the source influences weights to the target influence of multiple shapes in a single undo chunk.
+
+    Args:
+        src_infs (list[str]): The source influences.
+        target_inf (str): The target influence.
+        targets (list[str]): The components or the nodes. All components of the deformable shapes of the nodes are processed.
+    """
+    component_groups = _group_components_by_shape(targets)
+
+    cmds.undoInfo(openChunk=True, chunkName="combine_skin_weights_batch")
+    try:
+        for components in component_groups.values():
+            combine_skin_weights(src_infs, target_inf, components)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    logger.debug(f"Combined source influences weights: {list(component_groups.keys())}")
+
+
+def _get_components_skinCluster(components: list[str]) -> tuple[str, list[str]]:
+    """Get the skinCluster of the components.
+
+    Args:
+        components (list[str]): The components of a single shape. Only vertex, cv, or lattice points are supported.
+
+    Returns:
+        tuple[str, list[str]]: The skinCluster and the components compressed into ranges.
+    """
+    # Validate the components without expanding them
+    components = cmds.filterExpand(components, sm=[28, 31, 46], ex=False)
     if not components:
         raise RuntimeError("No components specified or unsupported component type")
 
@@ -285,49 +364,70 @@ def combine_skin_weights(src_infs: list[str], target_inf: str, components: list[
     if not skinCluster:
         raise RuntimeError(f"Object is not bound to a skinCluster: {obj}")
 
-    infs = cmds.skinCluster(skinCluster, q=True, inf=True)
+    return skinCluster, cmds.ls(components)
 
-    # Validate the influences
-    if not cmds.objExists(target_inf):
-        raise RuntimeError(f"Target influence not found: {target_inf}")
-    if target_inf not in infs:
-        raise RuntimeError(f"Target influence not bound: {target_inf}")
 
-    not_exists_infs = [inf for inf in src_infs if not cmds.objExists(inf)]
-    if not_exists_infs:
-        raise RuntimeError(f"Source influences not found: {not_exists_infs}")
+def _group_components_by_shape(targets: list[str]) -> dict[str, list[str]]:
+    """Group the components by their shapes.
 
-    not_bound_infs = [inf for inf in src_infs if inf not in infs]
-    if not_bound_infs:
-        raise RuntimeError(f"Source influences not bound: {not_bound_infs}")
+    Args:
+        targets (list[str]): The components or the nodes. The nodes are replaced with all components of their deformable shapes.
 
-    weights = lib_skinCluster.get_skin_weights(skinCluster, components)
+    Returns:
+        dict[str, list[str]]: The components of each shape.
+    """
+    if not targets:
+        raise ValueError("No components or nodes specified")
 
-    for i in range(len(weights)):
-        src_total_weights = sum([weights[i][infs.index(src_inf)] for src_inf in src_infs])
+    component_types = {"mesh": "vtx[*]", "nurbsCurve": "cv[*]", "nurbsSurface": "cv[*][*]", "lattice": "pt[*][*][*]"}
 
-        if src_total_weights == 0.0:
+    component_groups = {}
+    for target in cmds.ls(targets, long=True):
+        if "." in target:
+            shape = cmds.ls(target, objectsOnly=True, long=True)[0]
+            component_groups.setdefault(shape, []).append(target)
             continue
 
-        for src_inf in src_infs:
-            weights[i][infs.index(src_inf)] = 0.0
+        for shape in cmds.ls(target, dag=True, type="deformableShape", noIntermediate=True, long=True):
+            component_type = component_types.get(cmds.nodeType(shape))
+            if component_type is None:
+                logger.warning(f"Unsupported shape type: {shape}")
+                continue
 
-        weights[i][infs.index(target_inf)] = weights[i][infs.index(target_inf)] + src_total_weights
+            component_groups.setdefault(shape, []).append(f"{shape}.{component_type}")
 
-    logger.debug(f"Combined source influences weights: {components}")
+    return component_groups
 
-    lib_skinCluster.set_skin_weights(skinCluster, weights, components)
 
+@dataclass
+class PruneResult:
+    """Result of pruning the weights of a shape."""
 
-def prune_small_weights(shapes: list[str], threshold: float = 0.0001) -> None:
+    shape: str
+    skinCluster: str
+    num_pruned: int
+    max_delta: float
+
+
+def prune_small_weights(
+    shapes: list[str], threshold: float = 0.0001, ignore_locks: bool = True, max_workers: Optional[int] = None
+) -> list[PruneResult]:
     """Prune the small weights of the skinCluster.
 
     Args:
         shapes (list[str]): The deformable shapes.
         threshold (float): The threshold value.
+        ignore_locks (bool): Whether to prune the locked influences too. If False, the locked influences keep their weights.
+        max_workers (Optional[int]): The maximum number of threads for the numeric work. Defaults to None (the executor default).
 
     Notes:
-        - Unlike Maya's pruneWeights, which considers skeleton locks, this function ignores them.
+        - Unlike Maya's pruneWeights, which considers skeleton locks, this function ignores them by default.
+        - The weights of each shape are read and written in bulk on the main thread,
+          while the pruning of the shapes already read runs in a thread pool.
+        - Shapes without pruned weights are not written.
+
+    Returns:
+        list[PruneResult]: The results of the processed shapes.
     """
     if not shapes:
         raise ValueError("No shapes specified")
@@ -336,24 +436,58 @@ def prune_small_weights(shapes: list[str], threshold: float = 0.0001) -> None:
     if not_exist_shapes:
         raise ValueError(f"Nodes do not exist: {not_exist_shapes}")
 
-    for shape in shapes:
-        if "deformableShape" not in cmds.nodeType(shape, inherited=True):
-            cmds.warning(f"Node is not a deformable shape: {shape}")
-            continue
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for shape in shapes:
+            if "deformableShape" not in cmds.nodeType(shape, inherited=True):
+                cmds.warning(f"Node is not a deformable shape: {shape}")
+                continue
 
-        skinCluster = lib_skinCluster.get_skinCluster(shape)
-        if not skinCluster:
-            cmds.warning(f"Object is not bound to a skinCluster: {shape}")
-            continue
+            skinCluster = lib_skinCluster.get_skinCluster(shape)
+            if not skinCluster:
+                cmds.warning(f"Object is not bound to a skinCluster: {shape}")
+                continue
 
-        infs = cmds.skinCluster(skinCluster, q=True, inf=True)
-        lock_status = [cmds.getAttr(f"{inf}.lockInfluenceWeights") for inf in infs]
-        for inf in infs:
-            cmds.setAttr(f"{inf}.lockInfluenceWeights", False)
+            components = [f"{shape}.cp[*]"]
+            weights = lib_skinWeights.get_weights(skinCluster, components)
+            locked_mask = None if ignore_locks else lib_skinWeights.get_lock_mask(skinCluster)
+
+            future = executor.submit(lib_skinWeights.prune_weights, weights, threshold, locked_mask)
+            futures[future] = (shape, skinCluster, components)
+
+            # Write the finished shapes while the others are still computed
+            results.extend(_write_pruned_weights([future for future in futures if future.done()], futures))
+
+        results.extend(_write_pruned_weights(list(futures), futures))
+
+    num_pruned = sum(result.num_pruned for result in results)
+    max_delta = max((result.max_delta for result in results), default=0.0)
+    logger.debug(f"Pruned small weights: {len(results)} shapes, {num_pruned} entries, max delta {max_delta:.6f}")
+
+    return results
+
+
+def _write_pruned_weights(done_futures: list[Future], futures: dict[Future, tuple[str, str, list[str]]]) -> list[PruneResult]:
+    """Write the pruned weights of the finished futures.
+
+    Args:
+        done_futures (list[Future]): The futures to write. They are removed from the futures.
+        futures (dict[Future, tuple[str, str, list[str]]]): The shape, the skinCluster and the components of each pending future.
+
+    Returns:
+        list[PruneResult]: The results of the written shapes.
+    """
+    results = []
+    for future in done_futures:
+        shape, skinCluster, components = futures.pop(future)
+        weights, num_pruned, max_delta = future.result()
+
+        if num_pruned:
+            lib_skinWeights.set_weights(skinCluster, components, weights)
 
-        cmds.skinPercent(skinCluster, shape, pruneWeights=threshold)
+            logger.debug(f"Pruned small weights: {shape} ({num_pruned} entries, max delta {max_delta:.6f})")
 
-        for i, inf in enumerate(infs):
-            cmds.setAttr(f"{inf}.lockInfluenceWeights", lock_status[i])
+        results.append(PruneResult(shape=shape, skinCluster=skinCluster, num_pruned=num_pruned, max_delta=max_delta))
 
-        logger.debug(f"Pruned small weights: {shape}")
+    return results
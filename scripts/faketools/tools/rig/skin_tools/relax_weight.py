@@ -1,16 +1,20 @@
 """
 Relax skin weights using various methods.
+
+Each method builds a sparse vertex operator once, and each iteration is a single sparse matrix product
+on the weights of the selected vertices and their neighbors.
 """
 
-from itertools import chain
 from logging import getLogger
 import math
 from typing import Optional
 
-import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
 
-from ....lib import lib_mesh, lib_skinCluster
+from ....lib import lib_mesh_topology, lib_skinCluster, lib_skinWeights
 
 logger = getLogger(__name__)
 
@@ -50,14 +54,44 @@ class SmoothSkinWeights:
             raise RuntimeError(f"Node is not a mesh: {shp}")
 
         self.mesh = shp
-        self.mesh_vertex = lib_mesh.MeshVertex(shp)
-        self.indices = self.mesh_vertex.get_vertex_indices(vertices)
+        self.topology = lib_mesh_topology.MeshTopology(shp)
+        self.indices = np.unique(self.topology.get_components_indices(vertices, "vertex"))
         self.num_indices = len(self.indices)
 
-    def calculate_weights(self, *args, **kwargs) -> None:
-        """Calculate the weights for the smoothing operation."""
+    def get_operator(self, *args, **kwargs) -> sp.csr_matrix:
+        """Get the smoothing operator of the mesh.
+
+        Returns:
+            sp.csr_matrix: The operator whose rows give the smoothed weights of each vertex. Shape is (num_vertices, num_vertices).
+        """
         raise NotImplementedError
 
+    def calculate_weights(self, iterations: int = 1, **kwargs) -> np.ndarray:
+        """Calculate the smoothed weights of the vertices.
+
+        Notes:
+            - Only the weights of the vertices are updated between iterations, the other vertices are kept as they are.
+
+        Args:
+            iterations (int): The number of iterations to perform.
+            **kwargs: The options of the operator.
+
+        Returns:
+            np.ndarray: The smoothed weights. Shape is (num_indices, num_influences).
+        """
+        operator = self.get_operator(**kwargs)[self.indices]
+
+        # Restrict the operator to the vertices that it reads
+        region_indices = np.union1d(self.indices, operator.indices)
+        operator = operator[:, region_indices]
+        positions = np.searchsorted(region_indices, self.indices)
+
+        weights = self._get_weights(region_indices)
+        for _ in range(iterations):
+            weights[positions] = operator @ weights
+
+        return weights[positions]
+
     def smooth(self, *args, **kwargs) -> None:
         """Execute the smoothing operation."""
         only_unlock_infs = kwargs.pop("only_unlock_influences", False)
@@ -66,110 +100,140 @@ class SmoothSkinWeights:
             raise ValueError("The blend_weights must be in the range [0, 1]")
 
         if only_unlock_infs:
-            unlocked_infs = lib_skinCluster.get_lock_influences(self.skinCluster, lock=False)
-            if not unlocked_infs:
+            unlocked_infs_status = ~lib_skinWeights.get_lock_mask(self.skinCluster)
+            if not unlocked_infs_status.any():
                 raise RuntimeError("No unlocked influences found")
 
-            unlocked_infs_status = [inf in unlocked_infs for inf in self.infs]
-
         if only_unlock_infs or blend_weights < 1:
-            before_weights = lib_skinCluster.get_skin_weights(self.skinCluster, self.vertices)
+            before_weights = self._get_weights(self.indices)
 
         calc_weights = self.calculate_weights(*args, **kwargs)
 
         if only_unlock_infs:
-            for i in range(self.num_indices):
-                unlock_before_weights = []
-                unlock_new_weights = []
-                for j in range(self.num_infs):
-                    if unlocked_infs_status[j]:
-                        unlock_before_weights.append(before_weights[i][j])
-                        unlock_new_weights.append(calc_weights[i][j])
-
-                unlock_before_weights_total = sum(unlock_before_weights)
-                unlock_new_weights_total = sum(unlock_new_weights)
-
-                if unlock_before_weights_total < 1e-5 or unlock_new_weights_total < 1e-5:
-                    calc_weights[i] = before_weights[i]
-                else:
-                    if unlock_before_weights_total < unlock_new_weights_total:
-                        for j in range(self.num_infs):
-                            if unlocked_infs_status[j]:
-                                calc_weights[i][j] = unlock_before_weights_total * calc_weights[i][j] / unlock_new_weights_total
-                            else:
-                                calc_weights[i][j] = before_weights[i][j]
-
-                    else:
-                        unlock_dif_weights_total = unlock_before_weights_total - unlock_new_weights_total
-
-                        for j in range(self.num_infs):
-                            if unlocked_infs_status[j]:
-                                calc_weights[i][j] = (
-                                    unlock_dif_weights_total * (before_weights[i][j] / unlock_before_weights_total) + calc_weights[i][j]
-                                )  # noqa
-                            else:
-                                calc_weights[i][j] = before_weights[i][j]
+            calc_weights = lib_skinWeights.adjust_unlocked_weights(calc_weights, before_weights, unlocked_infs_status)
 
         if blend_weights < 1:
-            for i in range(self.num_indices):
-                for j in range(self.num_infs):
-                    calc_weights[i][j] = blend_weights * calc_weights[i][j] + (1 - blend_weights) * before_weights[i][j]
+            calc_weights = blend_weights * calc_weights + (1 - blend_weights) * before_weights
 
-        lib_skinCluster.set_skin_weights(self.skinCluster, calc_weights, self.vertices)
+        lib_skinWeights.set_weights(self.skinCluster, self._get_component_names(self.indices), calc_weights)
 
-    def _get_indices_weights(self, skinCluster: str, indices: list[int]) -> dict[int, list[float]]:
-        """Get the vertex indices and weights from the skinCluster.
+    def _get_weights(self, indices: np.ndarray) -> np.ndarray:
+        """Get the weights of the vertex indices.
 
         Args:
-            skinCluster (str): The name of the skinCluster node.
-            indices (list[int]): The list of vertex indices.
+            indices (np.ndarray): The sorted unique vertex indices.
 
         Returns:
-            dict[int, list[float]]: The vertex indices and their weights.
+            np.ndarray: The weights. Shape is (num_indices, num_influences).
         """
-        vertex_indices = self.mesh_vertex.get_vertex_components(indices)
-        weights = lib_skinCluster.get_skin_weights(skinCluster, vertex_indices)
+        return lib_skinWeights.get_weights(self.skinCluster, self._get_component_names(indices))
 
-        return {i: w for i, w in zip(indices, weights)}
+    def _get_component_names(self, indices: np.ndarray) -> list[str]:
+        """Get the vertex component names of the vertex indices.
 
-    def _get_indices_positions(self, indices: list[int]) -> dict[int, om.MPoint]:
-        """Get the vertex indices and their positions.
+        Args:
+            indices (np.ndarray): The vertex indices.
+
+        Returns:
+            list[str]: The vertex component names.
+        """
+        return lib_skinWeights.get_component_names(self.topology.get_dag_path().fullPathName(), indices)
+
+    @staticmethod
+    def _normalize_rows(matrix: sp.spmatrix) -> sp.csr_matrix:
+        """Normalize the rows of the matrix to sum to one.
+
+        Notes:
+            - Rows without any weight, such as isolated vertices, keep the weights of the vertex itself.
 
         Args:
-            indices (list[int]): The list of vertex indices.
+            matrix (sp.spmatrix): The matrix.
 
         Returns:
-            dict[int, om.MPoint]: The vertex indices and their positions.
+            sp.csr_matrix: The row normalized matrix.
         """
-        positions = self.mesh_vertex.get_vertex_positions(indices)
-        return {i: p for i, p in zip(indices, positions)}
+        row_sums = np.asarray(matrix.sum(axis=1)).ravel()
+        empty = row_sums <= 0.0
+        scale = np.divide(1.0, row_sums, out=np.zeros_like(row_sums), where=~empty)
+
+        return (sp.diags(scale) @ matrix + sp.diags(empty.astype(np.float64))).tocsr()
 
 
 class LaplacianSkinWeights(SmoothSkinWeights):
     """Smooth skin weights using Laplacian smoothing."""
 
-    def calculate_weights(self, iterations: int = 1) -> None:
+    def get_operator(self, weighting: str = "uniform") -> sp.csr_matrix:
+        """Get the Laplacian smoothing operator.
+
+        Args:
+            weighting (str): The edge weighting. 'uniform' or 'cotangent'.
+
+        Returns:
+            sp.csr_matrix: The operator averaging the neighbors of each vertex.
+        """
+        if weighting == "uniform":
+            return self._normalize_rows(self.topology.get_adjacency())
+        elif weighting == "cotangent":
+            return self._normalize_rows(self.topology.get_cotangent_weights())
+        else:
+            raise ValueError(f"Unknown weighting: {weighting}")
+
+    def calculate_weights(self, iterations: int = 1, weighting: str = "uniform") -> np.ndarray:
         """Calculate the Laplacian weights for the skin weights.
 
         Args:
             iterations (int): The number of iterations to perform.
+            weighting (str): The edge weighting. 'uniform' or 'cotangent'.
+
+        Returns:
+            np.ndarray: The smoothed weights.
         """
-        neighbor_indices_list = self.mesh_vertex.get_connected_vertices(self.indices)
-        all_indices = list(set(chain.from_iterable(neighbor_indices_list)) | set(self.indices))
+        smoothed_weights = super().calculate_weights(iterations, weighting=weighting)
 
-        all_indices_weights = self._get_indices_weights(self.skinCluster, all_indices)
+        logger.debug(f"Smoothed skin weights using Laplacian method: {self.vertices}")
 
-        smoothed_weights = [0.0] * self.num_indices
-        for _ in range(iterations):
-            for i in range(self.num_indices):
-                neighbor_weights = [all_indices_weights[neighbor_index] for neighbor_index in neighbor_indices_list[i]]
-                smoothed_weights[i] = [sum(w) / len(neighbor_weights) for w in zip(*neighbor_weights)]
+        return smoothed_weights
 
-            if iterations > 1:
-                for i, index in enumerate(self.indices):
-                    all_indices_weights[index] = smoothed_weights[i]
 
-        logger.debug(f"Smoothed skin weights using Laplacian method: {self.vertices}")
+class ImplicitLaplacianSkinWeights(LaplacianSkinWeights):
+    """Smooth skin weights by solving the implicit Laplacian smoothing once."""
+
+    def calculate_weights(self, strength: float = 1.0, weighting: str = "uniform") -> np.ndarray:
+        """Calculate the implicit Laplacian weights for the skin weights.
+
+        Notes:
+            - Solves (I + strength * L) W = W0 for the vertices, where L = I - A and A is the Laplacian smoothing operator.
+            - The neighbors that are not selected are the boundary conditions and are kept as they are.
+            - The system is factorized once and all influences are solved together, so the cost does not grow with the strength.
+            - The solution keeps the weights non-negative and normalized.
+
+        Args:
+            strength (float): The smoothing strength. 0.0 keeps the weights.
+            weighting (str): The edge weighting. 'uniform' or 'cotangent'.
+
+        Returns:
+            np.ndarray: The smoothed weights.
+        """
+        if strength < 0:
+            raise ValueError("The strength must be greater than or equal to 0.")
+
+        operator = self.get_operator(weighting=weighting)[self.indices]
+
+        region_indices = np.union1d(self.indices, operator.indices)
+        positions = np.searchsorted(region_indices, self.indices)
+        boundary_positions = np.setdiff1d(np.arange(len(region_indices)), positions)
+
+        weights = self._get_weights(region_indices)
+        inner_operator = operator[:, self.indices]
+        boundary_operator = operator[:, region_indices[boundary_positions]]
+
+        # (1 + strength) W - strength * A_inner W = W0 + strength * A_boundary W_boundary
+        system = (1.0 + strength) * sp.identity(self.num_indices, format="csc") - strength * inner_operator.tocsc()
+        rhs = weights[positions] + strength * (boundary_operator @ weights[boundary_positions])
+
+        smoothed_weights = splu(system.tocsc()).solve(rhs)
+
+        logger.debug(f"Smoothed skin weights using implicit Laplacian method (strength={strength}): {self.vertices}")
 
         return smoothed_weights
 
@@ -180,18 +244,17 @@ class RBFSkinWeights(SmoothSkinWeights):
     @staticmethod
     def gaussian_weight(distance, **kwargs):
         sigma = kwargs.get("sigma", 1.0)
-        return math.exp(-(distance**2) / (2 * sigma**2))
+        return np.exp(-(np.asarray(distance) ** 2) / (2 * sigma**2))
 
     @staticmethod
     def linear_weight(distance):
-        return max(1 - distance, 0)
+        return np.maximum(1 - np.asarray(distance), 0)
 
     @staticmethod
     def inverse_distance_weight(distance, **kwargs):
         power = kwargs.get("power", 2)
-        if distance == 0:
-            return float("inf")  # Handle the case where distance is zero (e.g., self-weight)
-        return 1 / (distance**power)
+        # Clamp the distance to avoid the division by zero of coincident vertices
+        return 1 / (np.maximum(np.asarray(distance), 1e-8) ** power)
 
     def get_weight_function(self, weight_type: str):
         """Get the weight function based on the weight type.
@@ -213,62 +276,38 @@ class RBFSkinWeights(SmoothSkinWeights):
 
         return weight_function_map[weight_type]
 
-    def calculate_weights(self, iterations: int = 1, weight_type: str = "gaussian", options: Optional[dict] = None) -> None:
-        """Calculate the weights for the RBF smoothing operation.
+    def get_operator(self, weight_type: str = "gaussian", options: Optional[dict] = None) -> sp.csr_matrix:
+        """Get the RBF smoothing operator.
 
         Args:
-            iterations (int): The number of iterations to perform.
             weight_type (str): The type of weight function to use ("gaussian", "linear", "inverse_distance").
             options (dict): Additional options for the weight function.
+
+        Returns:
+            sp.csr_matrix: The operator averaging the neighbors of each vertex by the distance kernel.
         """
-        # Get the weight function based on the weight type
         weight_function = self.get_weight_function(weight_type)
         weight_options = options or {}
 
-        # Get the neighbor indices and all indices
-        neighbor_indices_list = self.mesh_vertex.get_connected_vertices(self.indices)
-        all_indices = list(set(chain.from_iterable(neighbor_indices_list)) | set(self.indices))
-
-        # Precompute weights
-        weights = []
-        weight_sums = []
-
-        positions = self._get_indices_positions(all_indices)
-
-        for i, index in enumerate(self.indices):
-            vertex_distances = []
-            vertex_weights = []
-            weight_sum = 0.0
-            for neighbor_index in neighbor_indices_list[i]:
-                distance = positions[index].distanceTo(positions[neighbor_index])
-                weight = weight_function(distance, **weight_options)
-                vertex_distances.append(distance)
-                vertex_weights.append(weight)
-                weight_sum += weight
-
-            weights.append(vertex_weights)
-            weight_sums.append(weight_sum)
-
-        # Get all indices weights
-        all_indices_weights = self._get_indices_weights(self.skinCluster, all_indices)
+        points = self.topology.get_points()
+        adjacency = self.topology.get_adjacency().tocoo()
+        distances = np.linalg.norm(points[adjacency.row] - points[adjacency.col], axis=1)
+        kernel = sp.csr_matrix((weight_function(distances, **weight_options), (adjacency.row, adjacency.col)), shape=adjacency.shape)
 
-        smoothed_weights = [0.0] * self.num_indices
-        for _ in range(iterations):
-            for i in range(self.num_indices):
-                neighbor_weights = []
-                weight_sum = weight_sums[i]
+        return self._normalize_rows(kernel)
 
-                for j, neighbor_index in enumerate(neighbor_indices_list[i]):
-                    neighbor_weights.append((weights[i][j], all_indices_weights[neighbor_index]))
+    def calculate_weights(self, iterations: int = 1, weight_type: str = "gaussian", options: Optional[dict] = None) -> np.ndarray:
+        """Calculate the weights for the RBF smoothing operation.
 
-                # Calculate weighted average
-                if weight_sum > 0:
-                    smoothed_weights[i] = [sum(w * nw[j] for w, nw in neighbor_weights) / weight_sum for j in range(self.num_infs)]
+        Args:
+            iterations (int): The number of iterations to perform.
+            weight_type (str): The type of weight function to use ("gaussian", "linear", "inverse_distance").
+            options (dict): Additional options for the weight function.
 
-            # Update all_weights with smoothed values only if iterations > 1
-            if iterations > 1:
-                for i, index in enumerate(self.indices):
-                    all_indices_weights[index] = smoothed_weights[i]
+        Returns:
+            np.ndarray: The smoothed weights.
+        """
+        smoothed_weights = super().calculate_weights(iterations, weight_type=weight_type, options=options)
 
         logger.debug(f"Skin weights smoothed using {weight_type} method: {self.vertices}")
 
@@ -278,51 +317,43 @@ class RBFSkinWeights(SmoothSkinWeights):
 class BiharmonicSkinWeights(SmoothSkinWeights):
     """Smooth skin weights using Biharmonic smoothing."""
 
-    def calculate_weights(self, iterations: int = 1, first_order_weight: float = 0.75, second_order_weight: float = 0.25) -> None:
-        """Calculate the weights for the Biharmonic smoothing operation.
+    def get_operator(self, first_order_weight: float = 0.75, second_order_weight: float = 0.25) -> sp.csr_matrix:
+        """Get the Biharmonic smoothing operator.
 
         Args:
-            iterations (int): The number of iterations to perform.
             first_order_weight (float): The weight for the first-order neighbors.
             second_order_weight (float): The weight for the second-order neighbors.
+
+        Returns:
+            sp.csr_matrix: The operator blending the averages of the first and the second ring of each vertex.
         """
         # Ensure the weights sum to 1
         if not math.isclose(first_order_weight + second_order_weight, 1.0, rel_tol=1e-5):
             raise ValueError("The sum of first_order_weight and second_order_weight must be 1.")
 
-        neighbor_indices_list = self.mesh_vertex.get_connected_vertices(self.indices)
-        second_neighbor_indices_list = []
-        for index, neighbor_indices in zip(self.indices, neighbor_indices_list):
-            second_indices = self.mesh_vertex.get_connected_vertices(neighbor_indices)
-            second_indices = set(chain.from_iterable(second_indices))
-            if index in second_indices:
-                second_indices.remove(index)
+        adjacency = self.topology.get_adjacency()
 
-            second_neighbor_indices_list.append(list(second_indices))
+        # The neighbors of the neighbors, excluding the vertex itself
+        second_ring = (adjacency @ adjacency).tolil()
+        second_ring.setdiag(0)
+        second_ring = second_ring.tocsr()
+        second_ring.eliminate_zeros()
+        second_ring.data[:] = 1.0
 
-        self.all_indices = list(
-            set(chain.from_iterable(neighbor_indices_list)) | set(chain.from_iterable(second_neighbor_indices_list)) | set(self.indices)
-        )
+        return (first_order_weight * self._normalize_rows(adjacency) + second_order_weight * self._normalize_rows(second_ring)).tocsr()
 
-        indices_weights = self._get_indices_weights(self.skinCluster, self.all_indices)
-
-        smoothed_weights = [0.0] * self.num_indices
-        for _ in range(iterations):
-            for i in range(self.num_indices):
-                # Calculate biharmonic weights using neighbors' weights for a smoother result
-                neighbor_weights = [indices_weights[neighbor_index] for neighbor_index in neighbor_indices_list[i]]
-                second_neighbor_weights = [indices_weights[second_neighbor_index] for second_neighbor_index in second_neighbor_indices_list[i]]
-
-                avg_first_order = [sum(w) / len(neighbor_weights) for w in zip(*neighbor_weights)]
-                avg_second_order = [sum(w) / len(second_neighbor_weights) for w in zip(*second_neighbor_weights)]
+    def calculate_weights(self, iterations: int = 1, first_order_weight: float = 0.75, second_order_weight: float = 0.25) -> np.ndarray:
+        """Calculate the weights for the Biharmonic smoothing operation.
 
-                smoothed_weights[i] = [
-                    first_order_weight * avg_first_order[j] + second_order_weight * avg_second_order[j] for j in range(len(avg_first_order))
-                ]
+        Args:
+            iterations (int): The number of iterations to perform.
+            first_order_weight (float): The weight for the first-order neighbors.
+            second_order_weight (float): The weight for the second-order neighbors.
 
-            if iterations > 1:
-                for i, index in enumerate(self.indices):
-                    indices_weights[index] = smoothed_weights[i]
+        Returns:
+            np.ndarray: The smoothed weights.
+        """
+        smoothed_weights = super().calculate_weights(iterations, first_order_weight=first_order_weight, second_order_weight=second_order_weight)
 
         logger.debug(f"Skin weights smoothed using Biharmonic method: {self.vertices}")
 
@@ -332,37 +363,33 @@ class BiharmonicSkinWeights(SmoothSkinWeights):
 class RelaxSkinWeights(SmoothSkinWeights):
     """Smooth skin weights using Relax Operator smoothing."""
 
-    def calculate_weights(self, iterations: int = 1, relaxation_factor: float = 0.5) -> None:
-        """Calculate the weights for the Relax Operator smoothing operation.
+    def get_operator(self, relaxation_factor: float = 0.5) -> sp.csr_matrix:
+        """Get the Relax smoothing operator.
 
         Args:
-            iterations (int): The number of iterations to perform.
             relaxation_factor (float): The factor controlling the relaxation strength (0 < relaxation_factor < 1).
+
+        Returns:
+            sp.csr_matrix: The operator moving each vertex towards the average of its neighbors.
         """
         if not (0 < relaxation_factor <= 1):
             raise ValueError("The relaxation factor must be in the range (0, 1).")
 
-        neighbor_indices_list = self.mesh_vertex.get_connected_vertices(self.indices)
-        all_indices = list(set(chain.from_iterable(neighbor_indices_list)) | set(self.indices))
+        average = self._normalize_rows(self.topology.get_adjacency())
 
-        all_indices_weights = self._get_indices_weights(self.skinCluster, all_indices)
+        return ((1 - relaxation_factor) * sp.identity(average.shape[0], format="csr") + relaxation_factor * average).tocsr()
 
-        smoothed_weights = [0.0] * self.num_indices
-        for _ in range(iterations):
-            for i in range(self.num_indices):
-                neighbor_weights = [all_indices_weights[j] for j in neighbor_indices_list[i]]
-                avg_weight = [sum(w) / len(neighbor_weights) for w in zip(*neighbor_weights)]
-
-                # Relax the weight towards the average of its neighbors
-                smoothed_weights[i] = [
-                    (1 - relaxation_factor) * all_indices_weights[self.indices[i]][j] + relaxation_factor * avg_weight[j]
-                    for j in range(len(all_indices_weights[self.indices[i]]))
-                ]
-
-            # Update all_weights with smoothed values only if iterations > 1
-            if iterations > 1:
-                for i, index in enumerate(self.indices):
-                    all_indices_weights[index] = smoothed_weights[i]
+    def calculate_weights(self, iterations: int = 1, relaxation_factor: float = 0.5) -> np.ndarray:
+        """Calculate the weights for the Relax Operator smoothing operation.
+
+        Args:
+            iterations (int): The number of iterations to perform.
+            relaxation_factor (float): The factor controlling the relaxation strength (0 < relaxation_factor < 1).
+
+        Returns:
+            np.ndarray: The smoothed weights.
+        """
+        smoothed_weights = super().calculate_weights(iterations, relaxation_factor=relaxation_factor)
 
         logger.debug(f"Skin weights smoothed using Relax Operator method: {self.vertices}")
 
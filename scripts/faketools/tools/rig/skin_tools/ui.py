@@ -158,7 +158,10 @@ class MainWindow(BaseMainWindow):
         if not sel_dag_nodes:
             cmds.error("Select geometry to prune small weights.")
 
-        prune_small_weights(sel_dag_nodes, threshold=0.005)
+        results = prune_small_weights(sel_dag_nodes, threshold=0.005)
+        num_pruned = sum(result.num_pruned for result in results)
+        max_delta = max((result.max_delta for result in results), default=0.0)
+        logger.info(f"Pruned small weights: {num_pruned} entries, max delta {max_delta:.6f}")
 
     @error_handler
     @undo_chunk("Add Influences")
@@ -11,7 +11,7 @@ from .....lib_ui import base_window, maya_decorator
 from .....lib_ui.qt_compat import QCheckBox, QGridLayout, QLabel, QLineEdit, QPushButton, Qt, QVBoxLayout, QWidget
 from .....lib_ui.tool_settings import ToolSettingsManager
 from .....lib_ui.widgets import extra_widgets
-from ..command import combine_pair_skin_weights
+from ..command import combine_pair_skin_weights_batch
 
 logger = getLogger(__name__)
 
@@ -139,7 +139,7 @@ class AdjustCenterSkinWeightsWidgets(QWidget):
     @maya_decorator.error_handler
     def exchange_influences(self):
         """Exchange the influences."""
-        components = cmds.filterExpand(sm=[28, 31, 46], ex=True)
+        components = cmds.filterExpand(sm=[28, 31, 46], ex=False)
         if not components:
             cmds.error("No components selected.")
 
@@ -148,7 +148,7 @@ class AdjustCenterSkinWeightsWidgets(QWidget):
             static_inf = None
 
         if self.auto_search_checkbox.isChecked():
-            combine_pair_skin_weights(
+            combine_pair_skin_weights_batch(
                 components, method="auto", static_inf=static_inf, regex_name=ADJUST_CENTER_WEIGHT[0], replace_name=ADJUST_CENTER_WEIGHT[1]
             )
         else:
@@ -165,4 +165,4 @@ class AdjustCenterSkinWeightsWidgets(QWidget):
 
             pair_infs = list(zip(src_infs, target_infs))
 
-            combine_pair_skin_weights(components, method="manual", pair_infs=pair_infs, static_inf=static_inf)
+            combine_pair_skin_weights_batch(components, method="manual", pair_infs=pair_infs, static_inf=static_inf)
@@ -10,7 +10,7 @@ import maya.cmds as cmds
 from .....lib_ui import base_window, maya_decorator
 from .....lib_ui.qt_compat import QGridLayout, QLabel, QLineEdit, QPushButton, Qt, QVBoxLayout, QWidget
 from .....lib_ui.tool_settings import ToolSettingsManager
-from ..command import combine_skin_weights
+from ..command import combine_skin_weights_batch
 
 logger = getLogger(__name__)
 
@@ -105,10 +105,10 @@ class CombineSkinWeightsWidgets(QWidget):
         if not target_inf:
             cmds.error("No target influence.")
 
-        components = cmds.filterExpand(sm=[28, 31, 46], ex=True)
+        components = cmds.filterExpand(sm=[28, 31, 46], ex=False)
         if not components:
             cmds.error("No components selected.")
 
-        combine_skin_weights(src_infs, target_inf, components)
+        combine_skin_weights_batch(src_infs, target_inf, components)
 
         logger.info("Combined skin weights")
@@ -8,10 +8,10 @@ import maya.cmds as cmds
 
 from .....lib import lib_skinCluster
 from .....lib_ui import base_window, maya_decorator
-from .....lib_ui.qt_compat import QCheckBox, QGridLayout, QLabel, QPushButton, Qt, QVBoxLayout, QWidget
+from .....lib_ui.qt_compat import QCheckBox, QComboBox, QGridLayout, QLabel, QPushButton, Qt, QVBoxLayout, QWidget
 from .....lib_ui.tool_settings import ToolSettingsManager
 from .....lib_ui.widgets import FieldSliderWidget, extra_widgets
-from ..relax_weight import LaplacianSkinWeights
+from ..relax_weight import ImplicitLaplacianSkinWeights, LaplacianSkinWeights
 
 logger = getLogger(__name__)
 
@@ -42,19 +42,34 @@ class SkinWeightsRelaxWidgets(QWidget):
         # Options Grid
         layout = QGridLayout()
 
-        # Iterations
-        label = QLabel("Iterations:", alignment=Qt.AlignRight | Qt.AlignVCenter)
+        # Method
+        label = QLabel("Method:", alignment=Qt.AlignRight | Qt.AlignVCenter)
         layout.addWidget(label, 0, 0)
 
+        self.method_combo = QComboBox()
+        self.method_combo.addItems(["Iterative", "Implicit"])
+        layout.addWidget(self.method_combo, 0, 1)
+
+        # Iterations
+        self.iterations_label = QLabel("Iterations:", alignment=Qt.AlignRight | Qt.AlignVCenter)
+        layout.addWidget(self.iterations_label, 1, 0)
+
         self.iterations_widget = FieldSliderWidget(min_value=0, max_value=50, default_value=1, value_type="int")
-        layout.addWidget(self.iterations_widget, 0, 1)
+        layout.addWidget(self.iterations_widget, 1, 1)
+
+        # Strength
+        self.strength_label = QLabel("Strength:", alignment=Qt.AlignRight | Qt.AlignVCenter)
+        layout.addWidget(self.strength_label, 2, 0)
+
+        self.strength_widget = FieldSliderWidget(min_value=0.0, max_value=20.0, default_value=1.0, decimals=2, value_type="float")
+        layout.addWidget(self.strength_widget, 2, 1)
 
         # After Blend
         label = QLabel("After Blend:", alignment=Qt.AlignRight | Qt.AlignVCenter)
-        layout.addWidget(label, 1, 0)
+        layout.addWidget(label, 3, 0)
 
         self.after_blend_widget = FieldSliderWidget(min_value=0.0, max_value=1.0, default_value=1.0, decimals=2, value_type="float")
-        layout.addWidget(self.after_blend_widget, 1, 1)
+        layout.addWidget(self.after_blend_widget, 3, 1)
 
         layout.setColumnStretch(1, 1)
 
@@ -77,11 +92,27 @@ class SkinWeightsRelaxWidgets(QWidget):
 
         # Signal & Slot
         execute_button.clicked.connect(self.relax_weights)
+        self.method_combo.currentIndexChanged.connect(self._update_method_widgets)
+
+        self._update_method_widgets()
+
+    def _update_method_widgets(self):
+        """Show the options of the current method."""
+        is_implicit = self.method_combo.currentText() == "Implicit"
+
+        self.iterations_label.setVisible(not is_implicit)
+        self.iterations_widget.setVisible(not is_implicit)
+        self.strength_label.setVisible(is_implicit)
+        self.strength_widget.setVisible(is_implicit)
 
     @maya_decorator.undo_chunk("Relax Skin Weights")
     @maya_decorator.error_handler
     def relax_weights(self):
-        """Relax the skin weights using Laplacian smoothing."""
+        """Relax the skin weights using Laplacian smoothing.
+
+        Notes:
+            - 'Iterative' repeats the neighbor averaging, 'Implicit' solves the smoothing of the given strength at once.
+        """
         vertices = cmds.filterExpand(sm=31, ex=True)
         if not vertices:
             cmds.error("Select vertices.")
@@ -94,13 +125,24 @@ class SkinWeightsRelaxWidgets(QWidget):
         if not skinCluster:
             cmds.error(f"Object is not bound to a skinCluster: {shapes[0]}")
 
+        method = self.method_combo.currentText()
         iterations = int(self.iterations_widget.value())
+        strength = float(self.strength_widget.value())
         after_blend = float(self.after_blend_widget.value())
         only_unlock_inf = self.only_unlock_inf_checkBox.isChecked()
 
-        logger.debug(f"Relax options: iterations={iterations}, blend={after_blend}, only_unlock={only_unlock_inf}")
+        logger.debug(
+            f"Relax options: method={method}, iterations={iterations}, strength={strength}, blend={after_blend}, only_unlock={only_unlock_inf}"
+        )
 
-        LaplacianSkinWeights(skinCluster, vertices).smooth(iterations=iterations, blend_weights=after_blend, only_unlock_influences=only_unlock_inf)
+        if method == "Implicit":
+            ImplicitLaplacianSkinWeights(skinCluster, vertices).smooth(
+                strength=strength, blend_weights=after_blend, only_unlock_influences=only_unlock_inf
+            )
+        else:
+            LaplacianSkinWeights(skinCluster, vertices).smooth(
+                iterations=iterations, blend_weights=after_blend, only_unlock_influences=only_unlock_inf
+            )
 
         logger.info(f"Relaxed skin weights: {len(vertices)} vertices")
 
@@ -111,7 +153,9 @@ class SkinWeightsRelaxWidgets(QWidget):
             dict: Settings data
         """
         return {
+            "method": self.method_combo.currentText(),
             "iterations": int(self.iterations_widget.value()),
+            "strength": float(self.strength_widget.value()),
             "after_blend": float(self.after_blend_widget.value()),
             "only_unlock_inf": self.only_unlock_inf_checkBox.isChecked(),
         }
@@ -132,6 +176,17 @@ class SkinWeightsRelaxWidgets(QWidget):
             except (ValueError, TypeError):
                 self.iterations_widget.setValue(1)
 
+        if "method" in settings_data:
+            index = self.method_combo.findText(str(settings_data["method"]))
+            if index >= 0:
+                self.method_combo.setCurrentIndex(index)
+
+        if "strength" in settings_data:
+            try:
+                self.strength_widget.setValue(float(settings_data["strength"]))
+            except (ValueError, TypeError):
+                self.strength_widget.setValue(1.0)
+
         if "after_blend" in settings_data:
             after_blend = settings_data["after_blend"]
             # Handle empty or invalid values with default of 1.0
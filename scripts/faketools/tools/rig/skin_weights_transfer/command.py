@@ -5,15 +5,25 @@ Pure Maya operations for transferring skin weights between influences.
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from logging import getLogger
 
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
+import numpy as np
 
-from ....lib.lib_skinCluster import get_skin_weights, set_skin_weights
+from ....lib import lib_skinWeights
 
 logger = getLogger(__name__)
 
+# Component types that carry skin weights, with their attribute names and function sets.
+_COMPONENT_TYPES = {
+    om.MFn.kMeshVertComponent: ("vtx", om.MFnSingleIndexedComponent),
+    om.MFn.kCurveCVComponent: ("cv", om.MFnSingleIndexedComponent),
+    om.MFn.kSurfaceCVComponent: ("cv", om.MFnDoubleIndexedComponent),
+    om.MFn.kLatticeComponent: ("pt", om.MFnTripleIndexedComponent),
+}
+
 
 def move_skin_weights(
     skin_cluster: str,
@@ -22,7 +32,7 @@ def move_skin_weights(
     components: Sequence[str],
     amount: float,
     use_percentage: bool = True,
-    soft_weights: dict[str, float] | None = None,
+    soft_weights: np.ndarray | dict[str, float] | None = None,
 ) -> int:
     """Move skin weights from source influences to a target influence.
 
@@ -39,9 +49,12 @@ def move_skin_weights(
         use_percentage (bool): If True, amount is treated as a percentage of
             source weights. If False, amount is an absolute value clamped to
             available source weight. Defaults to True.
-        soft_weights (dict[str, float] | None): Per-component soft selection weights
-            (0.0-1.0). When provided, the transfer amount is multiplied by each
-            component's weight. None treats all components equally. Defaults to None.
+        soft_weights (np.ndarray | dict[str, float] | None): Per-component soft selection
+            weights (0.0-1.0). An array is aligned with the weight rows, the components in
+            ascending index order per geometry as returned by get_soft_selection.
+            A dict is keyed by the flattened component names, missing components use 1.0.
+            When provided, the transfer amount is multiplied by each component's weight.
+            None treats all components equally. Defaults to None.
 
     Returns:
         int: Number of components processed.
@@ -61,8 +74,8 @@ def move_skin_weights(
     if not components:
         raise ValueError("No components specified")
 
-    # Validate components
-    components = cmds.filterExpand(components, selectionMask=[28, 31, 46]) or []
+    # Validate components, ranges are kept as they are
+    components = cmds.filterExpand(components, selectionMask=[28, 31, 46], expand=False) or []
     if not components:
         raise ValueError("No valid components found (vertices, CVs, or lattice points)")
 
@@ -78,43 +91,43 @@ def move_skin_weights(
         raise ValueError(f"Target influence not found in skinCluster: {tgt_inf}")
 
     # Get influence indices
-    src_indices = [all_infs.index(inf) for inf in src_infs]
+    src_indices = np.array([all_infs.index(inf) for inf in src_infs], dtype=np.int64)
     tgt_index = all_infs.index(tgt_inf)
 
-    # Get current weights
-    weights = get_skin_weights(skin_cluster, components)
+    # Get current weights, the rows follow the ascending component index order
+    weights = lib_skinWeights.get_weights(skin_cluster, components)
 
-    # Modify weights
-    for idx, comp_weights in enumerate(weights):
-        total_src = sum(comp_weights[i] for i in src_indices)
-        if total_src <= 0.0:
-            continue
+    if soft_weights is None:
+        falloff = np.ones(len(weights), dtype=np.float64)
+    elif isinstance(soft_weights, dict):
+        row_components = _get_row_components(components)
+        falloff = np.fromiter((soft_weights.get(component, 1.0) for component in row_components), dtype=np.float64, count=len(row_components))
+    else:
+        falloff = np.asarray(soft_weights, dtype=np.float64)
 
-        soft_w = soft_weights.get(components[idx], 1.0) if soft_weights else 1.0
+    if falloff.shape != (len(weights),):
+        raise ValueError(f"Soft weights do not match the components: {falloff.shape} != ({len(weights)},)")
 
-        # Calculate amount to move
-        if use_percentage:
-            move_amount = total_src * (amount / 100.0) * soft_w
-        else:
-            move_amount = min(amount * soft_w, total_src)
-
-        if move_amount <= 0.0:
-            continue
+    # Calculate amount to move
+    src_weights = weights[:, src_indices]
+    total_src = src_weights.sum(axis=1)
+    if use_percentage:
+        move_amounts = total_src * (amount / 100.0) * falloff
+    else:
+        move_amounts = np.minimum(amount * falloff, total_src)
 
-        # Proportionally reduce each source influence
-        for i in src_indices:
-            if comp_weights[i] > 0.0:
-                reduction = (comp_weights[i] / total_src) * move_amount
-                comp_weights[i] -= reduction
+    move_amounts = np.where(total_src > 0.0, np.maximum(move_amounts, 0.0), 0.0)
 
-        # Add to target
-        comp_weights[tgt_index] += move_amount
+    # Proportionally reduce each source influence and add to target
+    ratios = np.divide(move_amounts, total_src, out=np.zeros_like(total_src), where=total_src > 0.0)
+    weights[:, src_indices] = src_weights * (1.0 - ratios)[:, np.newaxis]
+    weights[:, tgt_index] += move_amounts
 
     # Write back weights
-    set_skin_weights(skin_cluster, weights, components)
+    lib_skinWeights.set_weights(skin_cluster, components, weights)
 
-    logger.info(f"Moved weights from {src_infs} to {tgt_inf} on {len(components)} components")
-    return len(components)
+    logger.info(f"Moved weights from {src_infs} to {tgt_inf} on {len(weights)} components")
+    return len(weights)
 
 
 def get_affected_influences(
@@ -134,16 +147,102 @@ def get_affected_influences(
     if not all_infs:
         return []
 
-    num_infs = len(all_infs)
-    weight_sums = [0.0] * num_infs
+    weights = lib_skinWeights.get_weights(skin_cluster, components)
+    weight_sums = np.where(weights > 1e-6, weights, 0.0).sum(axis=0)
+
+    affected = np.flatnonzero(weight_sums > 1e-6)
+    affected = affected[np.argsort(-weight_sums[affected], kind="stable")]
+
+    return [all_infs[i] for i in affected]
+
+
+def get_soft_selection() -> tuple[list[str], np.ndarray]:
+    """Get the selected vertices, CVs and lattice points with their soft selection falloff.
+
+    Notes:
+        - The rich selection is read, the symmetry selection is included.
+        - The indices and the falloffs are read as arrays from the component function sets.
+
+    Returns:
+        tuple[list[str], np.ndarray]: The components compressed into ranges and the falloff of each component.
+            The falloffs are aligned with the weight rows of the components, see move_skin_weights.
+    """
+    rich_selection = om.MGlobal.getRichSelection()
+    selection_list = rich_selection.getSelection()
+    sym_selection_list = rich_selection.getSymmetry()
+    if not sym_selection_list.isEmpty():
+        selection_list.merge(sym_selection_list)
+
+    components = []
+    falloffs = []
+    for node, attr, elements, item_falloffs in _iter_components(selection_list):
+        if elements.shape[1] == 1:
+            components.extend(lib_skinWeights.get_component_names(node, elements[:, 0], attr))
+        else:
+            components.extend(f"{node}.{attr}" + "".join(f"[{index}]" for index in element) for element in elements.tolist())
+
+        falloffs.append(item_falloffs)
+
+    falloffs = np.concatenate(falloffs) if falloffs else np.empty(0, dtype=np.float64)
+
+    return components, falloffs
+
+
+def _get_row_components(components: Sequence[str]) -> list[str]:
+    """Get the flattened component names in the order of the weight rows.
+
+    Args:
+        components (Sequence[str]): The components.
+
+    Returns:
+        list[str]: The flattened component names.
+    """
+    selection_list = om.MSelectionList()
+    for component in components:
+        selection_list.add(component)
+
+    row_components = []
+    for node, attr, elements, _ in _iter_components(selection_list):
+        row_components.extend(f"{node}.{attr}" + "".join(f"[{index}]" for index in element) for element in elements.tolist())
+
+    return row_components
+
+
+def _iter_components(selection_list: om.MSelectionList) -> Iterator[tuple[str, str, np.ndarray, np.ndarray]]:
+    """Iterate the weighted components of the selection list.
+
+    Notes:
+        - The elements of each item are sorted into ascending index order and made unique, same as the weight rows.
+
+    Args:
+        selection_list (om.MSelectionList): The selection list.
+
+    Yields:
+        tuple[str, str, np.ndarray, np.ndarray]: The transform name, the component attribute name,
+            the element indices (num_elements, num_indices) and the falloffs (num_elements,).
+    """
+    for i in range(selection_list.length()):
+        try:
+            dag_path, component = selection_list.getComponent(i)
+        except RuntimeError:
+            continue
+
+        if component.isNull() or component.apiType() not in _COMPONENT_TYPES:
+            continue
+
+        attr, fn_class = _COMPONENT_TYPES[component.apiType()]
+        fn_comp = fn_class(component)
+        if not fn_comp.elementCount:
+            continue
+
+        elements = np.array(fn_comp.getElements(), dtype=np.int64).reshape(fn_comp.elementCount, -1)
+        if fn_comp.hasWeights:
+            falloffs = np.fromiter((fn_comp.weight(j).influence for j in range(fn_comp.elementCount)), dtype=np.float64, count=fn_comp.elementCount)
+        else:
+            falloffs = np.ones(fn_comp.elementCount, dtype=np.float64)
 
-    for component in cmds.ls(components, flatten=True):
-        weights = cmds.skinPercent(skin_cluster, component, query=True, value=True)
-        for i, w in enumerate(weights):
-            if w > 1e-6:
-                weight_sums[i] += w
+        elements, order = np.unique(elements, axis=0, return_index=True)
 
-    affected = [(i, weight_sums[i]) for i in range(num_infs) if weight_sums[i] > 1e-6]
-    affected.sort(key=lambda x: x[1], reverse=True)
+        dag_path.pop()  # Remove shape node
 
-    return [all_infs[i] for i, _ in affected]
+        yield dag_path.partialPathName(), attr, elements, falloffs[order]
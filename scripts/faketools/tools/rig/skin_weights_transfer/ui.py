@@ -21,7 +21,6 @@ from ....lib_ui.qt_compat import (
 )
 from ....lib_ui.tool_settings import ToolSettingsManager
 from ....lib_ui.widgets import FieldSliderWidget, IconButton, IconToggleButton, extra_widgets
-from ....operations import component_selection
 from . import command
 
 _IMAGES_DIR = Path(__file__).parent / "images"
@@ -368,14 +367,8 @@ class MainWindow(BaseMainWindow):
             cmds.warning("Source and target must be different.")
             return
 
-        # Get selected components with soft selection weights
-        soft_weights = component_selection.get_unique_selections()
-        if not soft_weights:
-            cmds.warning("Select vertices, CVs, or lattice points.")
-            return
-
-        # Filter to valid component types (vtx, CV, lattice point)
-        components = cmds.filterExpand(list(soft_weights.keys()), selectionMask=[28, 31, 46]) or []
+        # Get selected components (vtx, CV, lattice point) with soft selection falloff
+        components, falloffs = command.get_soft_selection()
         if not components:
             cmds.warning("Select vertices, CVs, or lattice points.")
             return
@@ -399,7 +392,7 @@ class MainWindow(BaseMainWindow):
             components=components,
             amount=float(amount),
             use_percentage=use_percentage,
-            soft_weights=soft_weights,
+            soft_weights=falloffs,
         )
 
         logger.info(f"Transferred weights on {count} components")